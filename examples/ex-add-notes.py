@@ -3,7 +3,7 @@
 #------------------------------------------------------------------------
 # pylive: ex-add-notes
 #
-# Add 16 randomly-generated notes to a clip.
+# Add 32 randomly-generated notes to a clip.
 # The first track must be a MIDI track.
 #------------------------------------------------------------------------
 
@@ -29,11 +29,14 @@ def main():
     if not clip.is_midi_clip:
         raise ValueError("Clip at [0, 0] must be a MIDI clip")
 
+    #--------------------------------------------------------------------------------
+    # Notes are sent to Live together, packed into as few datagrams as possible.
+    #--------------------------------------------------------------------------------
     print("Populating clip [0, 0] with random notes")
-    for n in range(32):
-        note = generate_random_note(clip)
+    notes = [generate_random_note(clip) for n in range(32)]
+    for note in notes:
         print(" - Adding note %d at time %.2f" % (note[0], note[1]))
-        clip.add_note(*note)
+    clip.add_notes(notes)
 
 def generate_random_note(clip: live.Clip):
     #--------------------------------------------------------------------------------
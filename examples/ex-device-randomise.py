@@ -7,6 +7,7 @@
 #------------------------------------------------------------------------
 from live import *
 
+import numpy
 import logging
 
 logging.basicConfig(format="%(asctime)-15s %(message)s")
@@ -17,12 +18,17 @@ def main():
     for track in set.tracks:
         for device in track.devices:
             print("%s: Randomising %d parameters" % (device, len(device.parameters)))
-            for parameter in device.parameters:
+            #------------------------------------------------------------------------
+            # Values are clamped to each parameter's range, and rounded for
+            # quantized parameters, then sent to Live in a single message.
+            #------------------------------------------------------------------------
+            values = numpy.random.uniform([parameter.min for parameter in device.parameters],
+                                          [parameter.max for parameter in device.parameters])
+            for index, parameter in enumerate(device.parameters):
                 print(" - %s" % parameter)
                 if parameter.name == "Device On":
-                    parameter.value = True
-                else:
-                    parameter.randomise()
+                    values[index] = 1
+            device.write_parameters(values)
             
 if __name__ == "__main__":
     main()
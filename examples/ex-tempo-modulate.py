@@ -6,40 +6,32 @@
 # Slowly modulates the tempo of a Live set.
 #------------------------------------------------------------------------
 from live import *
+from live.automation import Automation
 
 import time
-import math
 import logging
 
 logging.basicConfig(format="%(asctime)-15s %(message)s")
 logging.getLogger("live").setLevel(logging.INFO)
 
-#------------------------------------------------------------------------
-# Don't need to scan the set for simple set-wide operations.
-#------------------------------------------------------------------------
 def main():
     set = Set(scan=True)
 
-    tempo_default = 120.0
-    tempo_range = tempo_default * 0.5
-    sleep = 0.01
-    period = 10.0
-    t = 0.0
-
     #------------------------------------------------------------------------
-    # Change the set's tempo every 0.01s based on a smooth sinusoid,
-    # giving a wave-like tempo modulation.
-    #
-    # The below are synonymous:
+    # Modulate the set's tempo with a smooth sinusoid, giving a wave-like
+    # tempo modulation with a period of 10s, between 60 and 180bpm.
     #
-    # set.tempo = 120.0
-    # set.set_tempo(120.0)
+    # The automation engine evaluates the LFO on its own thread at 50Hz,
+    # against absolute deadlines so that it does not drift, and only sends
+    # the tempo to Live when it changes.
     #------------------------------------------------------------------------
     print("Modulating tempo of Live set...")
-    while True:
-        set.tempo = tempo_default + (tempo_range * math.sin(math.pi * 2.0 * t / period))
-        time.sleep(sleep)
-        t += sleep
+    with Automation(set.live, rate=50.0) as automation:
+        automation.lfo((set, "tempo"), "sine", frequency=0.1, min=60.0, max=180.0)
+        while True:
+            time.sleep(10.0)
+            stats = automation.stats()
+            print("Sent %d values, mean jitter %.2fms, %d overruns" % (stats["sent"], stats["jitter_mean"] * 1000, stats["overruns"]))
 
 if __name__ == "__main__":
     main()
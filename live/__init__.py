@@ -25,11 +25,34 @@ clip.play()
 """
 
 __author__ = "Daniel Jones <http://www.erase.net/>"
-__all__ = ["Query", "Set", "Track", "Group", "Clip", "Device", "Parameter", "Scene"]
+__all__ = ["Query", "AsyncQuery", "QueryGroup", "Set", "Track", "Group", "Clip", "Device", "Parameter", "Scene"]
+
+import importlib
 
 from .object import *
 from .constants import *
 from .classes import *
 from .query import *
+from .profiling import profile
 
 from .exceptions import *
+
+#------------------------------------------------------------------------
+# Classes whose dependencies are slow to import (asyncio, concurrent.futures, numpy)
+# are imported on first access, keeping `import live` fast (PEP 562).
+#------------------------------------------------------------------------
+_lazy_imports = {
+    "AsyncQuery": ".async_query",
+    "QueryGroup": ".fanout",
+    "Automation": ".automation",
+}
+
+def __getattr__(name: str):
+    if name not in _lazy_imports:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module(_lazy_imports[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_imports))
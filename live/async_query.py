@@ -0,0 +1,193 @@
+import asyncio
+import logging
+
+from live.exceptions import LiveConnectionError, LiveTimeoutError
+from live.router import echo_args
+
+from pythonosc.osc_packet import OscPacket, ParseError
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+class AsyncQuery:
+    """
+    asyncio-native counterpart to Query, which sends and receives OSC over a
+    datagram endpoint on the running event loop rather than blocking a thread
+    per query.
+
+        q = AsyncQuery()
+        await q.connect()
+        tempo, = await q.query("/live/song/get/tempo")
+        volumes = await asyncio.gather(*(q.query("/live/track/get/volume", (n,)) for n in range(64)))
+
+    By default, AsyncQuery listens on any free port, so that it can be used
+    alongside a Query in the same process. This relies on AbletonOSC replying
+    to the port that each query was sent from.
+    """
+
+    def __init__(self, address=("127.0.0.1", 11000), listen_port=0):
+        """
+        Args:
+            address: The (host, port) on which AbletonOSC is listening.
+            listen_port: The local port on which to receive replies. Defaults to
+                         0, for any free port. If the server replies to a fixed
+                         port, pass that port, which cannot then be shared with a
+                         Query in the same process.
+        """
+        self.osc_address = address
+        self.listen_port = listen_port
+
+        #------------------------------------------------------------------------
+        # Only listen on the loopback interface when Live is on the same host,
+        # as Query does.
+        #------------------------------------------------------------------------
+        self.listen_host = "127.0.0.1" if address[0] in ("127.0.0.1", "localhost") else "0.0.0.0"
+        self.osc_timeout = 3.0
+        self.logger = logging.getLogger(__name__)
+
+        self.handlers = {}
+        self.transport = None
+
+        #------------------------------------------------------------------------
+        # Queries awaiting a reply, keyed by address: [(echo_args, future), ...]
+        #------------------------------------------------------------------------
+        self.pending: dict[str, list[tuple[tuple, asyncio.Future]]] = {}
+
+    async def connect(self) -> None:
+        """
+        Bind the listening socket on the running event loop.
+        Replies are sent by AbletonOSC to the port that queries originate from,
+        so all traffic is sent and received via this one socket.
+        """
+        if self.transport is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: _AsyncQueryProtocol(self),
+                                                                local_addr=(self.listen_host, self.listen_port))
+
+    def close(self) -> None:
+        """
+        Close the socket, and fail any pending queries.
+        """
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        for futures in self.pending.values():
+            for _, future in futures:
+                if not future.done():
+                    future.set_exception(LiveConnectionError("AsyncQuery closed"))
+        self.pending = {}
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def cmd(self, msg: str, args: tuple = ()) -> None:
+        """
+        Send a Live command without expecting a response back. Does not block.
+
+            q.cmd("/live/song/set/tempo", (110.0,))
+        """
+        if self.transport is None:
+            raise LiveConnectionError("AsyncQuery is not connected (call connect() first)")
+        if not isinstance(args, (list, tuple)):
+            args = (args,)
+
+        self.logger.debug("OSC output: %s %s", msg, args)
+        builder = OscMessageBuilder(address=msg)
+        for arg in args:
+            builder.add_arg(arg)
+        self.transport.sendto(builder.build().dgram, self.osc_address)
+
+    async def query(self, msg: str, args: tuple = (), timeout: float = None) -> list:
+        """
+        Send a Live query and await its response:
+
+            tempo, = await q.query("/live/song/get/tempo")
+
+        Returns a list of values.
+        """
+        if not isinstance(args, (list, tuple)):
+            args = (args,)
+        if timeout is None:
+            timeout = self.osc_timeout
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (echo_args(msg, args), future)
+        self.pending.setdefault(msg, []).append(entry)
+        try:
+            self.cmd(msg, args)
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise LiveTimeoutError("Timed out waiting for response to query: %s %s. "
+                                   "Is Live running and AbletonOSC installed?" % (msg, args))
+        finally:
+            entries = self.pending.get(msg)
+            if entries and entry in entries:
+                entries.remove(entry)
+            if not entries:
+                self.pending.pop(msg, None)
+
+    def add_handler(self, address, handler):
+        if not address in self.handlers:
+            self.handlers[address] = []
+        self.handlers[address].append(handler)
+
+    def handler(self, address, data):
+        self.logger.debug("OSC input: %s %s" % (address, data))
+
+        if address in self.handlers:
+            for handler in self.handlers[address]:
+                handler(*data)
+
+        entries = self.pending.get(address)
+        if entries:
+            for index, (echo, future) in enumerate(entries):
+                if not future.done() and tuple(data[:len(echo)]) == echo:
+                    del entries[index]
+                    future.set_result(list(data))
+                    return
+
+class _AsyncQueryProtocol(asyncio.DatagramProtocol):
+    def __init__(self, query: AsyncQuery):
+        self.query = query
+
+    def datagram_received(self, data, addr):
+        try:
+            packet = OscPacket(data)
+        except ParseError as e:
+            self.query.logger.warning("Couldn't parse OSC packet from %s: %s" % (addr, e))
+            return
+        for timed_message in packet.messages:
+            message = timed_message.message
+            self.query.handler(message.address, tuple(message.params))
+
+#------------------------------------------------------------------------
+# Shared client used by the awaitable getters (Set.aget, Track.aget, ...)
+# when no client is specified. One client is created per event loop.
+#------------------------------------------------------------------------
+_default_clients = {}
+
+async def get_async_client() -> AsyncQuery:
+    """
+    Returns the connected default AsyncQuery for the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    for closed_loop in [other for other in _default_clients if other.is_closed()]:
+        del _default_clients[closed_loop]
+
+    task = _default_clients.get(loop)
+    if task is None:
+        #------------------------------------------------------------------------
+        # Store the connection task rather than the client, so that concurrent
+        # callers all wait for the same client to finish connecting.
+        #------------------------------------------------------------------------
+        task = loop.create_task(_connect_default_client())
+        _default_clients[loop] = task
+    return await task
+
+async def _connect_default_client() -> AsyncQuery:
+    client = AsyncQuery()
+    await client.connect()
+    return client
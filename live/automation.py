@@ -0,0 +1,493 @@
+"""
+Control-rate automation of Live properties by LFOs, envelopes and ramps,
+evaluated together on a single scheduler thread:
+
+    with live.Automation(set.live, rate=100.0) as automation:
+        automation.lfo((set, "tempo"), "sine", frequency=0.1, min=90, max=150)
+        automation.lfo(set.tracks[0].devices[0].parameters[1], "triangle", frequency=2.0)
+        automation.ramp((set.tracks[1], "volume"), start=0.0, end=0.85, duration=4.0).wait()
+
+Requires numpy.
+"""
+
+import math
+import time
+import logging
+import threading
+import collections
+
+import numpy as np
+
+from live.query import Query
+from live.osc import encode_message
+from live.classes import Set, Track, Clip, Parameter
+
+#------------------------------------------------------------------------
+# Number of recent ticks over which timing statistics are reported.
+#------------------------------------------------------------------------
+TIMING_WINDOW = 1000
+
+def resolve_target(target) -> tuple:
+    """
+    Returns the setter address and index arguments of an automation target.
+
+    Args:
+        target: A Parameter; an (object, property) tuple, where object is a Set,
+                Track or Clip, e.g. (set, "tempo") or (track, "volume"); or an
+                (address, args) tuple, e.g. ("/live/track/set/volume", (0,))
+    """
+    if isinstance(target, Parameter):
+        return ("/live/device/set/parameter/value",
+                (target.device.track.index, target.device.index, target.index))
+    obj, prop = target
+    if isinstance(obj, str):
+        return (obj, tuple(prop))
+    if isinstance(obj, Set):
+        return ("/live/song/set/%s" % prop, ())
+    if isinstance(obj, Track):
+        return ("/live/track/set/%s" % prop, (obj.index,))
+    if isinstance(obj, Clip):
+        return ("/live/clip/set/%s" % prop, (obj.track.index, obj.index))
+    raise TypeError("Can't automate target: %s" % (target,))
+
+class Modulation:
+    """
+    A handle to a modulation source that is driving a target, returned by
+    Automation.lfo(), envelope() and ramp().
+    """
+
+    def __init__(self, automation, bank, address: str, args: tuple):
+        self.automation = automation
+        self.bank = bank
+        self.address = address
+        self.args = args
+        self.done = threading.Event()
+
+    def __str__(self):
+        return "Modulation (%s %s %s)" % (self.bank.name, self.address, self.args)
+
+    def stop(self) -> None:
+        """ Stop modulating the target, leaving it at its last value. """
+        self.automation.remove(self)
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until the modulation has finished (for ramps and released envelopes)
+        or been stopped.
+
+        Returns:
+            True if the modulation finished, False if the timeout expired.
+        """
+        return self.done.wait(timeout)
+
+class Envelope(Modulation):
+    """ A handle to an ADSR envelope, which sustains until released. """
+
+    def release(self) -> None:
+        """ Begin the release stage of the envelope. """
+        self.automation.release(self)
+
+class Bank:
+    """
+    A set of modulation sources of the same kind, whose parameters are held as
+    columns of numpy arrays, so that all of them are evaluated in one pass.
+    """
+
+    name = None
+    columns = ()
+
+    def __init__(self):
+        self.modulations: list[Modulation] = []
+        self.data = {column: np.zeros(0) for column in self.columns + ("last",)}
+
+    def __len__(self):
+        return len(self.modulations)
+
+    def add(self, modulation: Modulation, **values) -> None:
+        values["last"] = np.nan
+        self.modulations.append(modulation)
+        for column in self.data:
+            self.data[column] = np.append(self.data[column], values[column])
+
+    def remove(self, modulation: Modulation) -> None:
+        index = self.modulations.index(modulation)
+        del self.modulations[index]
+        for column in self.data:
+            self.data[column] = np.delete(self.data[column], index)
+
+    def evaluate(self, t: float) -> tuple:
+        """
+        Returns:
+            A tuple of (values, finished), arrays of each source's value at time t,
+            and whether it has reached its end.
+        """
+        raise NotImplementedError
+
+class LFOBank(Bank):
+    name = "lfo"
+    columns = ("start", "frequency", "phase", "shape", "min", "max", "cycle", "held")
+    shapes = {"sine": 0, "triangle": 1, "saw": 2, "square": 3, "random": 4}
+
+    def __init__(self, seed: int = None):
+        super().__init__()
+        self.rng = np.random.default_rng(seed)
+
+    def evaluate(self, t):
+        data = self.data
+        phase = (t - data["start"]) * data["frequency"] + data["phase"]
+        cycle = np.floor(phase)
+        position = phase - cycle
+        shape = data["shape"]
+
+        #------------------------------------------------------------------------
+        # Random LFOs sample and hold a new value at the start of each cycle.
+        #------------------------------------------------------------------------
+        new_cycle = (shape == 4) & (cycle != data["cycle"])
+        if new_cycle.any():
+            data["held"][new_cycle] = self.rng.random(np.count_nonzero(new_cycle))
+            data["cycle"][new_cycle] = cycle[new_cycle]
+
+        level = np.select([shape == 0, shape == 1, shape == 2, shape == 3],
+                          [0.5 - 0.5 * np.cos(2 * np.pi * position),
+                           1.0 - np.abs(2.0 * position - 1.0),
+                           position,
+                           (position < 0.5).astype(float)],
+                          data["held"])
+        values = data["min"] + level * (data["max"] - data["min"])
+        return values, np.zeros(len(values), dtype=bool)
+
+class EnvelopeBank(Bank):
+    name = "envelope"
+    columns = ("start", "attack", "decay", "sustain", "release", "released_at", "min", "max")
+
+    @staticmethod
+    def level(elapsed, attack, decay, sustain):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            attack_level = np.where(attack > 0, elapsed / attack, 1.0)
+            decay_level = 1.0 - (1.0 - sustain) * np.where(decay > 0, (elapsed - attack) / decay, 1.0)
+        return np.where(elapsed < attack, attack_level,
+                        np.where(elapsed < attack + decay, decay_level, sustain))
+
+    def evaluate(self, t):
+        data = self.data
+        start, attack, decay, sustain = data["start"], data["attack"], data["decay"], data["sustain"]
+        released_at, release = data["released_at"], data["release"]
+
+        level = self.level(t - start, attack, decay, sustain)
+        released = t >= released_at
+        if released.any():
+            release_level = self.level(released_at - start, attack, decay, sustain)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                fraction = np.where(release > 0, (t - released_at) / release, 1.0)
+            level = np.where(released, release_level * (1.0 - np.clip(fraction, 0.0, 1.0)), level)
+            finished = released & (fraction >= 1.0)
+        else:
+            finished = released
+        values = data["min"] + np.clip(level, 0.0, 1.0) * (data["max"] - data["min"])
+        return values, finished
+
+class RampBank(Bank):
+    name = "ramp"
+    columns = ("start", "duration", "from", "to", "exponential")
+
+    def evaluate(self, t):
+        data = self.data
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(data["duration"] > 0, (t - data["start"]) / data["duration"], 1.0)
+            fraction = np.clip(fraction, 0.0, 1.0)
+            start, end = data["from"], data["to"]
+            linear = start + (end - start) * fraction
+            exponential = start * (end / start) ** fraction
+        values = np.where(data["exponential"] > 0, exponential, linear)
+        return values, fraction >= 1.0
+
+class Automation:
+    """
+    Drives any number of modulation sources (LFOs, ADSR envelopes and ramps)
+    from a single scheduler thread.
+
+    On each tick, every source is evaluated in vectorised form, and only the
+    values that have changed are sent to Live, together as OSC bundles. Ticks
+    are scheduled against absolute deadlines, so that the control rate does
+    not drift; ticks that are missed entirely are skipped rather than sent in
+    a burst. Timing statistics are available via stats().
+
+    Each target is driven by at most one source: adding a source for a target
+    replaces any existing one. Times are in seconds or, if a SongClock is
+    given, in beats of the song.
+    """
+
+    def __init__(self, query: Query = None, rate: float = 100.0, epsilon: float = 0.0,
+                 clock=None, seed: int = None):
+        """
+        Args:
+            query: The Query object used to communicate with Live. Defaults to Query.default().
+            rate: Number of ticks per second.
+            epsilon: Values that differ from the last-sent value by no more than
+                     epsilon are not re-sent.
+            clock: A SongClock (e.g., set.clock) to measure time in beats, so
+                   that sources follow the song's tempo and transport.
+            seed: Seed for random LFOs.
+        """
+        self.live = query if query is not None else Query.default()
+        self.rate = rate
+        self.epsilon = epsilon
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+
+        self.lock = threading.Lock()
+        self.lfos = LFOBank(seed)
+        self.envelopes = EnvelopeBank()
+        self.ramps = RampBank()
+        self.banks = (self.lfos, self.envelopes, self.ramps)
+        self.targets: dict[tuple, Modulation] = {}
+
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.sent = 0
+        self.unchanged = 0
+        self.datagrams = 0
+        self.lateness = collections.deque(maxlen=TIMING_WINDOW)
+        self.durations = collections.deque(maxlen=TIMING_WINDOW)
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def __str__(self):
+        return "Automation (%d sources, %.0f Hz)" % (len(self.targets), self.rate)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def now(self) -> float:
+        """ Returns the current time, in seconds, or in beats if following a SongClock. """
+        return self.clock.now_beats() if self.clock is not None else time.monotonic()
+
+    #------------------------------------------------------------------------
+    # Sources
+    #------------------------------------------------------------------------
+
+    def lfo(self, target, shape: str = "sine", frequency: float = 1.0,
+            min: float = 0.0, max: float = 1.0, phase: float = 0.0) -> Modulation:
+        """
+        Modulate a target with a low-frequency oscillator.
+
+        Args:
+            target: The target (see resolve_target()), e.g. (set, "tempo")
+            shape: One of "sine", "triangle", "saw", "square" or "random" (sample and hold)
+            frequency: Cycles per second (or per beat, if following a SongClock)
+            min: The value at the bottom of the cycle.
+            max: The value at the top of the cycle.
+            phase: The initial phase, in cycles (0..1). Sine and triangle LFOs start at min.
+
+        Returns:
+            A Modulation, which can be stopped.
+        """
+        if shape not in LFOBank.shapes:
+            raise ValueError("Invalid value for 'shape': %s" % shape)
+        return self._add(Modulation, self.lfos, target,
+                         start=self.now(), frequency=frequency, phase=phase, shape=LFOBank.shapes[shape],
+                         min=min, max=max, cycle=np.nan, held=0.0)
+
+    def envelope(self, target, attack: float = 0.01, decay: float = 0.1, sustain: float = 0.5,
+                 release: float = 0.5, min: float = 0.0, max: float = 1.0) -> Envelope:
+        """
+        Modulate a target with an ADSR envelope, triggered immediately. The
+        envelope sustains until its release() method is called, and finishes
+        at the end of its release stage.
+
+        Args:
+            target: The target (see resolve_target())
+            attack: Time to rise from min to max.
+            decay: Time to fall from max to the sustain level.
+            sustain: Sustain level, as a fraction (0..1) of the range from min to max.
+            release: Time to fall from the current level to min once released.
+            min: The value at the start and end of the envelope.
+            max: The value at the peak of the envelope.
+
+        Returns:
+            An Envelope, which can be released or stopped.
+        """
+        return self._add(Envelope, self.envelopes, target,
+                         start=self.now(), attack=attack, decay=decay, sustain=sustain, release=release,
+                         released_at=np.inf, min=min, max=max)
+
+    def ramp(self, target, start: float, end: float, duration: float, curve: str = "linear") -> Modulation:
+        """
+        Move a target from one value to another over a period of time.
+
+        Args:
+            target: The target (see resolve_target())
+            start: The initial value.
+            end: The final value.
+            duration: The duration of the ramp.
+            curve: "linear", or "exponential" for a constant ratio of change per unit
+                   time (for example, for frequencies). Exponential ramps require
+                   start and end values of the same sign.
+
+        Returns:
+            A Modulation, whose wait() method blocks until the ramp is complete.
+        """
+        if curve not in ("linear", "exponential"):
+            raise ValueError("Invalid value for 'curve': %s" % curve)
+        if curve == "exponential" and not start * end > 0:
+            raise ValueError("Exponential ramps require start and end values of the same sign")
+        return self._add(Modulation, self.ramps, target,
+                         start=self.now(), duration=duration, exponential=float(curve == "exponential"),
+                         **{"from": start, "to": end})
+
+    def release(self, envelope: Envelope) -> None:
+        """ Begin the release stage of an envelope. """
+        now = self.now()
+        with self.lock:
+            if envelope in self.envelopes.modulations:
+                index = self.envelopes.modulations.index(envelope)
+                released_at = self.envelopes.data["released_at"]
+                released_at[index] = min(released_at[index], now)
+
+    def remove(self, modulation: Modulation) -> None:
+        """ Stop a modulation source, leaving its target at its last value. """
+        with self.lock:
+            if self.targets.get((modulation.address, modulation.args)) is modulation:
+                del self.targets[(modulation.address, modulation.args)]
+                modulation.bank.remove(modulation)
+        modulation.done.set()
+
+    def clear(self) -> None:
+        """ Stop all modulation sources. """
+        for modulation in list(self.targets.values()):
+            self.remove(modulation)
+
+    def _add(self, cls, bank: Bank, target, **values) -> Modulation:
+        address, args = resolve_target(target)
+        modulation = cls(self, bank, address, args)
+        with self.lock:
+            previous = self.targets.pop((address, args), None)
+            if previous is not None:
+                previous.bank.remove(previous)
+            bank.add(modulation, **values)
+            self.targets[(address, args)] = modulation
+        if previous is not None:
+            previous.done.set()
+        return modulation
+
+    #------------------------------------------------------------------------
+    # Evaluation
+    #------------------------------------------------------------------------
+
+    def tick(self) -> int:
+        """
+        Evaluate every source, and send the values that have changed. Called
+        at the control rate by the scheduler thread, but can also be called
+        directly to drive automation from another loop.
+
+        Returns:
+            The number of values sent.
+        """
+        t = self.now()
+        addresses = []
+        messages = []
+        finished = []
+        with self.lock:
+            for bank in self.banks:
+                if not bank.modulations:
+                    continue
+                values, done = bank.evaluate(t)
+                last = bank.data["last"]
+                changed = ~(np.abs(values - last) <= self.epsilon)
+                self.unchanged += len(values) - np.count_nonzero(changed)
+                last[changed] = values[changed]
+                for index in np.flatnonzero(changed).tolist():
+                    modulation = bank.modulations[index]
+                    addresses.append(modulation.address)
+                    messages.append(encode_message(modulation.address, modulation.args + (float(values[index]),)))
+                if done.any():
+                    finished.extend(bank.modulations[index] for index in np.flatnonzero(done).tolist())
+
+        if messages:
+            #------------------------------------------------------------------------
+            # Sent via send_encoded() so that pending coalesced writes are sent
+            # first, any enclosing bundle is respected, and metrics are recorded.
+            #------------------------------------------------------------------------
+            self.datagrams += self.live.send_encoded(addresses, messages)
+            self.sent += len(messages)
+        for modulation in finished:
+            self.remove(modulation)
+        return len(messages)
+
+    #------------------------------------------------------------------------
+    # Scheduling
+    #------------------------------------------------------------------------
+
+    def start(self) -> None:
+        """ Start ticking at the control rate, on a background thread. """
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="pylive-automation", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """ Stop ticking. Sources are kept, and resume if the automation is restarted. """
+        self.stop_event.set()
+        if self.thread is not None:
+            if self.thread is not threading.current_thread():
+                self.thread.join()
+            self.thread = None
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: The number of sources, ticks, overruns (ticks that took longer
+                  than the tick interval) and skipped ticks; the mean, 99th
+                  percentile and maximum lateness of recent ticks relative to
+                  their deadlines, and mean tick duration, in seconds; and the
+                  number of values sent and dropped as unchanged, and datagrams sent.
+        """
+        lateness = np.array(self.lateness)
+        durations = np.array(self.durations)
+        return {
+            "sources": len(self.targets),
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "jitter_mean": float(lateness.mean()) if len(lateness) else 0.0,
+            "jitter_p99": float(np.percentile(lateness, 99)) if len(lateness) else 0.0,
+            "jitter_max": float(lateness.max()) if len(lateness) else 0.0,
+            "tick_mean": float(durations.mean()) if len(durations) else 0.0,
+            "sent": self.sent,
+            "unchanged": self.unchanged,
+            "datagrams": self.datagrams,
+        }
+
+    def _run(self):
+        interval = 1.0 / self.rate
+        deadline = time.monotonic() + interval
+        while not self.stop_event.wait(max(0.0, deadline - time.monotonic())):
+            woke_at = time.monotonic()
+            try:
+                self.tick()
+            except Exception as e:
+                self.logger.warning("Couldn't send automation: %s" % e)
+            finished_at = time.monotonic()
+
+            self.ticks += 1
+            self.lateness.append(woke_at - deadline)
+            self.durations.append(finished_at - woke_at)
+            if finished_at - woke_at > interval:
+                self.overruns += 1
+
+            #------------------------------------------------------------------------
+            # Schedule against absolute deadlines. If whole ticks have been
+            # missed, skip them rather than sending a burst of ticks to catch up.
+            #------------------------------------------------------------------------
+            deadline += interval
+            if deadline < finished_at:
+                missed = math.ceil((finished_at - deadline) / interval)
+                self.skipped += missed
+                deadline += missed * interval
@@ -0,0 +1,16 @@
+"""
+Benchmarks for pylive, run against an emulated Live (see live.emulator).
+
+Run the full suite, writing JSON results:
+
+    python3 -m live.bench -o results.json
+
+Each module can also be run standalone, e.g.:
+
+    python3 -m live.bench.scan
+    python3 -m live.bench.query
+    python3 -m live.bench.beat
+    python3 -m live.bench.save
+    python3 -m live.bench.decode
+    python3 -m live.bench.imports
+"""
@@ -0,0 +1,80 @@
+"""
+Run the pylive benchmark suite against an emulated Live, and write the
+results as JSON so that runs can be compared:
+
+    python3 -m live.bench -o results.json
+    python3 -m live.bench --quick --only scan query
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+
+from live.bench import scan, query, beat, save, decode, imports
+
+BENCHMARKS = ["scan", "query", "beat", "save", "decode", "imports"]
+
+def run(only: list = None, quick: bool = False, latency: float = 0.0) -> dict:
+    """
+    Run each benchmark in turn.
+
+    Args:
+        only: Names of the benchmarks to run. Defaults to all.
+        quick: If True, use smaller sets and fewer samples.
+        latency: Emulated reply latency, in seconds.
+
+    Returns:
+        dict: The results of each benchmark, plus metadata describing the run.
+    """
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+            "latency": latency,
+        }
+    }
+    for name in only or BENCHMARKS:
+        logging.getLogger(__name__).info("Running benchmark: %s" % name)
+        t0 = time.perf_counter()
+        if name == "scan":
+            results[name] = scan.run([10, 100] if quick else None, repeats=1 if quick else 3, latency=latency)
+        elif name == "query":
+            results[name] = query.run(200 if quick else 2000, 0.2 if quick else 1.0, latency=latency)
+        elif name == "beat":
+            results[name] = beat.run(100 if quick else 500)
+        elif name == "save":
+            results[name] = save.run([10, 100] if quick else None, repeats=1 if quick else 3)
+        elif name == "decode":
+            results[name] = decode.run(0.1 if quick else 0.5)
+        elif name == "imports":
+            results[name] = imports.run(1 if quick else 5)
+        else:
+            raise ValueError("Unknown benchmark: %s" % name)
+        results["meta"]["%s_duration_s" % name] = time.perf_counter() - t0
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pylive benchmark suite")
+    parser.add_argument("-o", "--output", help="Path to write JSON results to (default: stdout)")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="Benchmarks to run")
+    parser.add_argument("--quick", action="store_true", help="Use smaller sets and fewer samples")
+    parser.add_argument("-l", "--latency", type=float, default=0.0, help="Emulated reply latency, in seconds")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    results = run(args.only, args.quick, args.latency)
+    if args.output:
+        with open(args.output, "w") as fd:
+            json.dump(results, fd, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+if __name__ == "__main__":
+    main()
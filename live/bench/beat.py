@@ -0,0 +1,62 @@
+"""
+Benchmark of beat callback dispatch latency: the time from a beat message
+being sent by the emulator to the callback being called, for each of the
+callback executor modes.
+
+    python3 -m live.bench.beat
+"""
+
+import time
+import argparse
+import threading
+
+from live.bench.common import emulated_client, summarise
+
+def run(count: int = 500, interval: float = 0.002, modes: tuple = ("thread", "inline")) -> dict:
+    """
+    Args:
+        count: Number of beats to send.
+        interval: Interval between beats, in seconds.
+        modes: Callback executor modes to measure.
+
+    Returns:
+        dict: For each executor mode, dispatch latency percentiles in milliseconds,
+              and the number of beats that did not reach the callback.
+    """
+    results = {}
+    for mode in modes:
+        with emulated_client() as (emulator, query):
+            query.set_callback_executor(mode)
+            sent_at = {}
+            latencies = []
+            done = threading.Event()
+
+            def beat_callback(beat):
+                latencies.append(time.perf_counter() - sent_at[beat])
+                if beat == count - 1:
+                    done.set()
+
+            query.beat_callback = beat_callback
+            client = ("127.0.0.1", query.listen_port)
+            for beat in range(count):
+                sent_at[beat] = time.perf_counter()
+                emulator.send("/live/song/get/beat", (beat,), client)
+                time.sleep(interval)
+            done.wait(1.0)
+            results[mode] = summarise(latencies, 1000)
+            results[mode]["missed"] = count - len(latencies)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark beat callback latency")
+    parser.add_argument("-n", "--count", type=int, default=500, help="Number of beats")
+    parser.add_argument("-i", "--interval", type=float, default=0.002, help="Interval between beats, in seconds")
+    args = parser.parse_args()
+
+    print("%-10s %9s %9s %9s %9s %8s" % ("executor", "p50 (ms)", "p90", "p99", "max", "missed"))
+    for mode, result in run(args.count, args.interval).items():
+        print("%-10s %9.3f %9.3f %9.3f %9.3f %8d" % (mode, result["p50"], result["p90"], result["p99"],
+                                                     result["max"], result["missed"]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Helpers shared by the benchmarks.
+"""
+
+import math
+import time
+import contextlib
+
+def percentile(sorted_samples: list, q: float) -> float:
+    """
+    Returns the q'th percentile (0..100) of a sorted list of samples,
+    using the nearest-rank method.
+    """
+    if not sorted_samples:
+        return float("nan")
+    rank = max(1, int(math.ceil(q / 100.0 * len(sorted_samples))))
+    return sorted_samples[rank - 1]
+
+def summarise(samples: list, scale: float = 1.0) -> dict:
+    """
+    Summarise a list of samples (e.g. latencies in seconds), multiplied by scale
+    (e.g. 1000 to report milliseconds).
+    """
+    ordered = sorted(sample * scale for sample in samples)
+    return {
+        "count": len(ordered),
+        "min": ordered[0] if ordered else float("nan"),
+        "mean": sum(ordered) / len(ordered) if ordered else float("nan"),
+        "p50": percentile(ordered, 50),
+        "p90": percentile(ordered, 90),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1] if ordered else float("nan"),
+    }
+
+@contextlib.contextmanager
+def emulated_client(**kwargs):
+    """
+    Start a LiveEmulator on a free port, and yield it along with a Query
+    object connected to it. kwargs are passed to LiveEmulator.
+    """
+    from live.query import Query
+    from live.emulator import LiveEmulator
+
+    with LiveEmulator(port=0, **kwargs) as emulator:
+        query = Query(emulator.address, listen_port=0)
+        try:
+            yield emulator, query
+        finally:
+            query.stop()
+
+def best_of(fn, repeats: int) -> float:
+    """
+    Call fn repeatedly, and return the shortest duration, in seconds.
+    """
+    durations = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - t0)
+    return min(durations)
@@ -0,0 +1,73 @@
+"""
+Microbenchmark comparing the throughput of the generic OSC parser with the
+FastDecoder path, for the inbound messages that Query registers by default.
+
+    python3 -m live.bench.decode
+"""
+
+import time
+import argparse
+
+from live.osc import encode_message, FastDecoder
+from pythonosc.osc_packet import OscPacket
+
+PACKETS = {
+    "beat": ("/live/song/get/beat", (42,)),
+    "parameter": ("/live/device/get/parameter/value", (1, 0, 12, 0.5)),
+    "unregistered": ("/live/clip/get/name", (1, 0, "Verse")),
+}
+
+def decode_generic(data: bytes):
+    for timed_message in OscPacket(data).messages:
+        message = timed_message.message
+        return message.address, tuple(message.params)
+
+def decode_fast(decoder: FastDecoder, data: bytes):
+    decoded = decoder.decode(data)
+    if decoded is None:
+        return decode_generic(data)
+    return decoded
+
+def measure(fn, data: bytes, duration: float) -> float:
+    """
+    Returns:
+        The number of packets decoded per second.
+    """
+    count = 0
+    t0 = time.perf_counter()
+    deadline = t0 + duration
+    while True:
+        for _ in range(1000):
+            fn(data)
+        count += 1000
+        t1 = time.perf_counter()
+        if t1 >= deadline:
+            return count / (t1 - t0)
+
+def run(duration: float = 0.5) -> dict:
+    decoder = FastDecoder()
+    decoder.register("/live/song/get/beat", "i")
+    decoder.register("/live/device/get/parameter/value", "iiif")
+
+    results = {}
+    for name, (address, args) in PACKETS.items():
+        data = encode_message(address, args)
+        assert decode_fast(decoder, data) == decode_generic(data)
+        results[name] = {
+            "generic_pps": measure(decode_generic, data, duration),
+            "fast_pps": measure(lambda data: decode_fast(decoder, data), data, duration),
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark inbound OSC decoding")
+    parser.add_argument("-d", "--duration", type=float, default=0.5, help="Duration of each measurement, in seconds")
+    args = parser.parse_args()
+
+    print("%-14s %14s %14s %8s" % ("packet", "generic (pps)", "fast (pps)", "speedup"))
+    for name, result in run(args.duration).items():
+        print("%-14s %14.0f %14.0f %7.1fx" % (name, result["generic_pps"], result["fast_pps"],
+                                               result["fast_pps"] / result["generic_pps"]))
+
+if __name__ == "__main__":
+    main()
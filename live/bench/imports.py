@@ -0,0 +1,67 @@
+"""
+Benchmark of the start-up cost of pylive: the time to `import live` in a
+fresh interpreter, and to create a Set and send a first command.
+
+    python3 -m live.bench.imports
+"""
+
+import sys
+import json
+import argparse
+import subprocess
+
+#------------------------------------------------------------------------
+# Modules that are slow to import, and which `import live` should not load.
+#------------------------------------------------------------------------
+HEAVY_MODULES = ["numpy", "asyncio", "pythonosc", "concurrent.futures", "subprocess", "pickle", "argparse"]
+
+SCRIPT = """
+import sys, json, time, threading
+t0 = time.perf_counter()
+import live
+t1 = time.perf_counter()
+set = live.Set(client=live.Query(("127.0.0.1", 9), listen_port=0))
+set.stop_playing()
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_s": t1 - t0,
+    "first_cmd_s": t2 - t1,
+    "threads": threading.active_count(),
+    "listening": set.live.is_listening,
+    "modules": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+def run(repeats: int = 5) -> dict:
+    """
+    Returns:
+        dict: The best import time and time to create a Set and send a first
+              command, in seconds, plus the number of threads running and heavy
+              modules loaded afterwards.
+    """
+    samples = []
+    for _ in range(repeats):
+        output = subprocess.check_output([sys.executable, "-c", SCRIPT])
+        samples.append(json.loads(output))
+    return {
+        "import_s": min(sample["import_s"] for sample in samples),
+        "first_cmd_s": min(sample["first_cmd_s"] for sample in samples),
+        "threads": samples[-1]["threads"],
+        "listening": samples[-1]["listening"],
+        "heavy_modules": samples[-1]["modules"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the time to import pylive")
+    parser.add_argument("-r", "--repeats", type=int, default=5, help="Number of repeats (best is reported)")
+    args = parser.parse_args()
+
+    results = run(args.repeats)
+    print("import live:       %8.1fms" % (results["import_s"] * 1000))
+    print("Set() + first cmd: %8.1fms" % (results["first_cmd_s"] * 1000))
+    print("threads running:   %8d" % results["threads"])
+    print("listening:         %8s" % results["listening"])
+    print("heavy modules:     %s" % (", ".join(results["heavy_modules"]) or "none"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark of query round-trip latency, pipelined query throughput, and
+command throughput for parameter automation, against an emulated Live.
+
+    python3 -m live.bench.query
+"""
+
+import time
+import argparse
+
+from live.bench.common import emulated_client, summarise
+
+def run(count: int = 2000, duration: float = 1.0, latency: float = 0.0, jitter: float = 0.0) -> dict:
+    """
+    Args:
+        count: Number of queries for each latency measurement.
+        duration: Duration of each throughput measurement, in seconds.
+        latency: Emulated reply latency, in seconds.
+        jitter: Emulated reply jitter, in seconds.
+
+    Returns:
+        dict: Round-trip latency percentiles (in milliseconds) of sequential queries,
+              throughput of pipelined queries, and throughput of parameter commands.
+    """
+    results = {}
+    with emulated_client(num_tracks=64, latency=latency, jitter=jitter) as (emulator, query):
+        for name, msg, args in (("song_tempo", "/live/song/get/tempo", ()),
+                                ("track_volume", "/live/track/get/volume", (1,)),
+                                ("parameter_value", "/live/device/get/parameter/value", (1, 0, 1))):
+            samples = []
+            for _ in range(count):
+                t0 = time.perf_counter()
+                query.query(msg, args)
+                samples.append(time.perf_counter() - t0)
+            results["rtt_%s_ms" % name] = summarise(samples, 1000)
+
+        #------------------------------------------------------------------------
+        # Pipelined queries: volumes of all 64 tracks per batch.
+        #------------------------------------------------------------------------
+        batch = [("/live/track/get/volume", (n,)) for n in range(64)]
+        batches = 0
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < duration:
+            query.query_many(batch)
+            batches += 1
+        results["query_many_qps"] = batches * len(batch) / (time.perf_counter() - t0)
+
+        #------------------------------------------------------------------------
+        # Parameter automation: sweep one parameter per device on every track.
+        # Delivery is the fraction of commands that reached the emulator.
+        #------------------------------------------------------------------------
+        received = emulator.received
+        sent = 0
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < duration:
+            for track_index in range(64):
+                query.cmd("/live/device/set/parameter/value", (track_index, 0, 1, (sent % 100) / 100.0))
+                sent += 1
+        elapsed = time.perf_counter() - t0
+        query.query("/live/song/get/tempo")
+        results["cmd_per_s"] = sent / elapsed
+        results["cmd_delivered"] = (emulator.received - received - 1) / sent
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark query latency and command throughput")
+    parser.add_argument("-n", "--count", type=int, default=2000, help="Number of queries per latency measurement")
+    parser.add_argument("-d", "--duration", type=float, default=1.0, help="Duration of each throughput measurement, in seconds")
+    parser.add_argument("-l", "--latency", type=float, default=0.0, help="Emulated reply latency, in seconds")
+    parser.add_argument("-j", "--jitter", type=float, default=0.0, help="Emulated reply jitter, in seconds")
+    args = parser.parse_args()
+
+    results = run(args.count, args.duration, args.latency, args.jitter)
+    print("%-28s %9s %9s %9s %9s" % ("round trip (ms)", "p50", "p90", "p99", "max"))
+    for name, result in results.items():
+        if name.startswith("rtt_"):
+            print("%-28s %9.3f %9.3f %9.3f %9.3f" % (name[4:-3], result["p50"], result["p90"], result["p99"], result["max"]))
+    print("query_many: %.0f queries/s" % results["query_many_qps"])
+    print("cmd: %.0f commands/s (%.1f%% delivered)" % (results["cmd_per_s"], results["cmd_delivered"] * 100))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark of Set.save() and Set.load() for scanned sets of increasing size.
+
+    python3 -m live.bench.save
+"""
+
+import os
+import argparse
+import tempfile
+
+from live.classes.set import Set
+from live.bench.common import emulated_client, best_of
+
+DEFAULT_TRACK_COUNTS = [10, 100, 1000, 2000]
+
+def run(track_counts: list = None, repeats: int = 3) -> dict:
+    """
+    Returns:
+        dict: For each number of tracks, the best save and load times in seconds,
+              and the size of the saved file in bytes.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tempdir:
+        filename = os.path.join(tempdir, "set")
+        for num_tracks in track_counts or DEFAULT_TRACK_COUNTS:
+            with emulated_client(num_tracks=num_tracks) as (emulator, query):
+                set = Set(client=query)
+                set.scan(mode="file")
+                loaded = Set(client=query)
+                results[str(num_tracks)] = {
+                    "save_s": best_of(lambda: set.save(filename), repeats),
+                    "load_s": best_of(lambda: loaded.load(filename), repeats),
+                    "bytes": os.path.getsize("%s.pickle" % filename),
+                }
+                assert len(loaded.tracks) == num_tracks
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Set save and load")
+    parser.add_argument("-t", "--tracks", type=int, nargs="+", default=DEFAULT_TRACK_COUNTS, help="Numbers of tracks")
+    parser.add_argument("-r", "--repeats", type=int, default=3, help="Number of repeats (best is reported)")
+    args = parser.parse_args()
+
+    print("%8s %12s %12s %12s" % ("tracks", "save (ms)", "load (ms)", "bytes"))
+    for num_tracks, result in run(args.tracks, args.repeats).items():
+        print("%8s %12.1f %12.1f %12d" % (num_tracks, result["save_s"] * 1000, result["load_s"] * 1000, result["bytes"]))
+
+if __name__ == "__main__":
+    main()
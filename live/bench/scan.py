@@ -0,0 +1,48 @@
+"""
+Benchmark of Set scanning via the network and via the exported song
+structure file, against emulated sets of increasing size.
+
+    python3 -m live.bench.scan --tracks 10 100 1000
+"""
+
+import argparse
+
+from live.classes.set import Set
+from live.bench.common import emulated_client, best_of
+
+DEFAULT_TRACK_COUNTS = [10, 100, 500, 1000, 2000]
+
+def run(track_counts: list = None, num_scenes: int = 8, repeats: int = 3, latency: float = 0.0) -> dict:
+    """
+    Returns:
+        dict: For each number of tracks, the best time (in seconds) to scan via the
+              network and via file, plus the number of clips and devices scanned.
+    """
+    results = {}
+    for num_tracks in track_counts or DEFAULT_TRACK_COUNTS:
+        with emulated_client(num_tracks=num_tracks, num_scenes=num_scenes, latency=latency) as (emulator, query):
+            set = Set(client=query)
+            result = {
+                "network_s": best_of(lambda: set.scan(mode="network"), repeats),
+                "file_s": best_of(lambda: set.scan(mode="file"), repeats),
+            }
+            assert len(set.tracks) == num_tracks
+            result["clips"] = sum(len(track.active_clips) for track in set.tracks)
+            result["devices"] = sum(len(track.devices) for track in set.tracks)
+            results[str(num_tracks)] = result
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Set scanning")
+    parser.add_argument("-t", "--tracks", type=int, nargs="+", default=DEFAULT_TRACK_COUNTS, help="Numbers of tracks")
+    parser.add_argument("-r", "--repeats", type=int, default=3, help="Number of repeats (best is reported)")
+    parser.add_argument("-l", "--latency", type=float, default=0.0, help="Emulated reply latency, in seconds")
+    args = parser.parse_args()
+
+    print("%8s %8s %8s %14s %14s" % ("tracks", "clips", "devices", "network (ms)", "file (ms)"))
+    for num_tracks, result in run(args.tracks, repeats=args.repeats, latency=args.latency).items():
+        print("%8s %8d %8d %14.1f %14.1f" % (num_tracks, result["clips"], result["devices"],
+                                              result["network_s"] * 1000, result["file_s"] * 1000))
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,91 @@
+import math
 import logging
+from typing import TYPE_CHECKING
 
 import live.query
 import live.object
 from live.constants import *
 from live.query import Query
+from live.object import getter_address
+from live.osc import encode_message, encode_notes, max_notes_per_message, SAFE_DATAGRAM_SIZE, BUNDLE_HEADER
+
+if TYPE_CHECKING:
+    import numpy
+    from live.async_query import AsyncQuery
+
+#------------------------------------------------------------------------
+# The fields of the numpy structured arrays used for MIDI notes.
+#------------------------------------------------------------------------
+NOTE_DTYPE = [("pitch", "i4"), ("start", "f8"), ("duration", "f8"), ("velocity", "i4"), ("mute", "?")]
+
+#------------------------------------------------------------------------
+# When adding many notes, wait for Live to process each batch of this many
+# datagrams before sending more, so as not to overflow its receive buffer.
+#------------------------------------------------------------------------
+MAX_NOTE_DATAGRAMS_IN_FLIGHT = 64
+
+#------------------------------------------------------------------------
+# A clip's notes are read in windows of this many beats, queried together,
+# as the notes of a long clip may not fit within a single reply.
+#------------------------------------------------------------------------
+NOTE_QUERY_BEATS = 16.0
+
+#------------------------------------------------------------------------
+# Notes can only be removed from a clip by pitch and time region. To remove
+# the notes at a given pitch and start time, a region of at least this width
+# (in beats) is removed, centred on the start time. Later in long clips, the
+# region is widened to a few steps of float32 precision, with which start
+# times are sent, so that it cannot be rounded away.
+#------------------------------------------------------------------------
+NOTE_TIME_EPSILON = 1e-4
+
+#------------------------------------------------------------------------
+# The overhead of a bundle containing a single message: its header, timetag,
+# and the size of the message.
+#------------------------------------------------------------------------
+BUNDLE_OVERHEAD = len(BUNDLE_HEADER) + 8 + 4
+
+def note_array(notes) -> "numpy.ndarray":
+    """
+    Convert notes to a numpy structured array with fields pitch, start, duration,
+    velocity and mute (see NOTE_DTYPE).
+
+    Args:
+        notes: A list of (pitch, start, duration, velocity, mute) tuples, or a
+               structured array with (at least) fields pitch, start, duration
+               and velocity.
+    """
+    import numpy as np
+
+    if isinstance(notes, np.ndarray) and notes.dtype.names is not None:
+        array = np.zeros(len(notes), dtype=NOTE_DTYPE)
+        for field in array.dtype.names:
+            if field in notes.dtype.names:
+                array[field] = notes[field]
+            elif field != "mute":
+                raise ValueError("Notes have no field '%s'" % field)
+        return array
+    return np.array([tuple(note) for note in notes], dtype=NOTE_DTYPE)
+
+def make_getter(class_identifier, prop, mirrored: bool = True):
+    address = "/live/%s/get/%s" % (class_identifier, prop)
 
-def make_getter(class_identifier, prop):
     def fn(self):
-        return self.live.query("/live/%s/get/%s" % (class_identifier, prop), (self.track.index, self.index,))[2]
+        if mirrored and self.set.caching:
+            return self.live.mirror.get(address, (self.track.index, self.index))[0]
+        return self.live.query(address, (self.track.index, self.index,))[2]
 
+    fn.address = address
     return fn
 
 def make_setter(class_identifier, prop):
+    address = "/live/%s/set/%s" % (class_identifier, prop)
+    getter_address = "/live/%s/get/%s" % (class_identifier, prop)
+
     def fn(self, value):
-        self.live.cmd("/live/%s/set/%s" % (class_identifier, prop), (self.track.index, self.index, value))
+        self.live.cmd(address, (self.track.index, self.index, value))
+        if self.set.caching:
+            self.live.mirror.update(getter_address, (self.track.index, self.index), (value,))
 
     return fn
 
@@ -32,17 +104,26 @@ class Clip:
             length: Length of the clip, in beats
         """
         self.track = track
-        self.set = self.track.set
         self.index = index
         self.name = name
         self.length = length
         self.state = CLIP_STATUS_STOPPED
         self.logger = logging.getLogger(__name__)
-        # self.live = Query()
+
+        #------------------------------------------------------------------------
+        # The clip's notes as last read or written, used by sync_notes().
+        #------------------------------------------------------------------------
+        self._notes = None
+
+    @property
+    def set(self):
+        """ Returns the Set that this clip resides within. """
+        return self.track.set
 
     @property
-    def live(self):
-        return Query()
+    def live(self) -> Query:
+        """ The Query object used to communicate with Live, shared with the containing Set. """
+        return self.track.live
 
     def __str__(self):
         name = ": %s" % self.name if self.name else ""
@@ -69,6 +150,7 @@ class Clip:
         self.index = d["index"]
         self.name = d["name"]
         self.length = d["length"]
+        self._notes = None
 
     def play(self):
         """
@@ -115,6 +197,149 @@ class Clip:
         """
         self.live.cmd("/live/clip/add/notes", (self.track.index, self.index, pitch, start_time, duration, velocity, mute))
 
+    def add_notes(self, notes) -> None:
+        """
+        Add many MIDI notes to this clip. Notes are packed into as few messages
+        as fit within safely-sized datagrams. Requires numpy.
+
+            clip.add_notes([(60, 0.0, 0.5, 100, False), (64, 0.5, 0.5, 100, False)])
+
+        Args:
+            notes: A list of (pitch, start_time, duration, velocity, mute) tuples, or
+                   a numpy structured array with fields pitch, start, duration,
+                   velocity and (optionally) mute.
+        """
+        import numpy as np
+
+        notes = note_array(notes)
+        self._send_notes("/live/clip/add/notes", self._encode_notes(notes))
+        if self._notes is not None:
+            self._notes = np.concatenate((self._notes, notes))
+
+    def get_notes(self) -> "numpy.ndarray":
+        """
+        Query the MIDI notes of this clip. Requires numpy.
+
+        Returns:
+            A numpy structured array of notes, with fields pitch, start, duration,
+            velocity and mute (see NOTE_DTYPE), ordered by start time and pitch.
+        """
+        import numpy as np
+
+        #------------------------------------------------------------------------
+        # The final window extends far beyond the end of the clip, to include
+        # any notes that start after its end.
+        #------------------------------------------------------------------------
+        args = (self.track.index, self.index)
+        length = self.live.query("/live/clip/get/length", args)[2]
+        window_count = max(1, math.ceil(length / NOTE_QUERY_BEATS))
+        queries = [("/live/clip/get/notes", args + (0, 128, window * NOTE_QUERY_BEATS,
+                                                    NOTE_QUERY_BEATS if window < window_count - 1 else 1e6))
+                   for window in range(window_count)]
+
+        values = [value for rv in self.live.query_many(queries) for value in rv[2:]]
+        notes = np.array([tuple(values[offset:offset + 5]) for offset in range(0, len(values), 5)], dtype=NOTE_DTYPE)
+        notes = notes[np.lexsort((notes["pitch"], notes["start"]))]
+        self._notes = notes.copy()
+        return notes
+
+    def sync_notes(self, notes) -> int:
+        """
+        Update the notes of this clip to the given notes, sending only the changes
+        since they were last read or written, rather than rewriting the clip.
+        If the clip's notes have not previously been read, they are read first.
+        Small edits are sent as a single bundle, so are applied by Live at once.
+
+        Requires numpy. As the clip's notes are cached, changes made in Live (or
+        via other Clip objects) are not seen; call get_notes() to refresh them.
+
+        Args:
+            notes: The new notes, as accepted by add_notes().
+
+        Returns:
+            The number of notes that were removed or added.
+        """
+        import numpy as np
+
+        notes = note_array(notes)
+        if self._notes is None:
+            self.get_notes()
+
+        #------------------------------------------------------------------------
+        # Notes are compared at the precision with which they are sent to Live,
+        # and grouped by pitch and start time, which is the finest granularity
+        # at which they can be removed.
+        #------------------------------------------------------------------------
+        def group(notes):
+            groups = {}
+            canonical = notes.copy()
+            for field in ("start", "duration"):
+                canonical[field] = canonical[field].astype("f4")
+            for index, note in enumerate(canonical.tolist()):
+                groups.setdefault(note[:2], []).append((note, index))
+            return {key: sorted(group) for key, group in groups.items()}
+
+        old_groups = group(self._notes)
+        new_groups = group(notes)
+        changed = [key for key in old_groups.keys() | new_groups.keys()
+                   if [note for note, _ in old_groups.get(key, [])] != [note for note, _ in new_groups.get(key, [])]]
+        if not changed:
+            return 0
+
+        args = (self.track.index, self.index)
+        removals = []
+        for pitch, start in changed:
+            if (pitch, start) in old_groups:
+                width = max(NOTE_TIME_EPSILON, 4 * float(np.spacing(np.float32(start))))
+                removals.append(encode_message("/live/clip/remove/notes",
+                                               args + (pitch, 1, float(start - width / 2), width)))
+        added = sorted(index for key in changed for _, index in new_groups.get(key, []))
+        additions = self._encode_notes(notes[added], max_size=SAFE_DATAGRAM_SIZE - BUNDLE_OVERHEAD)
+        addresses = ["/live/clip/remove/notes"] * len(removals) + ["/live/clip/add/notes"] * len(additions)
+        self._send_notes(addresses, removals + additions, bundle=True)
+        self._notes = notes
+        return sum(len(old_groups[key]) for key in changed if key in old_groups) + len(added)
+
+    def _encode_notes(self, notes, max_size: int = SAFE_DATAGRAM_SIZE) -> list[bytes]:
+        address = "/live/clip/add/notes"
+        args = (self.track.index, self.index)
+        notes_per_message = max_notes_per_message(address, len(args), max_size)
+        return [encode_notes(address, args, notes[offset:offset + notes_per_message])
+                for offset in range(0, len(notes), notes_per_message)]
+
+    def _send_notes(self, address, messages: list[bytes], bundle: bool = False) -> None:
+        #------------------------------------------------------------------------
+        # The address, or a list of addresses with one per message, is passed
+        # to send_encoded() for metrics.
+        #------------------------------------------------------------------------
+        addresses = [address] * len(messages) if isinstance(address, str) else address
+        for offset in range(0, len(messages), MAX_NOTE_DATAGRAMS_IN_FLIGHT):
+            if offset > 0:
+                #------------------------------------------------------------------------
+                # Live processes messages in order, so the reply to a query
+                # indicates that the previous batch has been received.
+                #------------------------------------------------------------------------
+                self.live.query("/live/clip/get/length", (self.track.index, self.index))
+            batch = slice(offset, offset + MAX_NOTE_DATAGRAMS_IN_FLIGHT)
+            self.live.send_encoded(addresses[batch], messages[batch], bundle=bundle)
+
+    async def aget(self, prop: str, client: "AsyncQuery" = None):
+        """
+        Awaitable counterpart to the property getters, for use with asyncio:
+
+            is_playing = await clip.aget("is_playing")
+
+        Args:
+            prop: The name of the property to query (e.g. "is_playing")
+            client: The AsyncQuery to use. Defaults to a shared client for the running event loop.
+        """
+        address = getter_address(type(self), prop)
+        if client is None:
+            from live.async_query import get_async_client
+            client = await get_async_client()
+        rv = await client.query(address, (self.track.index, self.index))
+        return rv[2]
+
     pitch_coarse = property(fget=make_getter("clip", "pitch_coarse"),
                             fset=make_setter("clip", "pitch_coarse"),
                             doc="Coarse pitch bend")
@@ -123,14 +348,14 @@ class Clip:
                           fset=make_setter("clip", "is_playing"),
                           doc="True if the clip is playing, False otherwise")
 
-    is_midi_clip = property(fget=make_getter("clip", "is_midi_clip"),
+    is_midi_clip = property(fget=make_getter("clip", "is_midi_clip", mirrored=False),
                             fset=make_setter("clip", "is_midi_clip"),
                             doc="True if the clip is a MIDI clip, False otherwise")
 
-    is_audio_clip = property(fget=make_getter("clip", "is_audio_clip"),
+    is_audio_clip = property(fget=make_getter("clip", "is_audio_clip", mirrored=False),
                              fset=make_setter("clip", "is_audio_clip"),
                              doc="True if the clip is an audio clip, False otherwise")
 
-    file_path = property(fget=make_getter("clip", "file_path"),
+    file_path = property(fget=make_getter("clip", "file_path", mirrored=False),
                          fset=make_setter("clip", "file_path"),
                          doc="Return the clip's file_path attribute")
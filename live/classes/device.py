@@ -1,13 +1,46 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 from .track import Track
+from ..osc import encode_message, encode_float_array
+from ..profiling import span
 if TYPE_CHECKING:
+    import numpy
     from .set import Set
     from .parameter import Parameter
     
 
 import logging
 
+def read_device_parameters(devices: list[Device], timeout: float = None) -> list[numpy.ndarray]:
+    """
+    Query the values of all parameters of a list of devices. The queries are
+    pipelined, so reading any number of devices takes roughly one round trip.
+    The local values of the devices' Parameter objects are also updated.
+
+    Requires numpy.
+
+    Args:
+        devices: The devices to read, which must share a Query.
+        timeout: Deadline for the entire batch, in seconds.
+
+    Returns:
+        A float array of parameter values for each device, aligned with its parameters.
+    """
+    import numpy as np
+
+    if not devices:
+        return []
+    with span("read_parameters", devices=len(devices)):
+        replies = devices[0].live.query_many([("/live/device/get/parameters/value", (device.track.index, device.index))
+                                              for device in devices], timeout=timeout)
+        arrays = []
+        for device, reply in zip(devices, replies):
+            values = np.array(reply[2:], dtype=float)
+            for parameter, value in zip(device.parameters, reply[2:]):
+                parameter._value = value
+            arrays.append(values)
+    return arrays
+
 class Device:
     """
     Represents an instrument or audio effect residing within a Track.
@@ -34,10 +67,16 @@ class Device:
         self.name = name
         self.parameters: list[Parameter] = []
         self.logger = logging.getLogger(__name__)
+        self._ranges = None
 
     def __str__(self):
         return "Device (%d,%d): %s" % (self.track.index, self.index, self.name)
 
+    @property
+    def live(self):
+        """ The Query object used to communicate with Live, shared with the containing Set. """
+        return self.track.live
+
     def __getstate__(self):
         return {
             "track": self.track,
@@ -51,6 +90,7 @@ class Device:
         self.index = d["index"]
         self.name = d["name"]
         self.parameters = d["parameters"]
+        self._ranges = None
 
     @property
     def set(self) -> Set:
@@ -59,6 +99,79 @@ class Device:
         """
         return self.track.set
 
+    def read_parameters(self) -> numpy.ndarray:
+        """
+        Query the values of all of this device's parameters in a single round trip,
+        via /live/device/get/parameters/value. Requires numpy.
+
+        Returns:
+            A float array of parameter values, aligned with self.parameters.
+        """
+        return read_device_parameters([self])[0]
+
+    def write_parameters(self, values) -> None:
+        """
+        Set the values of many of this device's parameters at once. Values are
+        clamped to each parameter's range, and quantized parameters are rounded
+        to the nearest integer. Requires numpy.
+
+            device.write_parameters(numpy.random.uniform(size=len(device.parameters)))
+            device.write_parameters({1: 0.5, 4: 0.25})
+
+        If every parameter is given a value, they are sent in a single
+        /live/device/set/parameters/value message; otherwise, a bundle of
+        /live/device/set/parameter/value messages is sent.
+
+        Args:
+            values: An array of values aligned with self.parameters, in which NaN
+                    leaves a parameter unchanged, or a dict of parameter index to value.
+        """
+        import numpy as np
+
+        mins, maxs, quantized = self._parameter_ranges()
+        if isinstance(values, dict):
+            array = np.full(len(self.parameters), np.nan)
+            array[list(values.keys())] = list(values.values())
+        else:
+            array = np.array(values, dtype=float)
+            if array.shape != mins.shape:
+                raise ValueError("Expected %d values, got %d" % (len(mins), len(array)))
+
+        array = np.clip(array, mins, maxs)
+        array[quantized] = np.round(array[quantized])
+        written = ~np.isnan(array)
+        if not written.any():
+            return
+
+        track_index = self.track.index
+        if written.all():
+            self.live.send_encoded("/live/device/set/parameters/value",
+                                   [encode_float_array("/live/device/set/parameters/value", (track_index, self.index), array)])
+        else:
+            indices = np.flatnonzero(written).tolist()
+            self.live.send_encoded("/live/device/set/parameter/value",
+                                   [encode_message("/live/device/set/parameter/value", (track_index, self.index, index, value))
+                                    for index, value in zip(indices, array[indices].tolist())])
+
+        for parameter, value, is_written in zip(self.parameters, array.tolist(), written.tolist()):
+            if is_written:
+                parameter._value = value
+
+    def _parameter_ranges(self) -> tuple:
+        #------------------------------------------------------------------------
+        # The ranges of the parameters as arrays, cached until the list of
+        # parameters changes.
+        #------------------------------------------------------------------------
+        import numpy as np
+
+        key = (id(self.parameters), len(self.parameters))
+        if self._ranges is None or self._ranges[0] != key:
+            mins = np.array([parameter.min for parameter in self.parameters], dtype=float)
+            maxs = np.array([parameter.max for parameter in self.parameters], dtype=float)
+            quantized = np.array([bool(parameter.is_quantized) for parameter in self.parameters], dtype=bool)
+            self._ranges = (key, (mins, maxs, quantized))
+        return self._ranges[1]
+
     def set_parameter(self, index: int, value: float) -> None:
         if type(index) == int:
             parameter = self.parameters[index]
@@ -1,9 +1,13 @@
 import logging
+from typing import TYPE_CHECKING
 import random
 from .device import Device
 from .track import Track
 from ..query import Query
 
+if TYPE_CHECKING:
+    from ..async_query import AsyncQuery
+
 class Parameter:
     """
     Represents a parameter of a Live device (either an instrument or
@@ -29,8 +33,9 @@ class Parameter:
         self.logger = logging.getLogger(__name__)
 
     @property
-    def live(self):
-        return Query()
+    def live(self) -> Query:
+        """ The Query object used to communicate with Live, shared with the containing Set. """
+        return self.device.track.live
 
     def __str__(self):
         return "Parameter (%d,%d,%d): %s (range %.3f-%.3f)" % (self.device.track.index, self.device.index, self.index, self.name, self.min, self.max)
@@ -55,22 +60,50 @@ class Parameter:
         Args:
             value (float): The value to set.
         """
+        #------------------------------------------------------------------------
+        # Continuous values are sent as floats, so that they are encoded via
+        # the cached message template for this parameter.
+        #------------------------------------------------------------------------
+        if not self.is_quantized:
+            value = float(value)
         self._value = value
         self.live.cmd("/live/device/set/parameter/value",
                       (self.device.track.index, self.device.index, self.index, value))
 
     def get_value(self) -> float:
         """
-        Query the value of this parameter.
+        Query the value of this parameter. To read all of a device's parameters
+        at once, use Device.read_parameters().
 
         Returns:
             The parameter's current value in Live.
         """
-        return self.live.query("/live/device/get/parameter/value",
-                               (self.device.track.index, self.device.index, self.index))
+        rv = self.live.query("/live/device/get/parameter/value",
+                             (self.device.track.index, self.device.index, self.index))
+        self._value = rv[3]
+        return rv[3]
 
     value = property(get_value, set_value, doc="Query or set the value of this parameter")
 
+    async def aget(self, prop: str = "value", client: "AsyncQuery" = None):
+        """
+        Awaitable counterpart to the value getter, for use with asyncio:
+
+            values = await asyncio.gather(*(parameter.aget() for parameter in device.parameters))
+
+        Args:
+            prop: The name of the property to query. Only "value" is supported.
+            client: The AsyncQuery to use. Defaults to a shared client for the running event loop.
+        """
+        if prop != "value":
+            raise AttributeError("Parameter has no queryable property '%s'" % prop)
+        if client is None:
+            from ..async_query import get_async_client
+            client = await get_async_client()
+        rv = await client.query("/live/device/get/parameter/value",
+                                (self.device.track.index, self.device.index, self.index))
+        return rv[3]
+
     def randomise(self) -> None:
         """
         Set the parameter's value to a uniformly random value within
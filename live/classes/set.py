@@ -2,36 +2,69 @@ import re
 import os
 import sys
 import math
-import glob
 import json
 import time
-import pickle
 import logging
-import tempfile
 import threading
-import subprocess
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from .clip import Clip
 from .track import Track
 from .group import Group
 from .scene import Scene
-from .device import Device
+from .device import Device, read_device_parameters
 from .parameter import Parameter
 from ..query import Query
+from ..clock import SongClock
+from ..profiling import span
+from ..object import getter_address
 from ..constants import CLIP_STATUS_STOPPED
 from ..exceptions import LiveIOError, LiveConnectionError
 
-def make_getter(class_identifier, prop):
-    # TODO: Replacement for name_cache
+if TYPE_CHECKING:
+    import numpy
+    from ..async_query import AsyncQuery
+
+def song_structure_path() -> str:
+    """
+    Returns the path of the JSON file that AbletonOSC writes the song structure to,
+    in response to /live/song/export/structure.
+    """
+    if sys.platform == "darwin":
+        #--------------------------------------------------------------------------------
+        # On macOS, tempfile.gettempdir() uses a process-specific directory.
+        # Use global temp dir (/tmp) as this is the directory used by AbletonOSC.
+        #--------------------------------------------------------------------------------
+        tempdir = "/tmp"
+    else:
+        import tempfile
+        tempdir = tempfile.gettempdir()
+    return os.path.join(tempdir, "abletonosc-song-structure.json")
+
+def make_getter(class_identifier, prop, mirrored: bool = True):
+    #--------------------------------------------------------------------------------
+    # If the Set's caching is enabled, properties that Live can listen for are
+    # read from the Query's PropertyMirror. Those that it can't, or that change
+    # too often to be worth listening for, are always queried.
+    #--------------------------------------------------------------------------------
+    address = "/live/%s/get/%s" % (class_identifier, prop)
+
     def fn(self):
-        return self.live.query("/live/%s/get/%s" % (class_identifier, prop))[0]
+        if mirrored and self.caching:
+            return self.live.mirror.get(address)[0]
+        return self.live.query(address)[0]
 
+    fn.address = address
     return fn
 
 def make_setter(class_identifier, prop):
+    address = "/live/%s/set/%s" % (class_identifier, prop)
+    getter_address = "/live/%s/get/%s" % (class_identifier, prop)
+
     def fn(self, value):
-        self.live.cmd("/live/%s/set/%s" % (class_identifier, prop), (value,))
+        self.live.cmd(address, (value,))
+        if self.caching:
+            self.live.mirror.update(getter_address, (), (value,))
 
     return fn
 
@@ -48,7 +81,7 @@ class Set:
     for its contents by calling the scan() method.
     """
 
-    def __init__(self, scan: bool = False):
+    def __init__(self, scan: bool = False, client: Optional[Query] = None):
         """
         Create a new Set object.
         If scan is True, automatically connects to Live and queries the full set of tracks,
@@ -56,6 +89,8 @@ class Set:
 
         Args:
             scan: If True, automatically scans the contents of the set.
+            client: The Query object used to communicate with Live. Defaults to
+                    Query.default(); specify a client to control another Live instance.
         """
         # --------------------------------------------------------------------------
         # Indicates whether the set has been synchronised with Live
@@ -64,10 +99,10 @@ class Set:
 
         # --------------------------------------------------------------------------
         # Set caching to True to avoid re-querying properties such as tempo each
-        # time they are requested. Increases efficiency in cases where no other
-        # processes are going to modify Live's state.
+        # time they are requested. Properties are then mirrored locally, and kept
+        # up to date by listening for changes in Live (see live.mirror).
         # --------------------------------------------------------------------------
-        self.caching = False
+        self._caching = False
 
         # --------------------------------------------------------------------------
         # For batch queries, limit the max number of tracks to query.
@@ -81,18 +116,24 @@ class Set:
         self._add_mutexes()
 
         self.logger = logging.getLogger(__name__)
-        self.live = Query()
+        self.live = client if client is not None else Query.default()
 
         self.groups: list[Group] = []
         self.tracks: list[Track] = []
         self.scenes: list[Scene] = []
         self.reset()
 
+        # --------------------------------------------------------------------------
+        # The beat listener is started on demand, by wait_for_next_beat() or
+        # set_beat_callback(), so that sets which don't use beats don't cause
+        # Live to send a message on every beat.
+        # --------------------------------------------------------------------------
+        self.beat_listener_started = False
+        self._clock = None
+
         if scan:
             self.scan()
 
-        self.start_beat_listener()
-
     def __str__(self):
         return "Set"
 
@@ -131,13 +172,25 @@ class Set:
                   "auto" uses "file" for a local install, and "network" for a remote instance.
         """
 
-        if mode == "auto" or mode == "local":
-            self._scan_via_file()
-        elif mode == "network":
-            self._scan_via_network()
-        else:
+        if mode == "auto":
+            mode = "file" if self.live.osc_address[0] in ("127.0.0.1", "localhost") else "network"
+
+        if mode not in ("file", "local", "network"):
             raise ValueError("Invalid value for 'mode': %s" % mode)
 
+        #--------------------------------------------------------------------------------
+        # Mirrored properties are identified by track and clip index, which may
+        # have changed, so are dropped.
+        #--------------------------------------------------------------------------------
+        if self.caching:
+            self.live.mirror.clear()
+
+        with span("scan", mode):
+            if mode == "file" or mode == "local":
+                self._scan_via_file()
+            else:
+                self._scan_via_network()
+
     def _scan_via_network(self,
                           scan_device_parameters: bool = False) -> None:
         """
@@ -178,90 +231,94 @@ class Set:
             track_index_max = min(track_index_min + tracks_per_block, num_tracks)
             tracks_in_block = track_index_max - track_index_min
 
-            self.logger.debug(" - Scanning tracks %d-%d" % (track_index_min, track_index_max))
-            rv = self.live.query("/live/song/get/track_data", (
-                track_index_min, track_index_max, "track.name", "track.is_foldable", "track.group_track"))
-            for track_index_in_block in range(tracks_in_block):
-                track_index = track_index_min + track_index_in_block
-                track_offset = track_index_in_block * 3
-                track_name, track_is_group, track_group_track = rv[track_offset:track_offset + 3]
-                track_group = self.tracks[track_group_track] if track_group_track is not None else None
-                if track_is_group:
-                    group_index = len(self.groups)
-                    group = Group(self, track_index, group_index, track_name, track_group)
-                    self.tracks.append(group)
-                    self.groups.append(group)
-                else:
-                    track = Track(self, track_index, track_name, track_group)
-                    self.tracks.append(track)
-                    if track_group:
-                        track_group.tracks.append(track)
+            with span("scan.tracks", tracks=tracks_in_block):
+                self.logger.debug(" - Scanning tracks %d-%d" % (track_index_min, track_index_max))
+                rv = self.live.query("/live/song/get/track_data", (
+                    track_index_min, track_index_max, "track.name", "track.is_foldable", "track.group_track"))
+                for track_index_in_block in range(tracks_in_block):
+                    track_index = track_index_min + track_index_in_block
+                    track_offset = track_index_in_block * 3
+                    track_name, track_is_group, track_group_track = rv[track_offset:track_offset + 3]
+                    track_group = self.tracks[track_group_track] if track_group_track is not None else None
+                    if track_is_group:
+                        group_index = len(self.groups)
+                        group = Group(self, track_index, group_index, track_name, track_group)
+                        self.tracks.append(group)
+                        self.groups.append(group)
+                    else:
+                        track = Track(self, track_index, track_name, track_group)
+                        self.tracks.append(track)
+                        if track_group:
+                            track_group.tracks.append(track)
 
             # --------------------------------------------------------------------------------
             # Scan clips
             # --------------------------------------------------------------------------------
-            self.logger.debug(" - Scanning tracks %d-%d: clips" % (track_index_min, track_index_max))
-            rv = self.live.query("/live/song/get/track_data",
-                                 (track_index_min, track_index_max, "clip.name", "clip.length"))
-            for track_index_in_block in range(tracks_in_block):
-                track_index = track_index_min + track_index_in_block
-                track = self.tracks[track_index]
-                clips_data = rv[(track_index_in_block * 2 * num_scenes):((track_index_in_block + 1) * 2 * num_scenes)]
-                clip_names = clips_data[0:num_scenes]
-                clip_lengths = clips_data[num_scenes:num_scenes * 2]
-                for clip_index, (clip_name, clip_length) in enumerate(zip(clip_names, clip_lengths)):
-                    if clip_name is not None:
-                        clip = Clip(track, clip_index, clip_name, clip_length)
-                        track.clips[clip_index] = clip
-                        if track.group is not None and track.group.clips[clip_index] is None:
-                            track.group.clips[clip_index] = Clip(track.group, clip_index, "", clip_length)
+            with span("scan.clips", tracks=tracks_in_block):
+                self.logger.debug(" - Scanning tracks %d-%d: clips" % (track_index_min, track_index_max))
+                rv = self.live.query("/live/song/get/track_data",
+                                     (track_index_min, track_index_max, "clip.name", "clip.length"))
+                for track_index_in_block in range(tracks_in_block):
+                    track_index = track_index_min + track_index_in_block
+                    track = self.tracks[track_index]
+                    clips_data = rv[(track_index_in_block * 2 * num_scenes):((track_index_in_block + 1) * 2 * num_scenes)]
+                    clip_names = clips_data[0:num_scenes]
+                    clip_lengths = clips_data[num_scenes:num_scenes * 2]
+                    for clip_index, (clip_name, clip_length) in enumerate(zip(clip_names, clip_lengths)):
+                        if clip_name is not None:
+                            clip = Clip(track, clip_index, clip_name, clip_length)
+                            track.clips[clip_index] = clip
+                            if track.group is not None and track.group.clips[clip_index] is None:
+                                track.group.clips[clip_index] = Clip(track.group, clip_index, "", clip_length)
 
             # --------------------------------------------------------------------------------
             # Scan devices
             # --------------------------------------------------------------------------------
-            self.logger.debug(" - Scanning tracks %d-%d: devices" % (track_index_min, track_index_max))
-            rv = self.live.query("/live/song/get/track_data",
-                                 (track_index_min, track_index_max, "track.num_devices", "device.name"))
-            rv_index = 0
-            for track_index_in_block in range(tracks_in_block):
-                track_index = track_index_min + track_index_in_block
-                track = self.tracks[track_index]
-                device_count = rv[rv_index]
-                rv_index += 1
-                for device_index in range(device_count):
-                    device_name = rv[rv_index]
+            with span("scan.devices", tracks=tracks_in_block):
+                self.logger.debug(" - Scanning tracks %d-%d: devices" % (track_index_min, track_index_max))
+                rv = self.live.query("/live/song/get/track_data",
+                                     (track_index_min, track_index_max, "track.num_devices", "device.name"))
+                rv_index = 0
+                for track_index_in_block in range(tracks_in_block):
+                    track_index = track_index_min + track_index_in_block
+                    track = self.tracks[track_index]
+                    device_count = rv[rv_index]
                     rv_index += 1
-                    device = Device(track, device_index, device_name)
-
-                    if scan_device_parameters:
-                        rv_num_params = self.live.query("/live/device/get/num_parameters", (track_index, device_index))[2:]
-                        rv_param_names = self.live.query("/live/device/get/parameters/name", (track_index, device_index))[2:]
-                        rv_param_values = self.live.query("/live/device/get/parameters/value", (track_index, device_index))[2:]
-                        rv_param_min = self.live.query("/live/device/get/parameters/min", (track_index, device_index))[2:]
-                        rv_param_max = self.live.query("/live/device/get/parameters/max", (track_index, device_index))[2:]
-                        rv_param_quantized = self.live.query("/live/device/get/parameters/is_quantized",
-                                                             (track_index, device_index))[2:]
-
-                        all_parameters = []
-
-                        for i in range(rv_num_params[0]):
-                            all_parameters.append({
-                                "name": rv_param_names[i],
-                                "value": rv_param_values[i],
-                                "min": rv_param_min[i],
-                                "max": rv_param_max[i],
-                                "is_quantized": rv_param_quantized[i]
-                            })
-
-                        device.parameters = []
-                        for parameter_index, parameter_data in enumerate(all_parameters):
-                            parameter = Parameter(device, parameter_index, parameter_data["name"], parameter_data["value"])
-                            parameter.min = parameter_data["min"]
-                            parameter.max = parameter_data["max"]
-                            parameter.is_quantized = parameter_data["is_quantized"]
-                            device.parameters.append(parameter)
-
-                    track.devices.append(device)
+                    for device_index in range(device_count):
+                        device_name = rv[rv_index]
+                        rv_index += 1
+                        device = Device(track, device_index, device_name)
+
+                        if scan_device_parameters:
+                            with span("scan.parameters", device=device_name):
+                                rv_num_params = self.live.query("/live/device/get/num_parameters", (track_index, device_index))[2:]
+                                rv_param_names = self.live.query("/live/device/get/parameters/name", (track_index, device_index))[2:]
+                                rv_param_values = self.live.query("/live/device/get/parameters/value", (track_index, device_index))[2:]
+                                rv_param_min = self.live.query("/live/device/get/parameters/min", (track_index, device_index))[2:]
+                                rv_param_max = self.live.query("/live/device/get/parameters/max", (track_index, device_index))[2:]
+                                rv_param_quantized = self.live.query("/live/device/get/parameters/is_quantized",
+                                                                     (track_index, device_index))[2:]
+
+                                all_parameters = []
+
+                                for i in range(rv_num_params[0]):
+                                    all_parameters.append({
+                                        "name": rv_param_names[i],
+                                        "value": rv_param_values[i],
+                                        "min": rv_param_min[i],
+                                        "max": rv_param_max[i],
+                                        "is_quantized": rv_param_quantized[i]
+                                    })
+
+                                device.parameters = []
+                                for parameter_index, parameter_data in enumerate(all_parameters):
+                                    parameter = Parameter(device, parameter_index, parameter_data["name"], parameter_data["value"])
+                                    parameter.min = parameter_data["min"]
+                                    parameter.max = parameter_data["max"]
+                                    parameter.is_quantized = parameter_data["is_quantized"]
+                                    device.parameters.append(parameter)
+
+                        track.devices.append(device)
 
         self.scanned = True
 
@@ -270,24 +327,17 @@ class Set:
         Scans the contents of the Live set by exporting the song structure to a local .json file.
         Note that this will not work if the Live set is running on another system, i.e. over a network.
         """
-        rv = self.live.query("/live/song/export/structure")
-        assert rv[0] == 1
+        with span("scan.export"):
+            rv = self.live.query("/live/song/export/structure")
+            assert rv[0] == 1
 
         self.tracks = []
         self.groups = []
 
-        if sys.platform == "darwin":
-            #--------------------------------------------------------------------------------
-            # On macOS, tempfile.gettempdir() uses a process-specific directory.
-            # Use global temp dir (/tmp) as this is the directory used by AbletonOSC.
-            #--------------------------------------------------------------------------------
-            tempdir = "/tmp"
-        else:
-            tempdir = tempfile.gettempdir()
-        json_path = os.path.join(tempdir, "abletonosc-song-structure.json")
-
-        with open(json_path, "r") as fd:
+        with open(song_structure_path(), "r") as fd, span("scan.read"):
             data = json.load(fd)
+
+        with span("scan.build"):
             tracks = data["tracks"]
             for track_data in tracks:
                 track_group = self.tracks[track_data["group_track"]] if track_data["group_track"] is not None else None
@@ -354,6 +404,8 @@ class Set:
         """
         Read a saved Set structure from disk.
         """
+        import pickle
+
         filename = "%s.pickle" % filename
         try:
             data = pickle.load(open(filename, "rb"))
@@ -361,6 +413,15 @@ class Set:
             raise LiveIOError
 
         self.__setstate__(data.__dict__)
+
+        # ------------------------------------------------------------------------
+        # Tracks and scenes are pickled without their reference to the Set,
+        # through which they communicate with Live, so must be reattached.
+        # ------------------------------------------------------------------------
+        for track in self.tracks:
+            track.set = self
+        for scene in self.scenes:
+            scene.set = self
         self.logger.info("load: Set loaded OK (%d tracks)" % (len(self.tracks)))
 
         # ------------------------------------------------------------------------
@@ -382,6 +443,8 @@ class Set:
         TODO: Add a __reduce__ function to do this in an idiomatic way.
         TODO: Do we still need this now scanning is fast?
         """
+        import pickle
+
         filename = "%s.pickle" % filename
         with open(filename, "wb") as fd:
             pickle.dump(self, fd)
@@ -427,14 +490,22 @@ class Set:
 
     def wait_for_next_beat(self):
         # ------------------------------------------------------------------------
-        # we need to use events to prevent lockup -- if we call a callback
-        # directly from the Live thread that makes another query to the Live
-        # server, the first event will never become unlocked and we'll block
-        # forever.
+        # the beat callback runs on the Query's callback executor, so signal
+        # the calling thread via an event. (Callbacks no longer run on the
+        # OSC receive thread, so may themselves safely query Live.)
         # ------------------------------------------------------------------------
-        self._next_beat_event.clear()
         self.live.beat_callback = self._next_beat_callback
 
+        # ------------------------------------------------------------------------
+        # When the listener is first started, Live may immediately send the
+        # current beat. A round trip ensures that it has been received, so
+        # that it can be skipped.
+        # ------------------------------------------------------------------------
+        if not self.beat_listener_started:
+            self.start_beat_listener()
+            self.live.query("/live/song/get/tempo")
+        self._next_beat_event.clear()
+
         # ------------------------------------------------------------------------
         # don't want to use .wait() as it prevents response to keyboard input
         # so ctrl-c will not work.
@@ -446,6 +517,8 @@ class Set:
 
     def set_beat_callback(self, callback):
         self.live.beat_callback = callback
+        if callback is not None and not self.beat_listener_started:
+            self.start_beat_listener()
 
     def startup_callback(self):
         self._startup_event.set()
@@ -531,6 +604,9 @@ class Set:
         # Assume that the alphabetically-last Ableton binary is the one we 
         # want (ie, greatest version number.)
         # ------------------------------------------------------------------------
+        import glob
+        import subprocess
+
         ableton = sorted(glob.glob("/Applications/Ableton*.app"))[-1]
         subprocess.call(["open", "-a", ableton, path])
 
@@ -547,6 +623,8 @@ class Set:
             str: The absolute path to the last-opened set, or None if no log entry
                  is found. Note that the set may not still be open!
         """
+        import glob
+
         root = os.path.expanduser("~/Library/Preferences/Ableton")
         log_path_wildcard = os.path.join(root, "Live *", "Log.txt")
         log_paths = glob.glob(log_path_wildcard)
@@ -597,6 +675,115 @@ class Set:
         except Exception as e:
             return False
 
+    @property
+    def caching(self) -> bool:
+        """
+        Whether property reads are served from a local mirror of Live's state,
+        which is kept up to date by listening for changes. Disabling caching
+        stops all listeners.
+        """
+        return self._caching
+
+    @caching.setter
+    def caching(self, caching: bool):
+        if self._caching and not caching:
+            self.live.mirror.clear()
+        self._caching = bool(caching)
+
+    @property
+    def clock(self) -> SongClock:
+        """
+        A local clock that follows Live's song position, started on first access.
+        Reading it requires no round trip to Live:
+
+            set.clock.now_beats()
+            set.clock.time_until(16.0)
+
+        Returns:
+            SongClock: The clock, synchronised with Live.
+        """
+        if self._clock is None:
+            clock = SongClock(self.live)
+            clock.start()
+            self.beat_listener_started = True
+            self._clock = clock
+        return self._clock
+
+    async def aget(self, prop: str, client: "AsyncQuery" = None):
+        """
+        Awaitable counterpart to the property getters, for use with asyncio.
+        Many reads can be awaited concurrently:
+
+            tempo, is_playing = await asyncio.gather(set.aget("tempo"), set.aget("is_playing"))
+
+        Args:
+            prop: The name of the property to query (e.g. "tempo")
+            client: The AsyncQuery to use. Defaults to a shared client for the running event loop.
+        """
+        address = getter_address(type(self), prop)
+        if client is None:
+            from ..async_query import get_async_client
+            client = await get_async_client()
+        rv = await client.query(address)
+        return rv[0]
+
+    def fetch(self, *props: str, timeout: float = None) -> dict:
+        """
+        Query a batch of properties in one pipelined round trip.
+        Set properties are named as-is; properties prefixed with "track." are
+        queried for every track in the set, which must already have been scanned.
+
+            state = set.fetch("tempo", "is_playing", "track.volume", "track.mute")
+            state["track.volume"]  # -> [0.85, 0.5, ...]
+
+        Args:
+            props: Property names, e.g. "tempo" or "track.volume"
+            timeout: Deadline for the entire batch, in seconds.
+
+        Returns:
+            dict: A dict mapping each property name to its value, or to a list of
+                  per-track values for "track." properties.
+        """
+        queries = []
+        for prop in props:
+            if prop.startswith("track."):
+                address = getter_address(Track, prop[len("track."):])
+                queries.extend((address, (track.index,)) for track in self.tracks)
+            else:
+                queries.append((getter_address(Set, prop), ()))
+
+        rv = self.live.query_many(queries, timeout=timeout)
+
+        values = {}
+        rv_index = 0
+        for prop in props:
+            if prop.startswith("track."):
+                values[prop] = [reply[1] for reply in rv[rv_index:rv_index + len(self.tracks)]]
+                rv_index += len(self.tracks)
+            else:
+                values[prop] = rv[rv_index][0]
+                rv_index += 1
+        return values
+
+    def read_all_parameters(self, timeout: float = None) -> "dict[Device, numpy.ndarray]":
+        """
+        Snapshot the values of every device parameter in the set, pipelining the
+        queries for all devices so that the snapshot takes roughly one round trip.
+        The set must have been scanned. Requires numpy.
+
+            values = set.read_all_parameters()
+            values[set.tracks[0].devices[0]]  # -> array([1. , 0.52, ...])
+
+        Args:
+            timeout: Deadline for the entire snapshot, in seconds.
+
+        Returns:
+            dict: A dict mapping each Device to a float array of its parameter values,
+                  aligned with its parameters.
+        """
+        devices = [device for track in self.tracks for device in track.devices]
+        return dict(zip(devices, read_device_parameters(devices, timeout=timeout)))
+
     # ------------------------------------------------------------------------
     # Properties
     # ------------------------------------------------------------------------
@@ -613,7 +800,7 @@ class Set:
                                          fset=make_setter("song", "clip_trigger_quantization"),
                                          doc="Global quantization")
 
-    current_song_time = property(fget=make_getter("song", "current_song_time"),
+    current_song_time = property(fget=make_getter("song", "current_song_time", mirrored=False),
                                  fset=make_setter("song", "current_song_time"),
                                  doc="Current song time (in beats)")
 
@@ -642,17 +829,19 @@ class Set:
 
     def start_beat_listener(self) -> None:
         self.live.cmd("/live/song/start_listen/beat")
+        self.beat_listener_started = True
 
     def stop_beat_listener(self) -> None:
         self.live.cmd("/live/song/stop_listen/beat")
+        self.beat_listener_started = False
 
     # --------------------------------------------------------------------------------
     # Undo/redo
     # --------------------------------------------------------------------------------
 
-    can_undo = property(fget=make_getter("song", "can_undo"),
+    can_undo = property(fget=make_getter("song", "can_undo", mirrored=False),
                         doc="Whether an undo operation is possible")
-    can_redo = property(fget=make_getter("song", "can_redo"),
+    can_redo = property(fget=make_getter("song", "can_redo", mirrored=False),
                         doc="Whether a redo operation is possible")
 
     def undo(self) -> None:
@@ -671,7 +860,7 @@ class Set:
     # Tracks
     # --------------------------------------------------------------------------------
 
-    num_tracks = property(fget=make_getter("song", "num_tracks"),
+    num_tracks = property(fget=make_getter("song", "num_tracks", mirrored=False),
                           doc="Number of tracks")
 
     def create_audio_track(self, track_index: int) -> None:
@@ -681,6 +870,7 @@ class Set:
         Args:
             track_index: The index of the track to create. If -1, creates after the last existing track.
         """
+        self._structure_changed()
         self.live.cmd("/live/song/create_audio_track", track_index)
 
     def create_midi_track(self, track_index: int) -> None:
@@ -690,6 +880,7 @@ class Set:
         Args:
             track_index: The index of the track to create. If -1, creates after the last existing track.
         """
+        self._structure_changed()
         self.live.cmd("/live/song/create_midi_track", track_index)
 
     def duplicate_track(self, track_index: int) -> None:
@@ -699,6 +890,7 @@ class Set:
         Args:
             track_index: The index of the track to delete.
         """
+        self._structure_changed()
         self.live.cmd("/live/song/duplicate_track", track_index)
 
     def delete_track(self, track_index: int) -> None:
@@ -708,6 +900,7 @@ class Set:
         Args:
             track_index: The index of the track to delete.
         """
+        self._structure_changed()
         self.live.cmd("/live/song/delete_track", track_index)
 
     def delete_return_track(self, track_index: int) -> None:
@@ -717,8 +910,18 @@ class Set:
         Args:
             track_index: The index of the return track to delete.
         """
+        self._structure_changed()
         self.live.cmd("/live/song/delete_return_track", track_index)
 
+    def _structure_changed(self) -> None:
+        #--------------------------------------------------------------------------------
+        # Mirrored properties are identified by track and scene index, which are
+        # shifted when tracks or scenes are added or removed, so are dropped
+        # before the change is made. They are re-subscribed when next read.
+        #--------------------------------------------------------------------------------
+        if self.caching:
+            self.live.mirror.clear()
+
     def get_track_named(self, name: str) -> Optional[Track]:
         """
         Returns the Track with the specified name, or None if not found.
@@ -747,7 +950,7 @@ class Set:
     # Scenes
     # --------------------------------------------------------------------------------
 
-    num_scenes = property(make_getter("song", "num_scenes"),
+    num_scenes = property(make_getter("song", "num_scenes", mirrored=False),
                           doc="Number of scenes")
 
     def create_scene(self, scene_index: int) -> None:
@@ -757,6 +960,7 @@ class Set:
         Args:
             scene_index: The index of the scene to create. If -1, the scene is created after the last scene.
         """
+        self._structure_changed()
         self.live.cmd("/live/song/create_scene", scene_index)
 
     def delete_scene(self, scene_index: int) -> None:
@@ -766,6 +970,7 @@ class Set:
         Args:
             scene_index: The index of the scene to delete.
         """
+        self._structure_changed()
         self.live.cmd("/live/song/delete_scene", scene_index)
 
     # --------------------------------------------------------------------------------
@@ -787,7 +992,7 @@ class Set:
     # --------------------------------------------------------------------------------
     # Log level
     # --------------------------------------------------------------------------------
-    log_level = property(fget=make_getter("api", "log_level"),
+    log_level = property(fget=make_getter("api", "log_level", mirrored=False),
                          fset=make_setter("api", "log_level"),
                          doc="Log level (can be one of: debug, info, warning, error, critical)")
 
@@ -3,10 +3,13 @@ from __future__ import annotations
 from ..constants import CLIP_STATUS_PLAYING, CLIP_STATUS_STARTING
 from ..exceptions import LiveInvalidOperationException
 from ..query import Query
+from ..object import getter_address
 from typing import TYPE_CHECKING, Optional
 from .clip import Clip
 
 if TYPE_CHECKING:
+    import numpy
+    from ..async_query import AsyncQuery
     from .device import Device
     from .group import Group
     from .set import Set
@@ -16,14 +19,24 @@ import logging
 logger = logging.getLogger(__name__)
 
 def make_getter(class_identifier, prop):
+    address = "/live/%s/get/%s" % (class_identifier, prop)
+
     def fn(self):
-        return self.live.query("/live/%s/get/%s" % (class_identifier, prop), (self.index,))[1]
+        if self.set.caching:
+            return self.live.mirror.get(address, (self.index,))[0]
+        return self.live.query(address, (self.index,))[1]
 
+    fn.address = address
     return fn
 
 def make_setter(class_identifier, prop):
+    address = "/live/%s/set/%s" % (class_identifier, prop)
+    getter_address = "/live/%s/get/%s" % (class_identifier, prop)
+
     def fn(self, value):
-        self.live.cmd("/live/%s/set/%s" % (class_identifier, prop), (self.index, value))
+        self.live.cmd(address, (self.index, value))
+        if self.set.caching:
+            self.live.mirror.update(getter_address, (self.index,), (value,))
 
     return fn
 
@@ -51,7 +64,11 @@ class Track:
         self.clip_init = None
         self.clips: list[Optional[Clip]] = [None] * 1024
         self.devices: list[Device] = []
-        self.live: Query = Query()
+
+    @property
+    def live(self) -> Query:
+        """ The Query object used to communicate with Live, shared with the containing Set. """
+        return self.set.live
 
     def __str__(self):
         if self.group:
@@ -144,6 +161,17 @@ class Track:
                 return device
         return None
 
+    def read_all_parameters(self) -> list[numpy.ndarray]:
+        """
+        Query the values of all parameters of all of this track's devices, in
+        roughly one round trip. Requires numpy.
+
+        Returns:
+            A float array of parameter values for each device, aligned with self.devices.
+        """
+        from .device import read_device_parameters
+        return read_device_parameters(self.devices)
+
     @property
     def is_stopped(self) -> bool:
         """
@@ -233,6 +261,23 @@ class Track:
                            fset=make_setter("track", "color_index"),
                            doc="Color index (0..69)")
 
+    async def aget(self, prop: str, client: AsyncQuery = None):
+        """
+        Awaitable counterpart to the property getters, for use with asyncio:
+
+            volumes = await asyncio.gather(*(track.aget("volume") for track in set.tracks))
+
+        Args:
+            prop: The name of the property to query (e.g. "volume")
+            client: The AsyncQuery to use. Defaults to a shared client for the running event loop.
+        """
+        address = getter_address(type(self), prop)
+        if client is None:
+            from ..async_query import get_async_client
+            client = await get_async_client()
+        rv = await client.query(address, (self.index,))
+        return rv[1]
+
     def get_send(self, send_index: int):
         return self.live.query("/live/track/get/send", (self.index, send_index))[1]
 
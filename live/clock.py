@@ -0,0 +1,233 @@
+"""
+A local estimate of the song position, which can be read without any OSC
+round trip:
+
+    clock = set.clock
+    beats = clock.now_beats()
+    time.sleep(clock.time_until(math.ceil(beats)))
+"""
+
+import math
+import time
+import threading
+import collections
+
+from live.query import Query
+
+#------------------------------------------------------------------------
+# Beat events whose error exceeds this (in beats) indicate that the song
+# position has jumped (e.g., playback restarted), so the clock is reset.
+#------------------------------------------------------------------------
+RESYNC_THRESHOLD = 0.25
+
+#------------------------------------------------------------------------
+# Fraction of the measured phase error corrected on each beat event.
+#------------------------------------------------------------------------
+CORRECTION_GAIN = 0.5
+
+#------------------------------------------------------------------------
+# Number of recent beat events over which phase errors are compared.
+#------------------------------------------------------------------------
+ERROR_WINDOW = 8
+
+class SongClock:
+    """
+    Extrapolates the song position locally from Live's tempo and beat events.
+
+    The clock is anchored by querying the song time, using the reply with the
+    shortest round trip, and half of that round trip as the one-way latency
+    from Live. Thereafter, it advances at the current tempo, and its phase is
+    corrected on each /live/song/get/beat event.
+
+    Beat events can only arrive late (by network latency, plus however long
+    Live takes to notice the beat), so each correction is based on the
+    least-delayed of the recent events. Tempo and transport changes are
+    followed via listeners.
+
+    Reading the clock performs no I/O, so is cheap enough to call thousands
+    of times per second.
+    """
+
+    def __init__(self, query: Query = None):
+        """
+        Args:
+            query: The Query object used to communicate with Live. Defaults to Query.default().
+        """
+        self.live = query if query is not None else Query.default()
+        self.lock = threading.Lock()
+
+        #------------------------------------------------------------------------
+        # The clock's model, replaced as a whole so that it can be read without
+        # a lock: (anchor time, song time at anchor in beats, beats per second,
+        # is playing)
+        #------------------------------------------------------------------------
+        self.state = (time.monotonic(), 0.0, 2.0, False)
+        self.latency = 0.0
+        self.errors = collections.deque(maxlen=ERROR_WINDOW)
+        self.routes = []
+
+        self.beats_received = 0
+        self.resyncs = 0
+        self.error_total = 0.0
+
+    def __str__(self):
+        return "SongClock (%.3f beats, %.1f bpm)" % (self.now_beats(), self.tempo)
+
+    #------------------------------------------------------------------------
+    # Reading the clock
+    #------------------------------------------------------------------------
+
+    def now_beats(self) -> float:
+        """ Returns the current song time, in beats. """
+        anchor_time, anchor_beats, beats_per_second, is_playing = self.state
+        if not is_playing:
+            return anchor_beats
+        return anchor_beats + (time.monotonic() - anchor_time) * beats_per_second
+
+    def time_until(self, beat: float) -> float:
+        """
+        Returns the number of seconds until the song reaches the given beat at the
+        current tempo: negative if it has already passed, or infinite if the song
+        is stopped.
+        """
+        anchor_time, anchor_beats, beats_per_second, is_playing = self.state
+        if not is_playing:
+            return math.inf
+        return anchor_time + (beat - anchor_beats) / beats_per_second - time.monotonic()
+
+    @property
+    def tempo(self) -> float:
+        """ The current tempo, in beats per minute. """
+        return self.state[2] * 60.0
+
+    @property
+    def is_playing(self) -> bool:
+        return self.state[3]
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: The estimated one-way latency from Live (in seconds), the number
+                  of beat events received and resyncs performed, and the mean
+                  absolute phase error of beat events, in beats.
+        """
+        return {
+            "latency": self.latency,
+            "tempo": self.tempo,
+            "is_playing": self.is_playing,
+            "beats_received": self.beats_received,
+            "resyncs": self.resyncs,
+            "mean_abs_error": self.error_total / self.beats_received if self.beats_received else 0.0,
+        }
+
+    #------------------------------------------------------------------------
+    # Synchronisation
+    #------------------------------------------------------------------------
+
+    def start(self, probes: int = 5) -> None:
+        """
+        Start following Live's beat, tempo and transport events, and synchronise
+        the clock with Live.
+
+        Args:
+            probes: The number of song time queries with which to synchronise.
+        """
+        if not self.routes:
+            self.live.listen()
+            table = self.live.dispatch_table
+            self.routes = [
+                table.add("/live/song/get/beat", self._on_beat, inline=True),
+                table.add("/live/song/get/tempo", self._on_tempo, inline=True),
+                table.add("/live/song/get/is_playing", self._on_is_playing, inline=True),
+            ]
+            self.live.cmd("/live/song/start_listen/beat")
+            self.live.cmd("/live/song/start_listen/tempo")
+            self.live.cmd("/live/song/start_listen/is_playing")
+        self.synchronise(probes)
+
+    def stop(self) -> None:
+        """
+        Stop following Live's events. The listeners in Live are left running, as
+        they may be in use elsewhere.
+        """
+        for route in self.routes:
+            self.live.dispatch_table.remove_route(route)
+        self.routes = []
+
+    def synchronise(self, probes: int = 5) -> None:
+        """
+        Anchor the clock by querying Live's song time, tempo and transport state.
+        The song time reply with the shortest round trip is used, as the one
+        least delayed by the network or by Live.
+        """
+        tempo = self.live.query("/live/song/get/tempo")[0]
+        is_playing = bool(self.live.query("/live/song/get/is_playing")[0])
+
+        best = None
+        for _ in range(probes):
+            sent_at = time.monotonic()
+            song_time = self.live.query("/live/song/get/current_song_time")[0]
+            received_at = time.monotonic()
+            round_trip = received_at - sent_at
+            if best is None or round_trip < best[0]:
+                best = (round_trip, received_at, song_time)
+
+        round_trip, received_at, song_time = best
+        with self.lock:
+            self.latency = round_trip / 2.0
+            self.state = (received_at - self.latency, song_time, tempo / 60.0, is_playing)
+            self.errors.clear()
+
+    #------------------------------------------------------------------------
+    # Event handlers, called on the Query's receive thread.
+    #------------------------------------------------------------------------
+
+    def _on_beat(self, beat):
+        event_time = time.monotonic() - self.latency
+        with self.lock:
+            anchor_time, anchor_beats, beats_per_second, is_playing = self.state
+            predicted = anchor_beats
+            if is_playing:
+                predicted += (event_time - anchor_time) * beats_per_second
+            error = beat - predicted
+            self.beats_received += 1
+            self.error_total += abs(error)
+
+            if not is_playing or abs(error) > RESYNC_THRESHOLD:
+                #------------------------------------------------------------------------
+                # The song has started playing, or jumped: re-anchor at the beat.
+                #------------------------------------------------------------------------
+                self.state = (event_time, float(beat), beats_per_second, True)
+                self.errors.clear()
+                self.resyncs += 1
+                return
+
+            #------------------------------------------------------------------------
+            # Correct towards the least-delayed recent event, which has the
+            # largest (least negative) error.
+            #------------------------------------------------------------------------
+            self.errors.append(error)
+            correction = max(self.errors) * CORRECTION_GAIN
+            self.errors = collections.deque((error - correction for error in self.errors), maxlen=ERROR_WINDOW)
+            self.state = (anchor_time, anchor_beats + correction, beats_per_second, True)
+
+    def _on_tempo(self, tempo):
+        now = time.monotonic()
+        with self.lock:
+            anchor_time, anchor_beats, beats_per_second, is_playing = self.state
+            if tempo / 60.0 == beats_per_second:
+                return
+            if is_playing:
+                anchor_beats += (now - anchor_time) * beats_per_second
+            self.state = (now, anchor_beats, tempo / 60.0, is_playing)
+
+    def _on_is_playing(self, is_playing):
+        now = time.monotonic()
+        is_playing = bool(is_playing)
+        with self.lock:
+            anchor_time, anchor_beats, beats_per_second, was_playing = self.state
+            if is_playing == was_playing:
+                return
+            if was_playing:
+                anchor_beats += (now - self.latency - anchor_time) * beats_per_second
+            self.state = (now - self.latency, anchor_beats, beats_per_second, is_playing)
@@ -0,0 +1,161 @@
+import time
+import logging
+import threading
+
+from live.osc import encode_message, encode_bundles
+
+class WriteCoalescer:
+    """
+    Latest-value-wins send layer for high-rate setters.
+
+    Writes are keyed by address plus target indices (e.g. /live/track/set/volume
+    for track 3), and held until the next flush. Only the newest value for each
+    key is sent, so writes that are superseded before the flush are dropped.
+    Optionally, values that are unchanged since they were last sent (within
+    epsilon) are also dropped. Flushes happen at a fixed control rate, with all pending
+    writes sent together as OSC bundles.
+
+    Usually enabled via Query.enable_coalescing(), which routes every /set/
+    command through the coalescer.
+    """
+
+    def __init__(self, query, rate: float = 100.0, epsilon: float = None):
+        """
+        Args:
+            query: The Query object used to send datagrams.
+            rate: Number of flushes per second.
+            epsilon: If set, numeric values that differ from the last-sent value
+                     by no more than epsilon are not re-sent. As this compares
+                     against the last value sent rather than Live's current value,
+                     a value that has since been changed in Live (e.g. from its UI)
+                     cannot be restored until reset() is called. Defaults to None,
+                     which always sends the latest value.
+        """
+        self.query = query
+        self.rate = rate
+        self.epsilon = epsilon
+        self.logger = logging.getLogger(__name__)
+
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pending: dict[tuple, tuple] = {}
+        self.last_sent: dict[tuple, object] = {}
+
+        self.submitted = 0
+        self.superseded = 0
+        self.unchanged = 0
+        self.sent = 0
+        self.datagrams = 0
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self) -> None:
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="pylive-coalescer", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the flush thread, sending any pending writes.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+    def submit(self, msg: str, args: tuple) -> None:
+        """
+        Queue a write. The final argument is the value; any preceding arguments
+        are the indices of the target.
+        """
+        key = (msg, tuple(args[:-1]))
+        with self.lock:
+            self.submitted += 1
+            if key in self.pending:
+                self.superseded += 1
+            self.pending[key] = args
+
+    def flush(self) -> None:
+        """
+        Send the latest value of every pending write.
+        """
+        if not self.pending:
+            return
+        with self.flush_lock:
+            self._flush()
+
+    def _flush(self):
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+
+        epsilon = self.epsilon
+        last_sent = self.last_sent
+        messages = []
+        for key, args in pending.items():
+            value = args[-1]
+            if epsilon is not None and key in last_sent:
+                previous = last_sent[key]
+                if previous == value or (_is_number(value) and _is_number(previous)
+                                         and abs(value - previous) <= epsilon):
+                    self.unchanged += 1
+                    continue
+            last_sent[key] = value
+            messages.append(encode_message(key[0], args))
+
+        if not messages:
+            return
+        if len(messages) == 1:
+            dgrams = messages
+        else:
+            dgrams = encode_bundles(messages)
+        for dgram in dgrams:
+            self.query.send(dgram)
+        self.sent += len(messages)
+        self.datagrams += len(dgrams)
+
+    def reset(self) -> None:
+        """
+        Forget the last-sent values, so that the next write to each target is
+        always sent (e.g., if Live's state may have been changed externally.)
+        """
+        with self.flush_lock:
+            self.last_sent = {}
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Counts of writes submitted, superseded by a newer value,
+                  unchanged since last sent, total dropped, and sent, plus
+                  the number of datagrams sent.
+        """
+        return {
+            "submitted": self.submitted,
+            "superseded": self.superseded,
+            "unchanged": self.unchanged,
+            "dropped": self.superseded + self.unchanged,
+            "sent": self.sent,
+            "datagrams": self.datagrams,
+        }
+
+    def _run(self):
+        #------------------------------------------------------------------------
+        # Schedule flushes against absolute deadlines so that the control
+        # rate does not drift with the time taken to flush.
+        #------------------------------------------------------------------------
+        interval = 1.0 / self.rate
+        deadline = time.monotonic() + interval
+        while not self.stop_event.wait(max(0.0, deadline - time.monotonic())):
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.warning("Couldn't flush coalesced writes: %s" % e)
+            deadline += interval
+            now = time.monotonic()
+            if deadline < now:
+                deadline = now + interval
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,213 @@
+import re
+import threading
+from typing import Callable, Optional
+
+#------------------------------------------------------------------------
+# Characters that denote an OSC address pattern (OSC 1.0 spec).
+#------------------------------------------------------------------------
+OSC_PATTERN_CHARS = set("*?[]{}")
+
+#------------------------------------------------------------------------
+# Maximum number of addresses whose resolved routes are cached.
+#------------------------------------------------------------------------
+MAX_CACHED_ADDRESSES = 4096
+
+def callback_arity(callback: Callable) -> Optional[int]:
+    """
+    Returns the number of positional arguments that a callback accepts,
+    or None if it accepts any number (or its signature cannot be inspected).
+    """
+    import inspect
+
+    try:
+        signature = inspect.signature(callback)
+    except (TypeError, ValueError):
+        return None
+    count = 0
+    for parameter in signature.parameters.values():
+        if parameter.kind == parameter.VAR_POSITIONAL:
+            return None
+        if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD):
+            count += 1
+    return count
+
+def osc_pattern_to_regex(pattern: str) -> re.Pattern:
+    """
+    Compile an OSC address pattern (with ?, *, [...] and {a,b} wildcards)
+    into a regular expression.
+    """
+    regex = ""
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "?":
+            regex += "[^/]"
+        elif char == "*":
+            regex += "[^/]*"
+        elif char == "[":
+            end = pattern.index("]", index)
+            contents = pattern[index + 1:end]
+            if contents.startswith("!"):
+                contents = "^" + contents[1:]
+            regex += "[%s]" % contents.replace("\\", "\\\\")
+            index = end
+        elif char == "{":
+            end = pattern.index("}", index)
+            regex += "(?:%s)" % "|".join(re.escape(option) for option in pattern[index + 1:end].split(","))
+            index = end
+        else:
+            regex += re.escape(char)
+        index += 1
+    return re.compile(regex)
+
+class Route:
+    """
+    A handler registered for an address, with its calling convention
+    precomputed so that dispatch does no introspection.
+    """
+
+    __slots__ = ("pattern", "handler", "match", "inline", "nargs", "regex")
+
+    def __init__(self, pattern: str, handler: Callable, match: str, inline: bool = False):
+        self.pattern = pattern
+        self.handler = handler
+        self.match = match
+        self.inline = inline
+        self.nargs = callback_arity(handler)
+        self.regex = osc_pattern_to_regex(pattern) if match == "wildcard" else None
+
+    def __str__(self):
+        return "Route (%s %s): %s" % (self.match, self.pattern, self.handler)
+
+    def matches(self, address: str) -> bool:
+        if self.match == "exact":
+            return address == self.pattern
+        elif self.match == "prefix":
+            return address.startswith(self.pattern)
+        else:
+            return self.regex.fullmatch(address) is not None
+
+    def args_for(self, data: tuple) -> tuple:
+        #------------------------------------------------------------------------
+        # Handlers may accept fewer arguments than the message carries (e.g.,
+        # a beat callback that takes no arguments), in which case the message's
+        # arguments are truncated.
+        #------------------------------------------------------------------------
+        if self.nargs is None or self.nargs >= len(data):
+            return data
+        return data[:self.nargs]
+
+    def __call__(self, data: tuple):
+        return self.handler(*self.args_for(data))
+
+class DispatchTable:
+    """
+    Maps incoming OSC addresses to handlers, supporting exact, prefix and
+    OSC wildcard routes.
+
+    The routes for each address are resolved once and cached until routes are
+    next added or removed, so that the cost of dispatching a message does not
+    grow with the number of routes.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.exact: dict[str, list[Route]] = {}
+        self.patterns: list[Route] = []
+        self.cache: dict[str, tuple[Route, ...]] = {}
+
+    def __len__(self):
+        return sum(len(routes) for routes in self.exact.values()) + len(self.patterns)
+
+    def add(self, pattern: str, handler: Callable, match: str = None, inline: bool = False) -> Route:
+        """
+        Add a route.
+
+        Args:
+            pattern: The address or address pattern, e.g. "/live/song/get/beat",
+                     "/live/track/get/" (prefix) or "/live/track/get/{volume,panning}"
+            handler: Callable, which is passed the message's arguments
+            match: One of "exact", "prefix" or "wildcard". By default, patterns
+                   containing OSC wildcard characters are "wildcard", and all
+                   others are "exact".
+            inline: If True, the handler is always called directly on the receive
+                    thread rather than via a CallbackExecutor. For internal use by
+                    handlers that only update local state.
+
+        Returns:
+            The new Route.
+        """
+        if match is None:
+            match = "wildcard" if OSC_PATTERN_CHARS & set(pattern) else "exact"
+        if match not in ("exact", "prefix", "wildcard"):
+            raise ValueError("Invalid value for 'match': %s" % match)
+
+        route = Route(pattern, handler, match, inline)
+        with self.lock:
+            if match == "exact":
+                self.exact.setdefault(pattern, []).append(route)
+            else:
+                self.patterns.append(route)
+            self.cache = {}
+        return route
+
+    def remove(self, pattern: str, handler: Callable) -> list[Route]:
+        """
+        Remove all routes for the given pattern and handler.
+
+        Returns:
+            The routes that were removed (an empty list if none were found).
+        """
+        with self.lock:
+            routes = [route for route in self.exact.get(pattern, []) + self.patterns
+                      if route.pattern == pattern and route.handler == handler]
+            for route in routes:
+                self._remove_route(route)
+            self.cache = {}
+        return routes
+
+    def remove_route(self, route: Route) -> None:
+        """
+        Remove a route previously returned by add().
+        """
+        with self.lock:
+            self._remove_route(route)
+            self.cache = {}
+
+    def _remove_route(self, route: Route):
+        # Must be called with the lock held.
+        if route.match == "exact":
+            routes = self.exact.get(route.pattern, [])
+            if route in routes:
+                routes.remove(route)
+            if not routes:
+                self.exact.pop(route.pattern, None)
+        elif route in self.patterns:
+            self.patterns.remove(route)
+
+    def routes_for(self, address: str) -> tuple[Route, ...]:
+        """
+        Returns the routes that match an address, in the order they were added
+        (exact routes first).
+        """
+        routes = self.cache.get(address)
+        if routes is None:
+            with self.lock:
+                routes = tuple(self.exact.get(address, ())) + \
+                         tuple(route for route in self.patterns if route.matches(address))
+                if len(self.cache) >= MAX_CACHED_ADDRESSES:
+                    self.cache = {}
+                self.cache[address] = routes
+        return routes
+
+    def dispatch(self, address: str, data: tuple) -> int:
+        """
+        Call every handler that matches the address.
+
+        Returns:
+            The number of handlers called.
+        """
+        routes = self.routes_for(address)
+        for route in routes:
+            route(data)
+        return len(routes)
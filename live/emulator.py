@@ -0,0 +1,798 @@
+"""
+An in-process emulator of Ableton Live running AbletonOSC, for testing and
+benchmarking pylive without Live.
+
+    with LiveEmulator(port=0, num_tracks=64, latency=0.002, loss=0.01) as emulator:
+        set = live.Set(client=live.Query(emulator.address, listen_port=0))
+        set.scan()
+
+The emulator holds a synthetic set model (tracks, clips with notes, devices
+with parameters), and serves the AbletonOSC addresses that pylive uses:
+song, track, clip, clip slot and device getters and setters, track_data,
+export/structure, property listeners, and beat and startup events.
+Replies are sent to the address that each query came from, or with
+reply_port set, to a fixed port on the sender's host.
+
+Network conditions can be simulated with a fixed latency, random jitter and
+random packet loss, applied with a seeded random number generator so that
+runs are repeatable.
+
+It can also be run standalone, to serve examples and scripts:
+
+    python3 -m live.emulator --tracks 16 --latency 0.001
+"""
+
+import math
+import time
+import json
+import heapq
+import random
+import socket
+import logging
+import argparse
+import threading
+
+from live.osc import encode_message
+from live.classes.set import song_structure_path
+
+from pythonosc.osc_packet import OscPacket, ParseError
+
+logger = logging.getLogger(__name__)
+
+#------------------------------------------------------------------------
+# Commands that are accepted, but have no effect on the synthetic set.
+#------------------------------------------------------------------------
+NO_OP_OBJECTS = {"undo", "redo", "prev", "next", "reload"}
+
+#------------------------------------------------------------------------
+# Default property values of each object in the synthetic set.
+#------------------------------------------------------------------------
+SONG_DEFAULTS = {
+    "tempo": 120.0,
+    "metronome": 0,
+    "clip_trigger_quantization": 4,
+    "arrangement_overdub": 0,
+    "back_to_arranger": 0,
+    "can_undo": 0,
+    "can_redo": 0,
+    "loop": 0,
+    "record_mode": 0,
+    "signature_numerator": 4,
+    "signature_denominator": 4,
+}
+
+TRACK_DEFAULTS = {
+    "volume": 0.85,
+    "panning": 0.0,
+    "mute": 0,
+    "arm": 0,
+    "solo": 0,
+    "color_index": 0,
+    "playing_slot_index": -1,
+    "fired_slot_index": -1,
+    "has_midi_input": 1,
+    "has_audio_input": 0,
+}
+
+CLIP_DEFAULTS = {
+    "pitch_coarse": 0,
+    "pitch_fine": 0.0,
+    "is_playing": 0,
+    "is_midi_clip": 1,
+    "is_audio_clip": 0,
+    "file_path": "",
+    "looping": 1,
+    "color_index": 0,
+}
+
+class EmulatedSet:
+    """
+    A synthetic Live set, generated deterministically from its dimensions.
+
+    Tracks, clips, devices and parameters are held as dicts of property values,
+    and can be inspected and modified directly by tests.
+    """
+
+    def __init__(self,
+                 num_tracks: int = 8,
+                 num_scenes: int = 8,
+                 clip_density: float = 0.5,
+                 notes_per_clip: int = 4,
+                 devices_per_track: int = 2,
+                 parameters_per_device: int = 8,
+                 group_size: int = 0,
+                 seed: int = 0):
+        """
+        Args:
+            num_tracks: Number of tracks.
+            num_scenes: Number of scenes (i.e., clip slots per track).
+            clip_density: Probability that each clip slot contains a clip.
+            notes_per_clip: Number of MIDI notes in each clip.
+            devices_per_track: Number of devices on each track.
+            parameters_per_device: Number of parameters of each device.
+            group_size: If non-zero, every group_size'th track is a group track,
+                        containing the following group_size - 1 tracks.
+            seed: Seed for the random generation of clips and parameter values.
+        """
+        rng = random.Random(seed)
+        self.song = dict(SONG_DEFAULTS)
+        self.num_scenes = num_scenes
+        self.tracks = []
+        for track_index in range(num_tracks):
+            is_group = group_size > 0 and track_index % group_size == 0
+            if group_size > 0 and not is_group:
+                group_track = track_index - track_index % group_size
+            else:
+                group_track = None
+            track = dict(TRACK_DEFAULTS)
+            track.update({
+                "name": "%s %d" % ("Group" if is_group else "Track", track_index + 1),
+                "is_foldable": int(is_group),
+                "group_track": group_track,
+                "sends": [0.0, 0.0],
+                "clips": [],
+                "devices": [],
+            })
+            for clip_index in range(num_scenes):
+                if is_group or rng.random() >= clip_density:
+                    track["clips"].append(None)
+                    continue
+                clip = dict(CLIP_DEFAULTS)
+                clip["name"] = "Clip %d.%d" % (track_index + 1, clip_index + 1)
+                clip["length"] = float(rng.choice([4, 8, 16]))
+                clip["notes"] = [(rng.randrange(36, 84), float(n), 0.5, rng.randrange(40, 128), 0)
+                                 for n in range(notes_per_clip)]
+                track["clips"].append(clip)
+            for device_index in range(0 if is_group else devices_per_track):
+                device = {
+                    "name": "Device %d.%d" % (track_index + 1, device_index + 1),
+                    "class_name": "PluginDevice",
+                    "type": 1,
+                    "parameters": [],
+                }
+                for parameter_index in range(parameters_per_device):
+                    is_quantized = parameter_index == 0
+                    device["parameters"].append({
+                        "name": "Device On" if is_quantized else "Parameter %d" % parameter_index,
+                        "value": 1.0 if is_quantized else round(rng.random(), 3),
+                        "min": 0.0,
+                        "max": 1.0,
+                        "is_quantized": int(is_quantized),
+                    })
+                track["devices"].append(device)
+            self.tracks.append(track)
+
+    def structure(self) -> dict:
+        """
+        Returns the set's structure, in the JSON form written by AbletonOSC's
+        /live/song/export/structure.
+        """
+        return {
+            "tracks": [{
+                "index": track_index,
+                "name": track["name"],
+                "is_foldable": bool(track["is_foldable"]),
+                "group_track": track["group_track"],
+                "clips": [{"index": clip_index, "name": clip["name"], "length": clip["length"]}
+                          for clip_index, clip in enumerate(track["clips"]) if clip is not None],
+                "devices": [{
+                    "name": device["name"],
+                    "parameters": [{key: parameter[key] for key in ("name", "value", "min", "max", "is_quantized")}
+                                   for parameter in device["parameters"]],
+                } for device in track["devices"]],
+            } for track_index, track in enumerate(self.tracks)]
+        }
+
+class LiveEmulator:
+    """
+    A UDP server that emulates Ableton Live running AbletonOSC.
+    See the module docstring for usage.
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 11000,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 loss: float = 0.0,
+                 seed: int = None,
+                 structure_path: str = None,
+                 reply_port: int = None,
+                 **set_kwargs):
+        """
+        Args:
+            host: The address to listen on.
+            port: The port to listen on. Set to 0 to use any free port.
+            latency: Delay before each reply is sent, in seconds.
+            jitter: Maximum random delay added to the latency, in seconds.
+            loss: Probability that each datagram is dropped, in each direction.
+            seed: Seed for the random generation of jitter and loss.
+            structure_path: Path to write the song structure to on /live/song/export/structure.
+                            Defaults to the path that AbletonOSC uses.
+            reply_port: If set, replies are sent to this port on the sender's host,
+                        like a server with a fixed reply port, rather than to the
+                        port that each message came from.
+            set_kwargs: Further arguments to EmulatedSet (num_tracks, num_scenes, ...)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.structure_path = structure_path or song_structure_path()
+        self.reply_port = reply_port
+        self.set = EmulatedSet(**set_kwargs)
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.address = self.socket.getsockname()
+
+        self.lock = threading.RLock()
+        self.clients: set[tuple] = set()
+
+        #------------------------------------------------------------------------
+        # Property listeners: (address, args) -> set of client addresses
+        #------------------------------------------------------------------------
+        self.listeners: dict[tuple, set] = {}
+        self.beat_listeners: set[tuple] = set()
+
+        #------------------------------------------------------------------------
+        # Transport state. The song time advances with the tempo while playing.
+        #------------------------------------------------------------------------
+        self.is_playing = False
+        self.song_time_base = 0.0
+        self.play_started_at = 0.0
+        self.transport_changed = threading.Event()
+
+        #------------------------------------------------------------------------
+        # Replies and bundles awaiting their send time: (time, seq, fn, args)
+        #------------------------------------------------------------------------
+        self.schedule = []
+        self.schedule_seq = 0
+        self.schedule_condition = threading.Condition(threading.Lock())
+
+        self.received = 0
+        self.dropped = 0
+        self.sent = 0
+
+        self.running = False
+        self.threads = []
+
+    def __str__(self):
+        return "LiveEmulator (%s:%d, %d tracks)" % (self.address[0], self.address[1], len(self.set.tracks))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self) -> None:
+        """ Start serving requests. """
+        self.running = True
+        for target in (self._receive, self._run_schedule, self._run_beats):
+            thread = threading.Thread(target=target, name="pylive-emulator", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self) -> None:
+        """ Stop serving requests, and close the socket. """
+        self.running = False
+        self.transport_changed.set()
+        with self.schedule_condition:
+            self.schedule_condition.notify_all()
+        #------------------------------------------------------------------------
+        # Wake the receive thread with an empty datagram.
+        #------------------------------------------------------------------------
+        wake_address = ("127.0.0.1", self.address[1]) if self.address[0] == "0.0.0.0" else self.address
+        try:
+            self.socket.sendto(b"", wake_address)
+        except OSError:
+            pass
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        self.socket.close()
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Counts of datagrams received, dropped (in either direction) and sent.
+        """
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "sent": self.sent,
+        }
+
+    #------------------------------------------------------------------------
+    # Transport
+    #------------------------------------------------------------------------
+
+    @property
+    def song_time(self) -> float:
+        """ The current song time, in beats. """
+        if not self.is_playing:
+            return self.song_time_base
+        return self.song_time_base + (time.monotonic() - self.play_started_at) * self.set.song["tempo"] / 60.0
+
+    @song_time.setter
+    def song_time(self, value: float):
+        self.song_time_base = value
+        self.play_started_at = time.monotonic()
+
+    def start_playing(self, song_time: float = None) -> None:
+        with self.lock:
+            if song_time is not None:
+                self.song_time_base = song_time
+            elif self.is_playing:
+                self.song_time_base = self.song_time
+            self.play_started_at = time.monotonic()
+            self.is_playing = True
+        self.transport_changed.set()
+
+    def stop_playing(self) -> None:
+        with self.lock:
+            self.song_time_base = self.song_time
+            self.is_playing = False
+
+    #------------------------------------------------------------------------
+    # Sending
+    #------------------------------------------------------------------------
+
+    def send(self, address: str, args: tuple, client: tuple) -> None:
+        """
+        Send a message to a client, subject to the emulated latency, jitter and loss.
+        """
+        self.send_dgram(encode_message(address, tuple(args)), client)
+
+    def send_dgram(self, dgram: bytes, client: tuple) -> None:
+        if self.loss and self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = self.latency
+        if self.jitter:
+            delay += self.rng.uniform(0.0, self.jitter)
+        if delay > 0:
+            self._schedule(time.monotonic() + delay, self._sendto, (dgram, client))
+        else:
+            self._sendto(dgram, client)
+
+    def broadcast(self, address: str, args: tuple = ()) -> None:
+        """ Send a message to every client that has sent a message to the emulator. """
+        for client in list(self.clients):
+            self.send(address, args, client)
+
+    def send_startup(self) -> None:
+        """ Notify clients that a set has been opened, as Live does on startup. """
+        self.broadcast("/live/startup")
+
+    def _sendto(self, dgram: bytes, client: tuple):
+        try:
+            self.socket.sendto(dgram, client)
+            self.sent += 1
+        except OSError as e:
+            logger.debug("Couldn't send to %s: %s" % (client, e))
+
+    def _schedule(self, when: float, fn, args: tuple):
+        with self.schedule_condition:
+            self.schedule_seq += 1
+            heapq.heappush(self.schedule, (when, self.schedule_seq, fn, args))
+            self.schedule_condition.notify()
+
+    def _run_schedule(self):
+        while self.running:
+            with self.schedule_condition:
+                while self.running and (not self.schedule or self.schedule[0][0] > time.monotonic()):
+                    timeout = self.schedule[0][0] - time.monotonic() if self.schedule else None
+                    self.schedule_condition.wait(timeout)
+                if not self.running:
+                    return
+                _, _, fn, args = heapq.heappop(self.schedule)
+            fn(*args)
+
+    def _run_beats(self):
+        #------------------------------------------------------------------------
+        # Send /live/song/get/beat to beat listeners on each beat while playing,
+        # waking at each beat boundary, when playback starts, or periodically
+        # to follow changes of tempo.
+        #------------------------------------------------------------------------
+        last_beat = None
+        while self.running:
+            wait = 0.05
+            if self.is_playing:
+                song_time = self.song_time
+                beat = int(math.floor(song_time))
+                if beat != last_beat:
+                    last_beat = beat
+                    for client in list(self.beat_listeners):
+                        self.send("/live/song/get/beat", (beat,), client)
+                wait = min(wait, (beat + 1 - song_time) * 60.0 / self.set.song["tempo"])
+            else:
+                last_beat = None
+            self.transport_changed.wait(max(0.0005, wait))
+            self.transport_changed.clear()
+
+    #------------------------------------------------------------------------
+    # Receiving
+    #------------------------------------------------------------------------
+
+    def _receive(self):
+        while self.running:
+            try:
+                data, client = self.socket.recvfrom(65536)
+            except OSError:
+                return
+            if not self.running:
+                return
+            if not data:
+                continue
+            if self.reply_port is not None:
+                client = (client[0], self.reply_port)
+            self.received += 1
+            if self.loss and self.rng.random() < self.loss:
+                self.dropped += 1
+                continue
+            self.clients.add(client)
+            try:
+                packet = OscPacket(data)
+            except ParseError as e:
+                logger.warning("Couldn't parse OSC packet: %s" % e)
+                continue
+
+            #------------------------------------------------------------------------
+            # Messages in bundles with a future timetag are applied at that time.
+            #------------------------------------------------------------------------
+            now = time.time()
+            for timed_message in packet.messages:
+                message = timed_message.message
+                if timed_message.time > now:
+                    self._schedule(time.monotonic() + timed_message.time - now, self.handle,
+                                   (message.address, tuple(message.params), client))
+                else:
+                    self.handle(message.address, tuple(message.params), client)
+
+    def handle(self, address: str, args: tuple, client: tuple) -> None:
+        """
+        Apply a message from a client, sending any reply back to it.
+        """
+        parts = address.split("/")
+        if len(parts) < 4 or parts[1] != "live":
+            parts = parts + [""] * (4 - len(parts))
+        obj, verb, prop = parts[2], parts[3], "/".join(parts[4:])
+        if obj in NO_OP_OBJECTS:
+            return
+        try:
+            with self.lock:
+                if verb in ("start_listen", "stop_listen"):
+                    self._handle_listen(obj, verb, prop, args, client)
+                    return
+                handler = getattr(self, "_handle_%s" % obj, None)
+                if handler is None:
+                    raise KeyError(address)
+                rv = handler(verb, prop, args)
+            if rv is not None:
+                self.send(address, rv, client)
+            if verb == "set" or obj == "clip_slot" or address in ("/live/song/start_playing",
+                                                                  "/live/song/stop_playing",
+                                                                  "/live/song/continue_playing"):
+                self._notify_listeners()
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+            logger.debug("Error handling %s %s: %s" % (address, args, e))
+            self.send("/live/error", ("Error handling OSC message: %s %s" % (address, e),), client)
+
+    #------------------------------------------------------------------------
+    # Handlers, returning the arguments of the reply (or None).
+    #------------------------------------------------------------------------
+
+    def _handle_test(self, verb, prop, args):
+        return ("ok",)
+
+    def _handle_application(self, verb, prop, args):
+        if prop == "version":
+            return (11, 3)
+        if prop == "average_process_usage":
+            return (5.0,)
+        raise KeyError(prop)
+
+    def _handle_api(self, verb, prop, args):
+        if prop == "log_level":
+            if verb == "set":
+                self.set.song["_log_level"] = args[0]
+                return None
+            return (self.set.song.get("_log_level", "info"),)
+        raise KeyError(prop)
+
+    def _handle_song(self, verb, prop, args):
+        song = self.set.song
+        if verb == "get":
+            if prop == "num_tracks":
+                return (len(self.set.tracks),)
+            if prop == "num_scenes":
+                return (self.set.num_scenes,)
+            if prop == "is_playing":
+                return (int(self.is_playing),)
+            if prop == "current_song_time":
+                return (float(self.song_time),)
+            if prop == "track_data":
+                return self._track_data(*args)
+            if prop == "track_names":
+                return tuple(track["name"] for track in self.set.tracks)
+            return (song[prop],)
+        elif verb == "set":
+            if prop == "current_song_time":
+                self.song_time = float(args[0])
+            elif prop == "tempo":
+                #------------------------------------------------------------------------
+                # Rebase the song time, so that it only advances at the new tempo
+                # from now on.
+                #------------------------------------------------------------------------
+                self.song_time = self.song_time
+                song[prop] = args[0]
+                self.transport_changed.set()
+            elif prop in song:
+                song[prop] = args[0]
+            else:
+                raise KeyError(prop)
+            return None
+        elif verb == "export" and prop == "structure":
+            with open(self.structure_path, "w") as fd:
+                json.dump(self.set.structure(), fd)
+            return (1,)
+        elif verb == "start_playing":
+            self.start_playing(0.0)
+        elif verb == "continue_playing":
+            self.start_playing()
+        elif verb == "stop_playing":
+            self.stop_playing()
+        elif verb == "stop_all_clips":
+            for track in self.set.tracks:
+                self._stop_track(track)
+        elif verb in ("create_midi_track", "create_audio_track"):
+            index = args[0] if args and args[0] >= 0 else len(self.set.tracks)
+            track = EmulatedSet(num_tracks=1, num_scenes=self.set.num_scenes, clip_density=0).tracks[0]
+            track["has_audio_input"] = int(verb == "create_audio_track")
+            track["has_midi_input"] = int(verb == "create_midi_track")
+            self.set.tracks.insert(index, track)
+        elif verb == "delete_track":
+            del self.set.tracks[args[0]]
+        elif verb == "duplicate_track":
+            self.set.tracks.insert(args[0] + 1, json.loads(json.dumps(self.set.tracks[args[0]])))
+        elif verb == "create_scene":
+            index = args[0] if args and args[0] >= 0 else self.set.num_scenes
+            for track in self.set.tracks:
+                track["clips"].insert(index, None)
+            self.set.num_scenes += 1
+        elif verb == "delete_scene":
+            for track in self.set.tracks:
+                del track["clips"][args[0]]
+            self.set.num_scenes -= 1
+        else:
+            raise KeyError(verb)
+        return None
+
+    def _handle_track(self, verb, prop, args):
+        track = self.set.tracks[args[0]]
+        if verb == "get":
+            if prop == "send":
+                return (args[0], args[1], track["sends"][args[1]])
+            if prop == "num_devices":
+                return (args[0], len(track["devices"]))
+            if prop in ("clips/name", "clips/length"):
+                key = prop.split("/")[1]
+                return (args[0],) + tuple(clip[key] if clip else None for clip in track["clips"])
+            if prop in ("devices/name", "devices/class_name", "devices/type"):
+                key = prop.split("/")[1]
+                return (args[0],) + tuple(device[key] for device in track["devices"])
+            return (args[0], track[prop])
+        elif verb == "set":
+            if prop == "send":
+                track["sends"][args[1]] = args[2]
+            elif prop in track and prop not in ("clips", "devices"):
+                track[prop] = args[1]
+            else:
+                raise KeyError(prop)
+            return None
+        elif verb == "stop_all_clips":
+            self._stop_track(track)
+            return None
+        raise KeyError(verb)
+
+    def _handle_clip_slot(self, verb, prop, args):
+        track = self.set.tracks[args[0]]
+        clip = track["clips"][args[1]]
+        if verb == "get" and prop == "has_clip":
+            return (args[0], args[1], int(clip is not None))
+        if verb == "fire":
+            self._stop_track(track)
+            if clip is not None:
+                clip["is_playing"] = 1
+                track["playing_slot_index"] = args[1]
+            return None
+        if verb == "create_clip":
+            if clip is not None:
+                raise ValueError("Clip slot already has a clip")
+            clip = dict(CLIP_DEFAULTS)
+            clip.update({"name": "", "length": float(args[2]), "notes": []})
+            track["clips"][args[1]] = clip
+            return None
+        if verb == "delete_clip":
+            track["clips"][args[1]] = None
+            return None
+        raise KeyError(verb)
+
+    def _handle_clip(self, verb, prop, args):
+        track = self.set.tracks[args[0]]
+        clip = track["clips"][args[1]]
+        if clip is None:
+            raise IndexError("No clip in slot %d" % args[1])
+        if verb == "get":
+            if prop == "notes":
+                notes = clip["notes"]
+                if len(args) > 2:
+                    start_pitch, pitch_span, start_time, time_span = args[2:6]
+                    notes = [note for note in notes
+                             if start_pitch <= note[0] < start_pitch + pitch_span
+                             and start_time <= note[1] < start_time + time_span]
+                return (args[0], args[1]) + tuple(value for note in sorted(notes, key=lambda n: (n[1], n[0]))
+                                                  for value in note)
+            return (args[0], args[1], clip[prop])
+        elif verb == "set":
+            if prop not in clip or prop == "notes":
+                raise KeyError(prop)
+            clip[prop] = args[2]
+        elif verb == "fire":
+            return self._handle_clip_slot("fire", "", args)
+        elif verb == "stop":
+            if clip["is_playing"]:
+                clip["is_playing"] = 0
+                track["playing_slot_index"] = -1
+        elif verb == "add" and prop == "notes":
+            values = args[2:]
+            if len(values) % 5:
+                raise ValueError("Notes must be specified as (pitch, start, duration, velocity, mute)")
+            for index in range(0, len(values), 5):
+                pitch, start, duration, velocity, mute = values[index:index + 5]
+                clip["notes"].append((int(pitch), float(start), float(duration), int(velocity), int(mute)))
+        elif verb == "remove" and prop == "notes":
+            if len(args) > 2:
+                start_pitch, pitch_span, start_time, time_span = args[2:6]
+                clip["notes"] = [note for note in clip["notes"]
+                                 if not (start_pitch <= note[0] < start_pitch + pitch_span
+                                         and start_time <= note[1] < start_time + time_span)]
+            else:
+                clip["notes"] = []
+        else:
+            raise KeyError(verb)
+        return None
+
+    def _handle_device(self, verb, prop, args):
+        device = self.set.tracks[args[0]]["devices"][args[1]]
+        parameters = device["parameters"]
+        if verb == "get":
+            if prop == "num_parameters":
+                return (args[0], args[1], len(parameters))
+            if prop.startswith("parameters/"):
+                key = prop.split("/")[1]
+                return (args[0], args[1]) + tuple(parameter[key] for parameter in parameters)
+            if prop == "parameter/value":
+                return (args[0], args[1], args[2], parameters[args[2]]["value"])
+            if prop == "parameter/name":
+                return (args[0], args[1], args[2], parameters[args[2]]["name"])
+            return (args[0], args[1], device[prop])
+        elif verb == "set":
+            if prop == "parameters/value":
+                values = args[2:]
+                for parameter, value in zip(parameters, values):
+                    parameter["value"] = self._clamp(parameter, value)
+            elif prop == "parameter/value":
+                parameter = parameters[args[2]]
+                parameter["value"] = self._clamp(parameter, args[3])
+            else:
+                raise KeyError(prop)
+            return None
+        raise KeyError(verb)
+
+    def _handle_listen(self, obj, verb, prop, args, client):
+        if obj == "song" and prop == "beat":
+            if verb == "start_listen":
+                self.beat_listeners.add(client)
+            else:
+                self.beat_listeners.discard(client)
+            return
+        key = ("/live/%s/get/%s" % (obj, prop), tuple(args))
+        if verb == "start_listen":
+            #------------------------------------------------------------------------
+            # As AbletonOSC does, send the current value when listening starts.
+            #------------------------------------------------------------------------
+            value = getattr(self, "_handle_%s" % obj)("get", prop, args)
+            self.listeners.setdefault(key, {})[client] = value
+            self.send(key[0], value, client)
+        else:
+            clients = self.listeners.get(key, {})
+            clients.pop(client, None)
+            if not clients:
+                self.listeners.pop(key, None)
+
+    def _notify_listeners(self):
+        #------------------------------------------------------------------------
+        # Send the new value of each listened-to property that has changed.
+        #------------------------------------------------------------------------
+        with self.lock:
+            changes = []
+            for (address, args), clients in self.listeners.items():
+                obj, prop = address.split("/", 4)[2], address.split("/", 4)[4]
+                try:
+                    value = getattr(self, "_handle_%s" % obj)("get", prop, args)
+                except (KeyError, IndexError):
+                    continue
+                for client, last_value in clients.items():
+                    if value != last_value:
+                        clients[client] = value
+                        changes.append((address, value, client))
+        for address, value, client in changes:
+            self.send(address, value, client)
+
+    def _track_data(self, track_index_min: int, track_index_max: int, *props):
+        #------------------------------------------------------------------------
+        # As per AbletonOSC: for each track, for each property, either the
+        # track's value, or a value per clip slot or device.
+        #------------------------------------------------------------------------
+        rv = []
+        for track in self.set.tracks[track_index_min:track_index_max]:
+            for prop in props:
+                obj, key = prop.split(".", 1)
+                if obj == "track":
+                    if key == "num_devices":
+                        rv.append(len(track["devices"]))
+                    else:
+                        rv.append(track[key])
+                elif obj == "clip":
+                    rv.extend(clip[key] if clip is not None else None for clip in track["clips"])
+                elif obj == "clip_slot" and key == "has_clip":
+                    rv.extend(int(clip is not None) for clip in track["clips"])
+                elif obj == "device":
+                    rv.extend(device[key] for device in track["devices"])
+                else:
+                    raise KeyError(prop)
+        return tuple(rv)
+
+    def _stop_track(self, track: dict):
+        for clip in track["clips"]:
+            if clip is not None:
+                clip["is_playing"] = 0
+        track["playing_slot_index"] = -1
+
+    @staticmethod
+    def _clamp(parameter: dict, value: float) -> float:
+        return min(parameter["max"], max(parameter["min"], float(value)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Emulate Ableton Live running AbletonOSC")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=11000, help="Port to listen on")
+    parser.add_argument("--tracks", type=int, default=8, help="Number of tracks")
+    parser.add_argument("--scenes", type=int, default=8, help="Number of scenes")
+    parser.add_argument("--latency", type=float, default=0.0, help="Reply latency, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum random additional latency, in seconds")
+    parser.add_argument("--loss", type=float, default=0.0, help="Packet loss probability")
+    parser.add_argument("--reply-port", type=int, default=None, help="Send replies to this fixed port, rather than the sender's port")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    emulator = LiveEmulator(args.host, args.port,
+                            latency=args.latency, jitter=args.jitter, loss=args.loss, reply_port=args.reply_port,
+                            num_tracks=args.tracks, num_scenes=args.scenes)
+    emulator.start()
+    print("Emulating Live on %s:%d (%d tracks, %d scenes)" % (*emulator.address, args.tracks, args.scenes))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+
+if __name__ == "__main__":
+    main()
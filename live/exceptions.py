@@ -20,3 +20,9 @@ class LiveInvalidOperationException(LiveException):
     """
     Error performing an operation.
     """
+
+class LiveTimeoutError(LiveConnectionError):
+    """
+    Timed out waiting for a response from AbletonOSC.
+    """
+    pass
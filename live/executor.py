@@ -0,0 +1,283 @@
+import logging
+import threading
+import collections
+
+from live.profiling import span
+
+logger = logging.getLogger(__name__)
+
+#------------------------------------------------------------------------
+# Maximum number of queued calls that a worker makes to one handler before
+# yielding to other handlers.
+#------------------------------------------------------------------------
+MAX_CALLS_PER_DRAIN = 64
+
+class HandlerQueue:
+    """
+    Bounded queue of pending calls to a single handler. Calls to each handler
+    are made in order, and never concurrently.
+    """
+
+    __slots__ = ("route", "items", "maxsize", "policy", "lock", "scheduled",
+                 "processed", "dropped", "errors", "max_depth")
+
+    def __init__(self, route, maxsize: int, policy: str):
+        self.route = route
+        self.items = collections.deque()
+        self.maxsize = maxsize
+        self.policy = policy
+        self.lock = threading.Lock()
+        self.scheduled = False
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+
+    def put(self, data: tuple) -> bool:
+        """
+        Add a call to the queue, applying the overflow policy if the queue is full.
+
+        Returns:
+            True if the queue needs to be scheduled for draining.
+        """
+        with self.lock:
+            if len(self.items) >= self.maxsize:
+                self.dropped += 1
+                if self.policy == "drop_newest":
+                    return False
+                self.items.popleft()
+            self.items.append(data)
+            if len(self.items) > self.max_depth:
+                self.max_depth = len(self.items)
+            if self.scheduled:
+                return False
+            self.scheduled = True
+            return True
+
+    def take(self):
+        """
+        Returns:
+            The next call's arguments, or None if the queue is empty (in which
+            case it is marked as unscheduled).
+        """
+        with self.lock:
+            if self.items:
+                return self.items.popleft()
+            self.scheduled = False
+            return None
+
+    def clear(self) -> None:
+        """
+        Discard all pending calls, counting them as dropped.
+        """
+        with self.lock:
+            self.dropped += len(self.items)
+            self.items.clear()
+            self.scheduled = False
+
+class CallbackExecutor:
+    """
+    Runs user callbacks away from the OSC receive thread, so that a slow
+    callback (or one that itself queries Live) cannot stall query replies.
+
+    Each handler has its own bounded queue. When a queue is full, either the
+    oldest queued call ("drop_oldest") or the incoming call ("drop_newest")
+    is discarded and counted, so the receive thread never blocks.
+
+    Modes:
+        "thread":  Callbacks run on a thread pool.
+        "process": Callbacks run on a process pool. Handlers and their arguments
+                   must be picklable.
+        "asyncio": Callbacks run on an asyncio event loop. Coroutine functions
+                   are awaited.
+        "inline":  Callbacks run directly on the receive thread.
+    """
+
+    def __init__(self,
+                 mode: str = "thread",
+                 max_workers: int = 4,
+                 queue_size: int = 1024,
+                 policy: str = "drop_oldest",
+                 loop: "asyncio.AbstractEventLoop" = None):
+        """
+        Args:
+            mode: One of "thread", "process", "asyncio" or "inline".
+            max_workers: Number of pool workers (thread/process modes).
+            queue_size: Maximum number of pending calls per handler.
+            policy: Overflow policy, "drop_oldest" or "drop_newest".
+            loop: The event loop to run callbacks on (asyncio mode).
+        """
+        if mode not in ("thread", "process", "asyncio", "inline"):
+            raise ValueError("Invalid value for 'mode': %s" % mode)
+        if policy not in ("drop_oldest", "drop_newest"):
+            raise ValueError("Invalid value for 'policy': %s" % policy)
+        if mode == "asyncio" and loop is None:
+            raise ValueError("An event loop must be specified for asyncio mode")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.policy = policy
+        self.loop = loop
+        self.queues: dict[object, HandlerQueue] = {}
+        self.lock = threading.Lock()
+
+        #------------------------------------------------------------------------
+        # Pools are created when the first callback is submitted, so that
+        # clients that register no handlers start no threads.
+        #------------------------------------------------------------------------
+        self.thread_pool = None
+        self.process_pool = None
+        self.is_shutdown = False
+        self.worker_state = threading.local()
+
+    def _start_pools(self):
+        """
+        Returns:
+            The thread pool on which queues are drained, creating it if necessary.
+
+        Raises:
+            RuntimeError: If the executor has been shut down.
+        """
+        import concurrent.futures
+
+        with self.lock:
+            if self.is_shutdown:
+                raise RuntimeError("Executor has been shut down")
+            if self.thread_pool is not None:
+                return self.thread_pool
+            if self.mode == "process":
+                #------------------------------------------------------------------------
+                # Queues are drained by local threads, each of which waits on the
+                # process pool, preserving per-handler ordering.
+                #------------------------------------------------------------------------
+                self.process_pool = concurrent.futures.ProcessPoolExecutor(self.max_workers)
+            self.thread_pool = concurrent.futures.ThreadPoolExecutor(self.max_workers,
+                                                                     thread_name_prefix="pylive-callback")
+            return self.thread_pool
+
+    def submit(self, route, data: tuple) -> None:
+        """
+        Queue a call to a route's handler with the given message arguments.
+        Never blocks.
+        """
+        if self.mode == "inline" or route.inline:
+            self._call(route, data)
+            return
+
+        queue = self.queues.get(route)
+        if queue is None:
+            with self.lock:
+                queue = self.queues.setdefault(route, HandlerQueue(route, self.queue_size, self.policy))
+
+        if queue.put(data):
+            try:
+                if self.mode == "asyncio":
+                    import asyncio
+                    asyncio.run_coroutine_threadsafe(self._drain_async(queue), self.loop)
+                else:
+                    thread_pool = self.thread_pool or self._start_pools()
+                    thread_pool.submit(self._drain, queue)
+            except RuntimeError:
+                #------------------------------------------------------------------------
+                # The executor (or event loop) has been shut down.
+                #------------------------------------------------------------------------
+                queue.clear()
+
+    def discard(self, route) -> None:
+        """
+        Discard the queue for a route that has been removed.
+        """
+        with self.lock:
+            queue = self.queues.pop(route, None)
+        if queue is not None:
+            queue.clear()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the executor. If wait is True, waits for queued callbacks to complete,
+        unless called from a callback, which cannot wait for itself.
+        """
+        with self.lock:
+            self.is_shutdown = True
+        if getattr(self.worker_state, "active", False):
+            wait = False
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown(wait=wait)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=wait)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Total queue depth and dropped calls, plus per-handler counters
+                  of queue depth, maximum depth, calls processed, dropped and failed.
+        """
+        handlers = {}
+        for route, queue in list(self.queues.items()):
+            name = "%s %s" % (route.pattern, getattr(route.handler, "__qualname__", repr(route.handler)))
+            handlers[name] = {
+                "depth": len(queue.items),
+                "max_depth": queue.max_depth,
+                "processed": queue.processed,
+                "dropped": queue.dropped,
+                "errors": queue.errors,
+            }
+        return {
+            "depth": sum(handler["depth"] for handler in handlers.values()),
+            "dropped": sum(handler["dropped"] for handler in handlers.values()),
+            "handlers": handlers,
+        }
+
+    def _call(self, route, data: tuple):
+        try:
+            with span("callback", route.pattern):
+                return route(data)
+        except Exception as e:
+            logger.exception("Exception in callback for %s: %s" % (route.pattern, e))
+
+    def _drain(self, queue: HandlerQueue):
+        self.worker_state.active = True
+        for _ in range(MAX_CALLS_PER_DRAIN):
+            data = queue.take()
+            if data is None:
+                return
+            try:
+                with span("callback", queue.route.pattern):
+                    if self.process_pool is not None:
+                        self.process_pool.submit(queue.route.handler, *queue.route.args_for(data)).result()
+                    else:
+                        queue.route(data)
+            except Exception as e:
+                queue.errors += 1
+                logger.exception("Exception in callback for %s: %s" % (queue.route.pattern, e))
+            queue.processed += 1
+
+        #------------------------------------------------------------------------
+        # Yield to other handlers, rescheduling this queue at the back of the pool.
+        #------------------------------------------------------------------------
+        try:
+            self.thread_pool.submit(self._drain, queue)
+        except RuntimeError:
+            queue.clear()
+
+    async def _drain_async(self, queue: HandlerQueue):
+        import inspect
+
+        while True:
+            data = queue.take()
+            if data is None:
+                return
+            try:
+                #------------------------------------------------------------------------
+                # Spans nest per thread, so cannot span an await, during which other
+                # coroutines run: only the synchronous part of the call is recorded.
+                #------------------------------------------------------------------------
+                with span("callback", queue.route.pattern):
+                    rv = queue.route(data)
+                if inspect.isawaitable(rv):
+                    await rv
+            except Exception as e:
+                queue.errors += 1
+                logger.exception("Exception in callback for %s: %s" % (queue.route.pattern, e))
+            queue.processed += 1
@@ -0,0 +1,141 @@
+import contextlib
+import concurrent.futures
+
+from live.query import Query
+
+class QueryGroup:
+    """
+    Sends commands and queries to several Live instances at once, for rigs in
+    which multiple machines run Live in tandem.
+
+        group = QueryGroup.connect([("10.0.0.2", 11000), ("10.0.0.3", 11000)], [11001, 11002])
+        group.cmd("/live/song/set/tempo", (120.0,))
+        tempos = group.query("/live/song/get/tempo")
+
+    Commands are sent to each instance in turn without waiting. Queries are
+    sent to all instances concurrently, and their replies gathered under a
+    single deadline, so a query to N instances takes one round trip, not N.
+    """
+
+    def __init__(self, queries: list[Query]):
+        """
+        Args:
+            queries: A list of Query objects, one per Live instance.
+        """
+        self.queries = list(queries)
+        self.executor = None
+
+    @classmethod
+    def connect(cls, addresses: list[tuple], listen_ports: list[int]) -> "QueryGroup":
+        """
+        Create a QueryGroup with a new Query object for each address.
+
+        Each Query must receive its replies on a port of its own. If an instance
+        replies to a fixed port, that port must be given for it here; each instance
+        must then be configured with a different reply port. A port of 0 gives the
+        Query any free port, which only works if the instance replies to the port
+        that each query was sent from.
+
+        Args:
+            addresses: A list of (host, port) tuples on which AbletonOSC is listening.
+            listen_ports: A list of the local ports on which to receive replies,
+                          one per address.
+
+        Raises:
+            ValueError: If the number of ports does not match the number of addresses,
+                        or a non-zero port is given more than once.
+        """
+        addresses, listen_ports = list(addresses), list(listen_ports)
+        if len(listen_ports) != len(addresses):
+            raise ValueError("Expected %d listen ports, got %d" % (len(addresses), len(listen_ports)))
+        fixed_ports = [port for port in listen_ports if port != 0]
+        if len(set(fixed_ports)) != len(fixed_ports):
+            raise ValueError("Each instance must reply to a different listen port: %s" % listen_ports)
+        return cls([Query(address, listen_port) for address, listen_port in zip(addresses, listen_ports)])
+
+    def __len__(self):
+        return len(self.queries)
+
+    def __iter__(self):
+        return iter(self.queries)
+
+    def __getitem__(self, index: int) -> Query:
+        return self.queries[index]
+
+    def __str__(self):
+        return "QueryGroup (%d instances)" % len(self.queries)
+
+    def cmd(self, msg: str, args: tuple = ()) -> None:
+        """
+        Send a command to every Live instance, without expecting a response back:
+
+            group.cmd("/live/song/start_playing")
+        """
+        for query in self.queries:
+            query.cmd(msg, args)
+
+    def query(self, msg: str, args: tuple = (), timeout: float = None, return_exceptions: bool = False) -> list:
+        """
+        Send a query to every Live instance concurrently, and wait for all of the replies.
+
+        Args:
+            msg: The OSC address of the query.
+            args: The query's arguments.
+            timeout: The deadline for all replies, in seconds. Defaults to each Query's osc_timeout.
+            return_exceptions: If True, an instance that fails to reply has its exception
+                               returned in place of its reply, rather than raised.
+
+        Returns:
+            A list of replies, one per instance, in order.
+        """
+        return self.map(lambda query: query.query(msg, args, timeout=timeout), return_exceptions)
+
+    def query_many(self, queries: list, timeout: float = None, return_exceptions: bool = False) -> list[list]:
+        """
+        Send a batch of queries to every Live instance concurrently (see Query.query_many).
+
+        Returns:
+            A list of lists of replies, one list per instance, in order.
+        """
+        return self.map(lambda query: query.query_many(queries, timeout=timeout), return_exceptions)
+
+    def map(self, fn, return_exceptions: bool = False) -> list:
+        """
+        Call fn(query) for each Query concurrently, and gather the results in order.
+        """
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max(1, len(self.queries)),
+                                                                  thread_name_prefix="pylive-fanout")
+        futures = [self.executor.submit(fn, query) for query in self.queries]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    @contextlib.contextmanager
+    def bundle(self, timetag: float = None):
+        """
+        Collect commands sent via cmd() within the block into one OSC bundle per
+        instance. With a timetag, all instances apply the bundle at the same time
+        (assuming that their clocks are synchronised):
+
+            with group.bundle(time.time() + 0.1):
+                group.cmd("/live/song/start_playing")
+        """
+        with contextlib.ExitStack() as stack:
+            for query in self.queries:
+                stack.enter_context(query.bundle(timetag))
+            yield self
+
+    def stop(self) -> None:
+        """ Stop every Query in the group. """
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        for query in self.queries:
+            query.stop()
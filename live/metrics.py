@@ -0,0 +1,291 @@
+import os
+import sys
+import time
+import logging
+import threading
+
+#------------------------------------------------------------------------
+# Histogram resolution: values are recorded in microseconds, in buckets
+# whose width is 1/16 of their magnitude (i.e., within ~6%), up to 2^36us.
+#------------------------------------------------------------------------
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT // 2
+MAX_MAGNITUDE_BITS = 36
+NUM_BUCKETS = (MAX_MAGNITUDE_BITS - SUB_BUCKET_BITS + 2) * SUB_BUCKET_HALF
+
+#------------------------------------------------------------------------
+# Bucket boundaries (in seconds) of exported Prometheus histograms.
+#------------------------------------------------------------------------
+PROMETHEUS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                      0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class LatencyHistogram:
+    """
+    A log-linear histogram of durations, in the style of HdrHistogram:
+    recording is constant-time and allocation-free, with a bounded relative
+    error at every magnitude from 1us to hours.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        micros = int(seconds * 1e6)
+        if micros < SUB_BUCKET_COUNT:
+            index = max(0, micros)
+        else:
+            shift = micros.bit_length() - SUB_BUCKET_BITS
+            index = min(NUM_BUCKETS - 1, (shift + 1) * SUB_BUCKET_HALF + (micros >> shift) - SUB_BUCKET_HALF)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @staticmethod
+    def bucket_upper_bound(index: int) -> float:
+        """
+        Returns: The upper bound of a bucket, in seconds.
+        """
+        if index < SUB_BUCKET_COUNT:
+            return (index + 1) / 1e6
+        shift = index // SUB_BUCKET_HALF - 1
+        lower = (SUB_BUCKET_HALF + index % SUB_BUCKET_HALF) << shift
+        return (lower + (1 << shift)) / 1e6
+
+    def percentile(self, q: float) -> float:
+        """
+        Returns: The q'th percentile (0..100) of recorded durations, in seconds,
+                 or 0.0 if none have been recorded.
+        """
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(q / 100.0 * self.count + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.bucket_upper_bound(index), self.max)
+        return self.max
+
+    def cumulative_counts(self, bounds: tuple = PROMETHEUS_BUCKETS) -> list[int]:
+        """
+        Returns: For each bound (in seconds), the number of durations recorded in
+                 buckets that lie entirely at or below it.
+        """
+        rv = []
+        index = 0
+        seen = 0
+        for bound in bounds:
+            while index < NUM_BUCKETS and self.bucket_upper_bound(index) <= bound:
+                seen += self.counts[index]
+                index += 1
+            rv.append(seen)
+        return rv
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+class AddressMetrics:
+    """
+    Counters and query latencies for a single OSC address.
+    """
+
+    __slots__ = ("sent", "bytes_sent", "received", "bytes_received",
+                 "queries", "retries", "timeouts", "latency")
+
+    def __init__(self):
+        self.sent = 0
+        self.bytes_sent = 0
+        self.received = 0
+        self.bytes_received = 0
+        self.queries = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.latency = None
+
+class QueryMetrics:
+    """
+    Per-address metrics of the OSC traffic of a Query object: messages and
+    bytes sent and received, query latencies, retries and timeouts.
+
+    Recording takes no lock beyond the first use of each address, so costs
+    well under a microsecond. Under heavy concurrent use from many threads,
+    counts may therefore be very slightly under-reported.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.addresses: dict[str, AddressMetrics] = {}
+        self.started_at = time.time()
+
+    def _get(self, address: str) -> AddressMetrics:
+        metrics = self.addresses.get(address)
+        if metrics is None:
+            with self.lock:
+                metrics = self.addresses.setdefault(address, AddressMetrics())
+        return metrics
+
+    def record_send(self, address: str, nbytes: int) -> None:
+        metrics = self._get(address)
+        metrics.sent += 1
+        metrics.bytes_sent += nbytes
+
+    def record_receive(self, address: str, nbytes: int) -> None:
+        metrics = self._get(address)
+        metrics.received += 1
+        metrics.bytes_received += nbytes
+
+    def record_query(self, address: str, latency: float) -> None:
+        metrics = self._get(address)
+        metrics.queries += 1
+        if metrics.latency is None:
+            metrics.latency = LatencyHistogram()
+        metrics.latency.record(latency)
+
+    def record_retry(self, address: str) -> None:
+        self._get(address).retries += 1
+
+    def record_timeout(self, address: str) -> None:
+        self._get(address).timeouts += 1
+
+    def reset(self) -> None:
+        with self.lock:
+            self.addresses = {}
+            self.started_at = time.time()
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            dict: The metrics of each address, with latency percentiles in
+                  milliseconds, plus totals across all addresses.
+        """
+        addresses = {}
+        totals = dict.fromkeys(("sent", "bytes_sent", "received", "bytes_received",
+                                "queries", "retries", "timeouts"), 0)
+        for address, metrics in sorted(list(self.addresses.items())):
+            entry = {key: getattr(metrics, key) for key in totals}
+            for key in totals:
+                totals[key] += entry[key]
+            if metrics.latency is not None:
+                histogram = metrics.latency
+                entry["latency_ms"] = {
+                    "count": histogram.count,
+                    "mean": histogram.total / histogram.count * 1000 if histogram.count else 0.0,
+                    "p50": histogram.percentile(50) * 1000,
+                    "p90": histogram.percentile(90) * 1000,
+                    "p99": histogram.percentile(99) * 1000,
+                    "max": histogram.max * 1000,
+                }
+            addresses[address] = entry
+        return {
+            "duration_s": time.time() - self.started_at,
+            "totals": totals,
+            "addresses": addresses,
+        }
+
+def to_prometheus(metrics: QueryMetrics, labels: dict = None) -> str:
+    """
+    Render metrics in the Prometheus text exposition format.
+
+    Args:
+        metrics: The QueryMetrics to render.
+        labels: Labels to add to every sample, e.g. {"instance": "127.0.0.1:11000"}
+    """
+    base_labels = "".join('%s="%s",' % (key, _escape(value)) for key, value in (labels or {}).items())
+    addresses = sorted(list(metrics.addresses.items()))
+    lines = []
+    for name, attribute, description in (("messages_sent_total", "sent", "OSC messages sent to Live"),
+                                         ("bytes_sent_total", "bytes_sent", "Bytes of OSC messages sent to Live"),
+                                         ("messages_received_total", "received", "OSC messages received from Live"),
+                                         ("bytes_received_total", "bytes_received", "Bytes of OSC messages received from Live"),
+                                         ("query_retries_total", "retries", "Queries resent after a reply was lost"),
+                                         ("query_timeouts_total", "timeouts", "Queries that timed out")):
+        lines.append("# HELP pylive_%s %s" % (name, description))
+        lines.append("# TYPE pylive_%s counter" % name)
+        for address, address_metrics in addresses:
+            lines.append('pylive_%s{%saddress="%s"} %d' % (name, base_labels, _escape(address),
+                                                            getattr(address_metrics, attribute)))
+
+    lines.append("# HELP pylive_query_duration_seconds Round-trip time of queries to Live")
+    lines.append("# TYPE pylive_query_duration_seconds histogram")
+    for address, address_metrics in addresses:
+        histogram = address_metrics.latency
+        if histogram is None:
+            continue
+        labels = '%saddress="%s"' % (base_labels, _escape(address))
+        for bound, count in zip(PROMETHEUS_BUCKETS, histogram.cumulative_counts()):
+            lines.append('pylive_query_duration_seconds_bucket{%s,le="%g"} %d' % (labels, bound, count))
+        lines.append('pylive_query_duration_seconds_bucket{%s,le="+Inf"} %d' % (labels, histogram.count))
+        lines.append("pylive_query_duration_seconds_sum{%s} %.6f" % (labels, histogram.total))
+        lines.append("pylive_query_duration_seconds_count{%s} %d" % (labels, histogram.count))
+    return "\n".join(lines) + "\n"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+class PrometheusExporter:
+    """
+    Periodically writes metrics in the Prometheus text format, either to a
+    file (for node_exporter's textfile collector) or to stdout.
+    Files are replaced atomically, so are never read half-written.
+    """
+
+    def __init__(self, metrics: QueryMetrics, path: str = None, interval: float = 10.0, labels: dict = None):
+        """
+        Args:
+            metrics: The QueryMetrics to export.
+            path: Path of the file to write, e.g. /var/lib/node_exporter/pylive.prom.
+                  If None or "-", writes to stdout.
+            interval: Interval between writes, in seconds.
+            labels: Labels to add to every sample.
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.labels = labels
+        self.logger = logging.getLogger(__name__)
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self) -> None:
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="pylive-metrics", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """ Stop exporting, writing the metrics one final time. """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.write()
+
+    def write(self) -> None:
+        text = to_prometheus(self.metrics, self.labels)
+        if self.path is None or self.path == "-":
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            return
+        temp_path = "%s.%d.tmp" % (self.path, os.getpid())
+        with open(temp_path, "w") as fd:
+            fd.write(text)
+        os.replace(temp_path, self.path)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                self.logger.warning("Couldn't write metrics: %s" % e)
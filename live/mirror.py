@@ -0,0 +1,251 @@
+"""
+A local mirror of Live properties, kept up to date by AbletonOSC's property
+listeners, so that repeated reads are served from memory:
+
+    set.caching = True
+    set.tracks[0].mute      # queries Live, and starts listening for changes
+    set.tracks[0].mute      # served from the mirror
+"""
+
+import threading
+
+class MirrorEntry:
+    """
+    The mirrored value of a single property of a single object.
+    """
+
+    __slots__ = ("address", "args", "value", "refcount", "stale", "listening")
+
+    def __init__(self, address: str, args: tuple):
+        self.address = address
+        self.args = args
+        self.value = None
+        self.refcount = 0
+
+        #------------------------------------------------------------------------
+        # An entry is stale until a value has been received since Live last
+        # started listening for it, and is read from Live rather than the mirror.
+        #------------------------------------------------------------------------
+        self.stale = True
+        self.listening = False
+
+    def __str__(self):
+        return "MirrorEntry (%s %s): %s%s" % (self.address, self.args, self.value, " (stale)" if self.stale else "")
+
+class PropertyMirror:
+    """
+    Mirrors Live properties by subscribing to changes via AbletonOSC's
+    /live/<object>/start_listen/<property> addresses.
+
+    Each property is subscribed to on its first read, and thereafter updated
+    by the values that Live pushes when it changes. Subscriptions are reference
+    counted: each call to subscribe() (including the implicit subscription on
+    first read) is balanced by a call to unsubscribe(), and Live stops sending
+    changes once the count reaches zero.
+
+    Values are marked stale, and re-read from Live on next access, when Live
+    opens a set (as its listeners are lost) or when invalidate() is called.
+    As properties are identified by index, the mirror must be cleared when
+    tracks or scenes are added or removed, which Set does automatically.
+    """
+
+    def __init__(self, query):
+        """
+        Args:
+            query: The Query object used to communicate with Live.
+        """
+        self.live = query
+        self.lock = threading.Lock()
+        self.entries: dict[tuple, MirrorEntry] = {}
+
+        #------------------------------------------------------------------------
+        # Routes for each mirrored address, with the number of leading index
+        # arguments (track, clip, ...) that identify the object in each message.
+        #------------------------------------------------------------------------
+        self.routes: dict[str, tuple] = {}
+        self.startup_route = None
+
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, address: str, args: tuple = ()) -> list:
+        """
+        Returns the value of a property, subscribing to it if needed.
+
+        Args:
+            address: The property's query address, e.g. "/live/track/get/mute"
+            args: The index arguments that identify the object, e.g. (track_index,)
+
+        Returns:
+            The values of the property's reply, without the index arguments.
+        """
+        entry = self.entries.get((address, args))
+        if entry is not None and not entry.stale:
+            self.hits += 1
+            return entry.value
+
+        self.misses += 1
+        if entry is None:
+            entry = self.subscribe(address, args)
+        elif not entry.listening:
+            self._start_listening(entry)
+
+        #------------------------------------------------------------------------
+        # Replies pass through the mirror's handlers before the query returns,
+        # so the entry holds the value that was read, or any newer change.
+        #------------------------------------------------------------------------
+        rv = self.live.query(address, args)
+        return rv[len(args):] if entry.stale else entry.value
+
+    def update(self, address: str, args: tuple, value: list) -> None:
+        """
+        Set the mirrored value of a property that has been set locally, if it is
+        mirrored. Live then confirms the value with a change event.
+        """
+        entry = self.entries.get((address, args))
+        if entry is not None:
+            entry.value = list(value)
+
+    def is_stale(self, address: str, args: tuple = ()) -> bool:
+        """
+        Returns:
+            True if the property is not mirrored, or must be re-read from Live.
+        """
+        entry = self.entries.get((address, args))
+        return entry is None or entry.stale
+
+    #------------------------------------------------------------------------
+    # Subscriptions
+    #------------------------------------------------------------------------
+
+    def subscribe(self, address: str, args: tuple = ()) -> MirrorEntry:
+        """
+        Begin mirroring a property, or add a reference to an existing subscription.
+
+        Returns:
+            The MirrorEntry that holds the property's value.
+        """
+        args = tuple(args)
+        with self.lock:
+            entry = self.entries.get((address, args))
+            if entry is None:
+                entry = MirrorEntry(address, args)
+                self.entries[(address, args)] = entry
+                if address not in self.routes:
+                    self._add_route(address, len(args))
+            entry.refcount += 1
+            start = not entry.listening
+        if start:
+            self._start_listening(entry)
+        return entry
+
+    def unsubscribe(self, address: str, args: tuple = ()) -> bool:
+        """
+        Remove a reference to a subscription, stopping Live from sending changes
+        to the property when no references remain.
+
+        Returns:
+            True if the property was subscribed to, False otherwise.
+        """
+        args = tuple(args)
+        with self.lock:
+            entry = self.entries.get((address, args))
+            if entry is None:
+                return False
+            entry.refcount -= 1
+            if entry.refcount > 0:
+                return True
+            self._remove_entry(entry)
+        self._stop_listening(entry)
+        return True
+
+    def invalidate(self) -> None:
+        """
+        Mark all values as stale, so that they are re-read from Live on next access.
+        Subscriptions are kept.
+        """
+        with self.lock:
+            for entry in self.entries.values():
+                entry.stale = True
+
+    def clear(self) -> None:
+        """
+        Remove all subscriptions, regardless of their reference counts.
+        """
+        with self.lock:
+            entries = list(self.entries.values())
+            routes = [route for route, _ in self.routes.values()]
+            if self.startup_route is not None:
+                routes.append(self.startup_route)
+            self.entries = {}
+            self.routes = {}
+            self.startup_route = None
+        for route in routes:
+            self.live.dispatch_table.remove_route(route)
+        for entry in entries:
+            self._stop_listening(entry)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: The number of properties mirrored and stale, the number of reads
+                  served from the mirror (hits) and from Live (misses), and the
+                  number of values received from Live.
+        """
+        entries = list(self.entries.values())
+        return {
+            "entries": len(entries),
+            "stale": sum(entry.stale for entry in entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "updates": self.updates,
+        }
+
+    #------------------------------------------------------------------------
+    # Listening
+    #------------------------------------------------------------------------
+
+    def _start_listening(self, entry: MirrorEntry):
+        entry.listening = True
+        self.live.cmd(entry.address.replace("/get/", "/start_listen/", 1), entry.args)
+
+    def _stop_listening(self, entry: MirrorEntry):
+        if entry.listening and not self.live.stopped:
+            entry.listening = False
+            self.live.cmd(entry.address.replace("/get/", "/stop_listen/", 1), entry.args)
+
+    def _add_route(self, address: str, num_args: int):
+        # Must be called with the lock held.
+        def handler(*data):
+            entry = self.entries.get((address, tuple(data[:num_args])))
+            if entry is not None:
+                entry.value = list(data[num_args:])
+                entry.stale = False
+                self.updates += 1
+
+        self.live.listen()
+        table = self.live.dispatch_table
+        self.routes[address] = (table.add(address, handler, inline=True), num_args)
+        if self.startup_route is None:
+            self.startup_route = table.add("/live/startup", self._on_startup, inline=True)
+
+    def _remove_entry(self, entry: MirrorEntry):
+        # Must be called with the lock held.
+        del self.entries[(entry.address, entry.args)]
+        if not any(address == entry.address for address, _ in self.entries):
+            route, _ = self.routes.pop(entry.address)
+            self.live.dispatch_table.remove_route(route)
+
+    def _on_startup(self, *args):
+        #------------------------------------------------------------------------
+        # Live has opened a set, so its listeners have been removed. Listeners
+        # are restarted when each property is next read.
+        #------------------------------------------------------------------------
+        with self.lock:
+            for entry in self.entries.values():
+                entry.stale = True
+                entry.listening = False
@@ -2,43 +2,16 @@ import logging
 
 logger = logging.getLogger("live")
 
-def name_cache(fn):
+def getter_address(cls, prop: str) -> str:
     """
-    Decorator enabling pairs of set_XX/get_XX methods to cache their
-    values, to avoid repeatedly querying the Live set for values which we know
-    haven't changed.
+    Returns the OSC query address of a property created with make_getter(),
+    used by the awaitable getters to share the synchronous getters' addresses.
 
-    If the 'caching' attribute is set of the object containing these 
-    methods, the values specifed in 'set' (or initially queried with
-    'get') will be stored again for the future.
-
-    This is used so that we can query (say) our Live tempo value once,
-    and assume that it will remain the same unless we apply a manual
-    set_tempo.
-
-    This will fall out of sync if the value of tempo is externally
-    changed!
+    Raises:
+        AttributeError: If the class has no such property.
     """
-
-    name = fn.__name__
-    action = name[:3]
-    variable = name[4:]
-
-    def cached_fn(obj, *args, **kwargs):
-        if hasattr(obj, "caching") and not obj.caching:
-            return fn(obj, *args)
-
-        if not hasattr(obj, "__cache"):
-            obj.__cache = {}
-
-        if action == "set":
-            if "cache_only" not in kwargs:
-                fn(obj, *args)
-            obj.__cache[variable] = args[0]
-        elif action == "get":
-            if not variable in obj.__cache:
-                obj.__cache[variable] = fn(obj, *args)
-            return obj.__cache[variable]
-
-    return cached_fn
-
+    attribute = getattr(cls, prop, None)
+    address = getattr(getattr(attribute, "fget", None), "address", None)
+    if address is None:
+        raise AttributeError("%s has no queryable property '%s'" % (cls.__name__, prop))
+    return address
@@ -0,0 +1,290 @@
+"""
+Low-level OSC encoding helpers, used by Query to build datagrams.
+"""
+
+import struct
+
+#------------------------------------------------------------------------
+# OSC timetags are NTP timestamps: seconds since 1900-01-01, as a 32.32
+# fixed-point number. The special value 1 means "immediately".
+#------------------------------------------------------------------------
+NTP_EPOCH_OFFSET = 2208988800
+TIMETAG_IMMEDIATELY = struct.pack(">Q", 1)
+
+BUNDLE_HEADER = b"#bundle\0"
+
+#------------------------------------------------------------------------
+# The largest UDP payload that fits within a standard 1500-byte Ethernet
+# MTU, so that datagrams are not fragmented when Live is on another host.
+#------------------------------------------------------------------------
+SAFE_DATAGRAM_SIZE = 1472
+
+FLOAT = struct.Struct(">f")
+EMPTY_TYPE_TAGS = b",\0\0\0"
+
+#------------------------------------------------------------------------
+# Maximum number of MessageTemplates to cache before the cache is reset.
+#------------------------------------------------------------------------
+MAX_TEMPLATES = 4096
+
+_np = None
+
+class MessageTemplate:
+    """
+    A pre-encoded OSC message with a fixed address and integer arguments,
+    followed by a single float argument, e.g.:
+
+        /live/device/set/parameter/value <track> <device> <parameter> <value>
+
+    Setters send the same message many times over with only the value changing,
+    so the address, type tags and integer arguments are encoded just once.
+    """
+
+    __slots__ = ("prefix",)
+
+    def __init__(self, address: str, int_args: tuple = ()):
+        dgram = _build_message(address, tuple(int_args) + (0.0,))
+        self.prefix = dgram[:-FLOAT.size]
+
+    def encode(self, value: float) -> bytes:
+        return self.prefix + FLOAT.pack(value)
+
+_templates: dict[tuple, MessageTemplate] = {}
+
+def encode_message(address: str, args: tuple = ()) -> bytes:
+    """
+    Encode an OSC message.
+
+    Messages without arguments are encoded directly, and messages comprising
+    integer indices followed by a float value (the form of most setters) are
+    encoded via a cached MessageTemplate.
+
+    Args:
+        address: The OSC address, e.g. "/live/song/set/tempo"
+        args: A tuple of arguments, whose OSC types are inferred from their Python types.
+
+    Returns:
+        The encoded datagram.
+    """
+    if not args:
+        return _encode_string(address) + EMPTY_TYPE_TAGS
+    if type(args[-1]) is float:
+        key = (address, tuple(args[:-1]))
+        template = _templates.get(key)
+        if template is None and all(type(arg) is int for arg in key[1]):
+            if len(_templates) >= MAX_TEMPLATES:
+                _templates.clear()
+            template = _templates[key] = MessageTemplate(*key)
+        if template is not None:
+            return template.encode(args[-1])
+    return _build_message(address, args)
+
+def encode_float_array(address: str, int_args: tuple, values) -> bytes:
+    """
+    Encode an OSC message comprising integer indices followed by an array of
+    float values, e.g. /live/device/set/parameters/value <track> <device> <values...>
+
+    OSC float arguments are big-endian 32-bit floats, so a numpy array is
+    encoded in one step as a contiguous >f4 payload.
+
+    Args:
+        address: The OSC address
+        int_args: Leading integer arguments
+        values: A numpy array or sequence of floats
+    """
+    np = _numpy()
+    if np is not None:
+        payload = np.ascontiguousarray(values, dtype=">f4").tobytes()
+    else:
+        payload = struct.pack(">%df" % len(values), *values)
+    count = len(payload) // 4
+    return b"".join((_encode_string(address),
+                     _encode_string("," + "i" * len(int_args) + "f" * count),
+                     struct.pack(">%di" % len(int_args), *int_args),
+                     payload))
+
+#------------------------------------------------------------------------
+# Each MIDI note is encoded as (pitch, start, duration, velocity, mute), with
+# mute as an OSC True/False type tag, which carries no data.
+#------------------------------------------------------------------------
+NOTE_TYPE_TAGS = (b"iffiF", b"iffiT")
+NOTE_PAYLOAD_SIZE = 16
+
+def encode_notes(address: str, int_args: tuple, notes) -> bytes:
+    """
+    Encode an OSC message comprising integer indices followed by a list of MIDI
+    notes, e.g. /live/clip/add/notes <track> <clip> <pitch> <start> <duration> <velocity> <mute> ...
+
+    Requires numpy.
+
+    Args:
+        address: The OSC address
+        int_args: Leading integer arguments
+        notes: A numpy structured array with fields pitch, start, duration, velocity and mute
+    """
+    np = _numpy()
+    payload = np.empty(len(notes), dtype=[("pitch", ">i4"), ("start", ">f4"), ("duration", ">f4"), ("velocity", ">i4")])
+    for field in payload.dtype.names:
+        payload[field] = notes[field]
+    type_tags = b"," + b"i" * len(int_args) + np.array(NOTE_TYPE_TAGS)[notes["mute"].astype(int)].tobytes()
+    return b"".join((_encode_string(address),
+                     type_tags + b"\0" * (4 - len(type_tags) % 4),
+                     struct.pack(">%di" % len(int_args), *int_args),
+                     payload.tobytes()))
+
+def max_notes_per_message(address: str, num_int_args: int, max_size: int = SAFE_DATAGRAM_SIZE) -> int:
+    """
+    Returns the number of notes that can be encoded by encode_notes() in a
+    message no larger than max_size.
+    """
+    header_size = len(_encode_string(address)) + 4 * num_int_args
+    count = (max_size - header_size) // (NOTE_PAYLOAD_SIZE + len(NOTE_TYPE_TAGS[0]))
+    while count > 0:
+        type_tags_size = (1 + num_int_args + len(NOTE_TYPE_TAGS[0]) * count) // 4 * 4 + 4
+        if header_size + type_tags_size + NOTE_PAYLOAD_SIZE * count <= max_size:
+            break
+        count -= 1
+    return count
+
+def _encode_string(value: str) -> bytes:
+    # OSC strings are null-terminated and padded to a multiple of 4 bytes.
+    encoded = value.encode("utf-8")
+    return encoded + b"\0" * (4 - len(encoded) % 4)
+
+def _numpy():
+    #------------------------------------------------------------------------
+    # numpy is optional, and slow to import, so is imported on first use.
+    #------------------------------------------------------------------------
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+def _build_message(address: str, args: tuple) -> bytes:
+    from pythonosc.osc_message_builder import OscMessageBuilder
+
+    builder = OscMessageBuilder(address=address)
+    for arg in args:
+        builder.add_arg(arg)
+    return builder.build().dgram
+
+def encode_timetag(timetag: float = None) -> bytes:
+    """
+    Encode a timetag.
+
+    Args:
+        timetag: A time in seconds since the epoch (as per time.time()), or
+                 None to indicate that the contents should be applied immediately.
+    """
+    if timetag is None:
+        return TIMETAG_IMMEDIATELY
+    seconds = timetag + NTP_EPOCH_OFFSET
+    return struct.pack(">II", int(seconds), int((seconds % 1) * (1 << 32)))
+
+def encode_bundle(elements: list, timetag: float = None) -> bytes:
+    """
+    Encode an OSC bundle.
+
+    Args:
+        elements: A list of encoded messages and/or bundles.
+        timetag: The bundle's timetag, in seconds since the epoch, or None for immediately.
+
+    Returns:
+        The encoded datagram.
+    """
+    chunks = [BUNDLE_HEADER, encode_timetag(timetag)]
+    for element in elements:
+        chunks.append(struct.pack(">i", len(element)))
+        chunks.append(element)
+    return b"".join(chunks)
+
+def encode_bundles(elements: list, timetag: float = None, max_size: int = SAFE_DATAGRAM_SIZE) -> list:
+    """
+    Pack a list of encoded messages into as few bundles as possible, each no
+    larger than max_size. A message that is larger than max_size on its own
+    is returned in a bundle of its own.
+
+    Returns:
+        A list of encoded bundles.
+    """
+    bundles = []
+    batch = []
+    batch_size = len(BUNDLE_HEADER) + 8
+    for element in elements:
+        element_size = 4 + len(element)
+        if batch and batch_size + element_size > max_size:
+            bundles.append(encode_bundle(batch, timetag))
+            batch = []
+            batch_size = len(BUNDLE_HEADER) + 8
+        batch.append(element)
+        batch_size += element_size
+    if batch:
+        bundles.append(encode_bundle(batch, timetag))
+    return bundles
+
+#------------------------------------------------------------------------
+# Struct format codes for fixed-size OSC argument types.
+#------------------------------------------------------------------------
+TYPETAG_FORMATS = {
+    "i": "i",
+    "f": "f",
+    "d": "d",
+    "h": "q",
+}
+
+class FastDecoder:
+    """
+    Decoder for high-rate inbound messages whose address and type tags are
+    known in advance (e.g. /live/song/get/beat ,i), which unpacks arguments
+    with a single precompiled struct rather than via the generic OSC parser.
+
+    decode() returns None for any packet that does not exactly match a
+    registered address and type tag string, in which case the caller should
+    fall back to the generic parser.
+    """
+
+    def __init__(self):
+        self.formats: dict[bytes, tuple] = {}
+
+    def register(self, address: str, typetags: str) -> None:
+        """
+        Register a message format for fast decoding.
+
+        Args:
+            address: The OSC address, e.g. "/live/song/get/beat"
+            typetags: The OSC type tags of its arguments, e.g. "i" or ",iiif".
+                      Only fixed-size numeric types (i, f, d, h) are supported.
+        """
+        typetags = typetags.lstrip(",")
+        for tag in typetags:
+            if tag not in TYPETAG_FORMATS:
+                raise ValueError("Type tag not supported for fast decoding: %s" % tag)
+        encoded_address = _encode_string(address)
+        encoded_typetags = _encode_string("," + typetags)
+        args_struct = struct.Struct(">" + "".join(TYPETAG_FORMATS[tag] for tag in typetags))
+        self.formats[address.encode("utf-8")] = (address,
+                                                 len(encoded_address),
+                                                 encoded_typetags,
+                                                 len(encoded_address) + len(encoded_typetags),
+                                                 args_struct)
+
+    def unregister(self, address: str) -> None:
+        self.formats.pop(address.encode("utf-8"), None)
+
+    def decode(self, data: bytes):
+        """
+        Returns:
+            A tuple of (address, args), or None if the packet is not of a registered format.
+        """
+        entry = self.formats.get(data[:data.find(b"\0")])
+        if entry is None:
+            return None
+        address, typetags_offset, typetags, args_offset, args_struct = entry
+        view = memoryview(data)
+        if view[typetags_offset:args_offset] != typetags or len(data) != args_offset + args_struct.size:
+            return None
+        return address, args_struct.unpack_from(view, args_offset)
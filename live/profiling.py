@@ -0,0 +1,293 @@
+"""
+Tracing and profiling of pylive operations.
+
+pylive records a span for each query, command, scan phase and callback
+while a profiler (or any other hook) is active:
+
+    with live.profile() as profiler:
+        set.scan()
+        set.tempo = 120
+    print(profiler.report())
+
+Spans nest per thread, so the time of a scan can be broken down into its
+phases and their queries. Recording has negligible cost when no hooks are
+registered.
+
+Other tracing systems can be connected by registering a SpanHook, e.g. to
+forward spans to OpenTelemetry:
+
+    class OpenTelemetryHook(live.profiling.SpanHook):
+        def on_start(self, span):
+            span.attributes["otel"] = tracer.start_span(span.frame)
+        def on_end(self, span):
+            span.attributes.pop("otel").end()
+
+    live.profiling.add_hook(OpenTelemetryHook())
+"""
+
+import time
+import threading
+import collections
+
+#------------------------------------------------------------------------
+# Registered hooks. The list is replaced rather than modified, so that it
+# can be iterated safely without a lock.
+#------------------------------------------------------------------------
+_hooks = []
+_hooks_lock = threading.Lock()
+_state = threading.local()
+
+class SpanHook:
+    """
+    Interface for receiving spans as they start and end.
+    Hooks are called on the thread on which the span occurs.
+    """
+
+    def on_start(self, span: "Span") -> None:
+        pass
+
+    def on_end(self, span: "Span") -> None:
+        pass
+
+def add_hook(hook: SpanHook) -> None:
+    """ Register a hook to receive all spans. """
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + [hook]
+
+def remove_hook(hook: SpanHook) -> None:
+    """ Unregister a hook previously registered with add_hook(). """
+    global _hooks
+    with _hooks_lock:
+        _hooks = [existing for existing in _hooks if existing is not hook]
+
+class Span:
+    """
+    A timed operation, e.g. a query ("query", "/live/song/get/tempo") or a
+    scan phase ("scan.clips"). Used as a context manager.
+    """
+
+    __slots__ = ("name", "detail", "attributes", "parent", "thread", "start", "end")
+
+    def __init__(self, name: str, detail: str = None, attributes: dict = None):
+        self.name = name
+        self.detail = detail
+        self.attributes = attributes if attributes is not None else {}
+        self.parent = None
+        self.thread = None
+        self.start = None
+        self.end = None
+
+    def __str__(self):
+        return "Span (%s, %.3fms)" % (self.frame, self.duration * 1000)
+
+    @property
+    def frame(self) -> str:
+        """ The span's name and detail, e.g. "query /live/song/get/tempo". """
+        return self.name if self.detail is None else "%s %s" % (self.name, self.detail)
+
+    @property
+    def duration(self) -> float:
+        """ The span's duration in seconds, or 0.0 if it has not ended. """
+        if self.end is None:
+            return 0.0
+        return self.end - self.start
+
+    def path(self) -> tuple:
+        """ Returns the frames of this span and its ancestors, outermost first. """
+        frames = []
+        span = self
+        while span is not None:
+            frames.append(span.frame)
+            span = span.parent
+        return tuple(reversed(frames))
+
+    def __enter__(self):
+        self.parent = getattr(_state, "span", None)
+        self.thread = threading.current_thread().name
+        _state.span = self
+        for hook in _hooks:
+            hook.on_start(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end = time.perf_counter()
+        _state.span = self.parent
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        for hook in _hooks:
+            hook.on_end(self)
+
+class _NullSpan:
+    """ Stands in for a Span when no hooks are registered. """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+NULL_SPAN = _NullSpan()
+
+def span(name: str, detail: str = None, **attributes):
+    """
+    Returns a context manager that records a span, if any hooks are registered:
+
+        with span("scan.clips", tracks=16):
+            ...
+
+    Args:
+        name: The kind of operation, e.g. "query", "cmd", "callback" or "scan.tracks"
+        detail: The operation's target, e.g. an OSC address.
+        attributes: Further attributes to attach to the span.
+    """
+    if not _hooks:
+        return NULL_SPAN
+    return Span(name, detail, attributes)
+
+class Profiler(SpanHook):
+    """
+    Collects spans while active, and reports where time was spent:
+    as a tree of aggregated call paths, as folded stacks (for flamegraph.pl
+    or speedscope), and as the slowest individual operations.
+    """
+
+    def __init__(self, max_spans: int = 100000):
+        """
+        Args:
+            max_spans: Maximum number of individual spans to retain for top().
+                       Aggregated timings include all spans regardless.
+        """
+        self.lock = threading.Lock()
+        self.spans = collections.deque(maxlen=max_spans)
+
+        #------------------------------------------------------------------------
+        # Aggregates per call path: path -> [count, total time]
+        #------------------------------------------------------------------------
+        self.paths: dict[tuple, list] = {}
+
+        #------------------------------------------------------------------------
+        # Aggregates per frame: frame -> [count, total time, maximum time]
+        #------------------------------------------------------------------------
+        self.frames: dict[str, list] = {}
+        self.started_at = None
+        self.duration = 0.0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        add_hook(self)
+
+    def stop(self) -> None:
+        remove_hook(self)
+        if self.started_at is not None:
+            self.duration += time.perf_counter() - self.started_at
+            self.started_at = None
+
+    def on_end(self, span: Span) -> None:
+        path = span.path()
+        duration = span.duration
+        with self.lock:
+            self.spans.append(span)
+            entry = self.paths.get(path)
+            if entry is None:
+                self.paths[path] = [1, duration]
+            else:
+                entry[0] += 1
+                entry[1] += duration
+            entry = self.frames.get(span.frame)
+            if entry is None:
+                self.frames[span.frame] = [1, duration, duration]
+            else:
+                entry[0] += 1
+                entry[1] += duration
+                if duration > entry[2]:
+                    entry[2] = duration
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: For each frame (e.g. "query /live/song/get/tempo"), the number of
+                  spans, and their total, mean and maximum duration in seconds.
+        """
+        with self.lock:
+            frames = {frame: list(entry) for frame, entry in self.frames.items()}
+        return {frame: {"count": count, "total": total, "mean": total / count, "max": maximum}
+                for frame, (count, total, maximum) in frames.items()}
+
+    def top(self, n: int = 10) -> list[Span]:
+        """ Returns the n slowest spans, slowest first. """
+        with self.lock:
+            spans = list(self.spans)
+        return sorted(spans, key=lambda span: span.duration, reverse=True)[:n]
+
+    def folded(self) -> list[str]:
+        """
+        Returns the aggregated call paths in the folded stack format used by
+        flamegraph.pl and speedscope: "frame;frame;frame <self time in us>"
+        """
+        with self.lock:
+            paths = dict(self.paths)
+        self_times = {path: total for path, (count, total) in paths.items()}
+        for path, (count, total) in paths.items():
+            if len(path) > 1 and path[:-1] in self_times:
+                self_times[path[:-1]] -= total
+        return ["%s %d" % (";".join(path), max(0, round(self_time * 1e6)))
+                for path, self_time in sorted(self_times.items())]
+
+    def write_folded(self, path: str) -> None:
+        """ Write folded stacks to a file, for rendering with flamegraph.pl or speedscope. """
+        with open(path, "w") as fd:
+            fd.write("\n".join(self.folded()) + "\n")
+
+    def report(self, top: int = 10, min_fraction: float = 0.001) -> str:
+        """
+        Returns a human-readable report: a tree of call paths with their total
+        time, count and share of the profiled duration, followed by the slowest
+        individual operations.
+
+        Args:
+            top: Number of slowest operations to list.
+            min_fraction: Omit call paths that account for less than this fraction of the total time.
+        """
+        with self.lock:
+            paths = dict(self.paths)
+        duration = self.duration
+        if self.started_at is not None:
+            duration += time.perf_counter() - self.started_at
+        duration = max(duration, 1e-9)
+
+        lines = ["%10s %8s %7s  %s" % ("total (ms)", "count", "%", "operation")]
+        for path in sorted(paths):
+            count, total = paths[path]
+            if total / duration < min_fraction:
+                continue
+            lines.append("%10.2f %8d %6.1f%%  %s%s" % (total * 1000, count, 100 * total / duration,
+                                                       "  " * (len(path) - 1), path[-1]))
+        lines.append("")
+        lines.append("Slowest operations:")
+        for span in self.top(top):
+            lines.append("%10.2f ms  %s" % (span.duration * 1000, " > ".join(span.path())))
+        return "\n".join(lines)
+
+def profile(max_spans: int = 100000) -> Profiler:
+    """
+    Profile pylive operations within a block:
+
+        with live.profile() as profiler:
+            set.scan()
+        print(profiler.report())
+
+    Returns:
+        A Profiler, which records spans while the block is active.
+    """
+    return Profiler(max_spans)
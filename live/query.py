@@ -1,91 +1,454 @@
 import os
-import inspect
+import time
+import socket
 import logging
-import argparse
 import threading
-import tempfile
 
-from live.exceptions import LiveConnectionError
-
-from pythonosc.dispatcher import Dispatcher
-from pythonosc.osc_server import ThreadingOSCUDPServer
-from pythonosc.udp_client import SimpleUDPClient
-
-def singleton(cls):
-    instances = {}
-
-    def getinstance(*args):
-        if cls not in instances:
-            instances[cls] = cls(*args)
-        return instances[cls]
-
-    return getinstance
+from live.exceptions import LiveConnectionError, LiveTimeoutError
+from live.router import RequestRouter, QueryFuture
+from live.rtt import RTTEstimator, CircuitBreaker, SLOW_ADDRESSES
+from live.trace import WireTracer, TRACE_IN, TRACE_OUT
+from live.osc import encode_message, encode_bundle, encode_bundles, FastDecoder
+from live.coalesce import WriteCoalescer
+from live.dispatch import DispatchTable, Route
+from live.executor import CallbackExecutor
+from live.mirror import PropertyMirror
+from live.metrics import QueryMetrics, PrometheusExporter
+from live.profiling import span
 
 #------------------------------------------------------------------------
 # Helper methods to save instantiating an object when making calls.
+# These use the default Query object, as returned by Query.default().
 #------------------------------------------------------------------------
 
 def query(*args, **kwargs):
-    return Query().query(*args, **kwargs)
+    return Query.default().query(*args, **kwargs)
 
 def cmd(*args, **kwargs):
-    Query().cmd(*args, **kwargs)
+    Query.default().cmd(*args, **kwargs)
+
+def query_many(*args, **kwargs):
+    return Query.default().query_many(*args, **kwargs)
+
+def bundle(*args, **kwargs):
+    return Query.default().bundle(*args, **kwargs)
+
+def connect(address=("127.0.0.1", 11000), listen_port: int = 11001) -> "Query":
+    """
+    Connect to a Live instance. The returned Query can be used as a context
+    manager, which stops it (closing its sockets and joining its threads) on exit:
+
+        with live.connect(("192.168.0.10", 11000), listen_port=0) as query:
+            query.cmd("/live/song/start_playing")
+            set = live.Set(client=query)
+
+    Args:
+        address: The (host, port) on which AbletonOSC is listening.
+        listen_port: The local port on which to receive replies, or 0 for any free port.
+    """
+    return Query(address, listen_port)
 
-@singleton
 class Query:
     """
     Object responsible for passing OSC queries to the LiveOSC server,
     parsing and proxying responses.
 
-    This object is a singleton, under the assumption that only one Live instance
-    can be running, so only one global Live Query object should be needed.
-
-    Following this assumption, static helper functions also exist:
+    Each Query object communicates with one Live instance. Most scripts only
+    need the default Query object, which is shared by Set objects and the
+    static helper functions:
 
         live.query(path, *args)
         live.cmd(path, *args)
+        live.query_many([(path, args), ...])
+        with live.bundle(): ...
+
+    To control several Live instances, create a Query object for each, with
+    its own listen port, and pass it to Set(client=...). See also QueryGroup,
+    which sends commands and queries to many instances at once.
     """
 
+    _default = None
+    _default_lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "Query":
+        """
+        Returns the default Query object, creating it on first use.
+        """
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    @classmethod
+    def set_default(cls, query: "Query") -> None:
+        """
+        Set the Query object used by default by Set objects and the static helper functions.
+        """
+        with cls._default_lock:
+            cls._default = query
+
     def __init__(self, address=("127.0.0.1", 11000), listen_port=11001):
-        self.beat_callback = None
-        self.startup_callback = None
-        self.listen_port = listen_port
+        """
+        Args:
+            address: The (host, port) on which AbletonOSC is listening.
+            listen_port: The local port on which to receive replies. Set to 0 to
+                         use any free port. Queries are sent from this port, so
+                         that AbletonOSC can reply to the sender.
+        """
         self.logger = logging.getLogger(__name__)
 
         #------------------------------------------------------------------------
         # Handler callbacks for particular messages from Live.
         # Used so that other processes can register callbacks when states change.
         #------------------------------------------------------------------------
-        self.handlers = {}
+        self.dispatch_table = DispatchTable()
+
+        #------------------------------------------------------------------------
+        # Beat callbacks are used if we want to trigger an event on each beat,
+        # to synchronise with the timing of the Live set. Startup callbacks
+        # are triggered when Live opens a set.
+        #------------------------------------------------------------------------
+        self._beat_route = None
+        self._startup_route = None
+
+        #------------------------------------------------------------------------
+        # Callbacks run on a thread pool by default, so that a slow callback
+        # cannot hold up the receipt of query replies.
+        #------------------------------------------------------------------------
+        self.callback_executor = CallbackExecutor("thread")
+
+        #------------------------------------------------------------------------
+        # Property values mirrored via Live's listeners, used by the getters of
+        # Sets with caching enabled.
+        #------------------------------------------------------------------------
+        self.mirror = PropertyMirror(self)
 
         self.osc_address = address
-        self.osc_client = SimpleUDPClient(*address)
 
-        self.dispatcher = Dispatcher()
-        self.dispatcher.set_default_handler(self.osc_handler)
-        self.osc_server = ThreadingOSCUDPServer((address[0], listen_port),
-                                                self.dispatcher)
+        #------------------------------------------------------------------------
+        # Bundles that are currently collecting commands, per thread.
+        #------------------------------------------------------------------------
+        self.bundle_state = threading.local()
+
+        #------------------------------------------------------------------------
+        # High-rate messages with known type tags are decoded via a fast path;
+        # all other packets fall back to the generic OSC parser.
+        #------------------------------------------------------------------------
+        self.decoder = FastDecoder()
+        self.decoder.register("/live/song/get/beat", "i")
+        self.decoder.register("/live/song/get/tempo", "f")
+        self.decoder.register("/live/song/get/current_song_time", "f")
+        self.decoder.register("/live/track/get/volume", "if")
+        self.decoder.register("/live/device/get/parameter/value", "iiif")
 
-        self.osc_server_thread = None
-        self.osc_read_event = None
+        #------------------------------------------------------------------------
+        # Only listen on the loopback interface when Live is on the same host.
+        # The listening socket is bound, and its thread started, only once a
+        # reply is first needed (see listen()), so that clients that only send
+        # commands neither occupy the listen port nor start any threads.
+        #------------------------------------------------------------------------
+        self.listen_host = "127.0.0.1" if address[0] in ("127.0.0.1", "localhost") else "0.0.0.0"
+        self.listen_address = (self.listen_host, listen_port)
+        self.listen_lock = threading.Lock()
+        self.listen_socket = None
+        self.listen_thread = None
+        self.send_socket = None
+        self.stopped = False
+
+        #------------------------------------------------------------------------
+        # osc_timeout is the overall deadline for a query. Within it, each
+        # attempt times out according to the measured round-trip time, and
+        # idempotent /get/ queries are resent up to max_retries times.
+        #------------------------------------------------------------------------
         self.osc_timeout = 3.0
-        self.osc_server_events = {}
+        self.max_retries = 3
+        self.rtt = RTTEstimator()
+
+        #------------------------------------------------------------------------
+        # Fails queries immediately once several in a row have timed out,
+        # rather than stalling every caller for the full timeout.
+        #------------------------------------------------------------------------
+        self.breaker = CircuitBreaker()
+
+        #------------------------------------------------------------------------
+        # Queries that are awaiting a reply from Live. Any number of queries
+        # can be in flight at once, from any thread.
+        #------------------------------------------------------------------------
+        self.router = RequestRouter()
+
+        #------------------------------------------------------------------------
+        # Optional wire tracer, recording all OSC traffic to disk.
+        # Off by default; see start_trace().
+        #------------------------------------------------------------------------
+        self.tracer = None
+
+        #------------------------------------------------------------------------
+        # Optional latest-value-wins layer for /set/ commands.
+        # Off by default; see enable_coalescing().
+        #------------------------------------------------------------------------
+        self.coalescer = None
+
+        #------------------------------------------------------------------------
+        # Per-address counters and query latency histograms, which are cheap
+        # enough to be always on. See metrics().
+        #------------------------------------------------------------------------
+        self.query_metrics = QueryMetrics()
+        self.metrics_exporter = None
+
+        if os.environ.get("PYLIVE_TRACE"):
+            self.start_trace(os.environ["PYLIVE_TRACE"])
+
+    def __str__(self):
+        listen_socket = self.listen_socket
+        if listen_socket is None:
+            return "Query (%s:%d, not listening)" % (self.osc_address[0], self.osc_address[1])
+        return "Query (%s:%d, listening on %d)" % (self.osc_address[0], self.osc_address[1],
+                                                   listen_socket.getsockname()[1])
+
+    def __enter__(self):
+        return self
 
-        self.query_address = None
-        self.query_rv = []
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
 
+    def listen(self) -> None:
+        """
+        Bind the listen port and start receiving messages from Live, if not
+        already listening. Called automatically when a reply is first needed:
+        by a query, a handler, or a /start_listen/ command.
+
+        Raises:
+            LiveConnectionError: If the Query has been stopped, or the port is in use.
+        """
+        if self.listen_socket is not None:
+            return
+
+        with self.listen_lock:
+            if self.listen_socket is not None:
+                return
+            if self.stopped:
+                raise LiveConnectionError("Query has been stopped")
+
+            #------------------------------------------------------------------------
+            # SO_REUSEADDR is deliberately not set: UDP ports have no TIME_WAIT
+            # state, so can be rebound as soon as they are closed, and on Linux
+            # the option would let a second process silently share the port and
+            # intercept this one's replies.
+            #------------------------------------------------------------------------
+            listen_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                listen_socket.bind(self.listen_address)
+            except OSError as e:
+                listen_socket.close()
+                raise LiveConnectionError("Couldn't listen on port %d: %s" % (self.listen_address[1], e))
+            self.listen_thread = threading.Thread(target=self._receive,
+                                                  args=(listen_socket,),
+                                                  name="pylive-listener",
+                                                  daemon=True)
+            self.listen_socket = listen_socket
+            self.listen_thread.start()
+
+    def _receive(self, listen_socket: socket.socket) -> None:
+        #------------------------------------------------------------------------
+        # Packets are handled in order on this one thread. Callbacks are passed
+        # to the callback executor, so that they cannot delay query replies.
+        #------------------------------------------------------------------------
+        while True:
+            try:
+                data = listen_socket.recv(65536)
+            except ConnectionResetError:
+                #------------------------------------------------------------------------
+                # On Windows, an ICMP port unreachable response to a previous send
+                # (e.g. if Live is not running) is reported on the next receive.
+                #------------------------------------------------------------------------
+                continue
+            except OSError:
+                return
+            if not data:
+                #------------------------------------------------------------------------
+                # stop() wakes this thread with an empty datagram.
+                #------------------------------------------------------------------------
+                if self.listen_socket is not listen_socket:
+                    return
+                continue
+            try:
+                self.packet_handler(data)
+            except Exception as e:
+                self.logger.exception("Exception handling OSC packet: %s" % e)
+
+    @property
+    def is_listening(self) -> bool:
+        """ Whether the listen port is bound. """
+        return self.listen_socket is not None
+
+    @property
+    def listen_port(self) -> int:
+        """ The local port on which replies are received. Starts listening if not already. """
         self.listen()
+        return self.listen_socket.getsockname()[1]
+
+    @property
+    def osc_socket(self) -> socket.socket:
+        """
+        The socket from which messages are sent. Once listening, this is the
+        listening socket, so that Live's replies are routed back to this Query
+        object when several are in use. Until then, commands are sent from an
+        unbound socket.
+        """
+        listen_socket = self.listen_socket
+        if listen_socket is not None:
+            return listen_socket
+        if self.send_socket is None:
+            with self.listen_lock:
+                if self.stopped:
+                    raise LiveConnectionError("Query has been stopped")
+                if self.send_socket is None:
+                    self.send_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        return self.send_socket
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """
+        Terminate this query object, in order: stop any property listeners, send
+        any coalesced writes, wait for replies to queries in flight (failing any
+        that are still pending after the timeout), stop the tracer and metrics
+        exporter, close the sockets, and join the receive and callback threads.
+
+        A stopped Query cannot be used again; create a new one to reconnect.
+        Calling stop() more than once has no further effect.
+
+        Args:
+            timeout: Maximum time to wait for replies to queries in flight, in seconds.
+        """
+        if self.stopped:
+            return
+        self.mirror.clear()
+        self.disable_coalescing()
+        self.router.drain(timeout)
+        self.router.cancel_all(LiveConnectionError("Query has been stopped"))
+
+        with self.listen_lock:
+            self.stopped = True
+            listen_socket, listen_thread = self.listen_socket, self.listen_thread
+            send_socket = self.send_socket
+            self.listen_socket = self.listen_thread = self.send_socket = None
+
+        self.stop_trace()
+        self.stop_metrics_export()
+
+        if listen_socket is not None:
+            host, port = listen_socket.getsockname()
+            try:
+                listen_socket.sendto(b"", ("127.0.0.1" if host == "0.0.0.0" else host, port))
+            except OSError:
+                pass
+            if listen_thread is not threading.current_thread():
+                listen_thread.join()
+            listen_socket.close()
+        if send_socket is not None:
+            send_socket.close()
+        self.callback_executor.shutdown(wait=True)
+
+        if Query._default is self:
+            Query.set_default(None)
+
+    def start_trace(self, path: str = None, **kwargs) -> WireTracer:
+        """
+        Begin recording all OSC traffic to a binary trace file, which can be
+        read with `python3 -m live.trace <path>`.
+
+        Args:
+            path: Path of the trace file. Defaults to liveosc.trace in the temp dir.
+            kwargs: Further arguments to WireTracer (max_bytes, backup_count, ...)
+        """
+        self.stop_trace()
+        if path is None:
+            import tempfile
+            path = os.path.join(tempfile.gettempdir(), "liveosc.trace")
+        tracer = WireTracer(path, **kwargs)
+        tracer.start()
+        self.tracer = tracer
+        return tracer
+
+    def stop_trace(self) -> None:
+        """ Stop recording OSC traffic, flushing any buffered records to disk. """
+        tracer = self.tracer
+        if tracer is not None:
+            self.tracer = None
+            tracer.stop()
+
+    def metrics(self, reset: bool = False) -> dict:
+        """
+        Returns a snapshot of the OSC traffic of this Query object: for each
+        address, the number of messages and bytes sent and received, and the
+        number of queries, retries and timeouts, with latency percentiles:
+
+            query.metrics()["addresses"]["/live/track/get/volume"]["latency_ms"]["p99"]
 
-    def listen(self):
-        target = self.osc_server.serve_forever
+        Args:
+            reset: If True, reset all metrics after taking the snapshot.
+        """
+        snapshot = self.query_metrics.snapshot()
+        if reset:
+            self.query_metrics.reset()
+        return snapshot
 
-        self.osc_server_thread = threading.Thread(target=target)
-        self.osc_server_thread.setDaemon(True)
-        self.osc_server_thread.start()
+    def start_metrics_export(self, path: str = None, interval: float = 10.0) -> PrometheusExporter:
+        """
+        Periodically write metrics in the Prometheus text format, labelled with
+        the address of this Query object's Live instance.
 
-    def stop(self):
-        """ Terminate this query object and unbind from OSC listening. """
-        pass
+        Args:
+            path: Path of the file to write (e.g., for node_exporter's textfile
+                  collector), or None to write to stdout.
+            interval: Interval between writes, in seconds.
+        """
+        self.stop_metrics_export()
+        exporter = PrometheusExporter(self.query_metrics, path, interval,
+                                      labels={"instance": "%s:%d" % self.osc_address})
+        exporter.start()
+        self.metrics_exporter = exporter
+        return exporter
+
+    def stop_metrics_export(self) -> None:
+        """ Stop exporting metrics, writing them one final time. """
+        exporter = self.metrics_exporter
+        if exporter is not None:
+            self.metrics_exporter = None
+            exporter.stop()
+
+    def enable_coalescing(self, rate: float = 100.0, epsilon: float = None) -> WriteCoalescer:
+        """
+        Route all setter commands (those whose address contains /set/) through a
+        WriteCoalescer, which sends only the latest value for each target at a
+        fixed control rate. Useful when setting values faster than Live can apply them.
+
+        Queries and other commands flush any pending writes before they are sent,
+        so reading a value back returns the latest value written, and commands
+        are applied in the order they were issued.
+
+        Args:
+            rate: Number of flushes per second.
+            epsilon: If set, values within epsilon of the last-sent value are not
+                     re-sent (see WriteCoalescer). Defaults to None, which always
+                     sends the latest value.
+
+        Returns:
+            The WriteCoalescer, whose stats() reports the number of writes dropped.
+        """
+        self.disable_coalescing()
+        coalescer = WriteCoalescer(self, rate=rate, epsilon=epsilon)
+        coalescer.start()
+        self.coalescer = coalescer
+        return coalescer
+
+    def disable_coalescing(self) -> None:
+        """ Stop coalescing setter commands, sending any pending writes. """
+        coalescer = self.coalescer
+        if coalescer is not None:
+            self.coalescer = None
+            coalescer.stop()
 
     def cmd(self, msg: str, args: tuple = ()):
         """ Send a Live command without expecting a response back:
@@ -93,100 +456,396 @@ class Query:
             live.cmd("/live/tempo", 110.0) """
 
         self.logger.debug("OSC output: %s %s", msg, args)
-        with open(os.path.join(tempfile.gettempdir(), "liveosc.log"), "a") as fd:
-            import datetime
-            fd.write("%s %s %s\n" % (datetime.datetime.now(), msg, args))
+        if not isinstance(args, (list, tuple)):
+            args = (args,)
+        if "/start_listen/" in msg:
+            self.listen()
+
+        with span("cmd", msg):
+            #------------------------------------------------------------------------
+            # Within a `with query.bundle()` block, commands are collected and
+            # sent together when the block exits.
+            #------------------------------------------------------------------------
+            bundle = getattr(self.bundle_state, "bundle", None)
+            coalescer = self.coalescer
+            if coalescer is not None:
+                if bundle is None and args and "/set/" in msg:
+                    #------------------------------------------------------------------------
+                    # Coalesced writes are counted as they are submitted, but their bytes
+                    # are not, as they may never be sent (see WriteCoalescer.stats()).
+                    #------------------------------------------------------------------------
+                    coalescer.submit(msg, args)
+                    self.query_metrics.record_send(msg, 0)
+                    return
+                #------------------------------------------------------------------------
+                # Send pending writes first, so that they cannot be overtaken by this
+                # command (e.g. a tempo change followed by /live/song/start_playing).
+                #------------------------------------------------------------------------
+                coalescer.flush()
+            if bundle is not None:
+                dgram = encode_message(msg, args)
+                bundle.add(dgram)
+            else:
+                dgram = encode_message(msg, args)
+                self.send(dgram)
+            self.query_metrics.record_send(msg, len(dgram))
+
+    def send(self, dgram: bytes):
+        """ Send a pre-encoded OSC message or bundle to Live. """
+        if self.tracer is not None:
+            self.tracer.record(TRACE_OUT, dgram)
         try:
-            self.osc_client.send_message(msg, args)
+            self.osc_socket.sendto(dgram, self.osc_address)
 
         except Exception as e:
             raise LiveConnectionError("Couldn't send message to Live (is AbletonOSC present and activated?): %s" % e)
 
+    def send_encoded(self, msg, dgrams: list[bytes], bundle: bool = True) -> int:
+        """
+        Send commands that have already been encoded (e.g. by encode_float_array()).
+        Within a `with query.bundle()` block, they are added to the bundle;
+        otherwise, several commands are packed into as few datagrams as possible.
+
+        Args:
+            msg: The address of the commands, used for metrics, or a list of
+                 addresses with one per message, for commands to several addresses.
+            dgrams: A list of encoded OSC messages.
+            bundle: If False, each message is sent as a datagram of its own (for
+                    messages that are already close to the maximum datagram size).
+
+        Returns:
+            The number of datagrams sent, or 0 within a `with query.bundle()` block.
+        """
+        addresses = [msg] * len(dgrams) if isinstance(msg, str) else msg
+        with span("send_encoded", msg if isinstance(msg, str) else None, messages=len(dgrams)):
+            if self.coalescer is not None:
+                self.coalescer.flush()
+            current_bundle = getattr(self.bundle_state, "bundle", None)
+            if current_bundle is not None:
+                for dgram in dgrams:
+                    current_bundle.add(dgram)
+                sent = []
+            else:
+                sent = dgrams if len(dgrams) == 1 or not bundle else encode_bundles(dgrams)
+                for dgram in sent:
+                    self.send(dgram)
+            for address, dgram in zip(addresses, dgrams):
+                self.query_metrics.record_send(address, len(dgram))
+        return len(sent)
+
+    def bundle(self, timetag: float = None) -> "Bundle":
+        """
+        Collect commands into a single OSC bundle, which is sent as one datagram
+        when the block exits, so that Live applies them together:
+
+            with live.bundle():
+                for clip in clips:
+                    clip.play()
+                set.tempo = 120
+
+        Bundles are per-thread, and queries within a bundle are sent immediately.
+
+        Args:
+            timetag: The time at which the bundle should take effect, in seconds
+                     since the epoch (as per time.time()). Defaults to immediately.
+        """
+        return Bundle(self, timetag)
+
     def query(self, msg: str, args: tuple = (), timeout: float = None):
         """
         Send a Live command and synchronously wait for its response:
 
         return live.query("/live/tempo")
 
+        Each attempt times out after a period derived from the round-trip times
+        of previous queries to similar addresses. Idempotent /get/ queries are
+        then resent, with exponential backoff, until the overall timeout.
+
         Returns a list of values.
+
+        Raises:
+            LiveTimeoutError: If no reply is received within the timeout.
+            LiveConnectionError: If Live has been unreachable for several queries in a row.
         """
+        if not isinstance(args, (list, tuple)):
+            args = (args,)
+        if timeout is None:
+            timeout = self.osc_timeout
 
-        #------------------------------------------------------------------------
-        # Create an Event to block the thread until this response has been
-        # triggered.
-        #------------------------------------------------------------------------
-        self.osc_server_events[msg] = threading.Event()
+        with self.breaker.guard(), span("query", msg):
+            retries = self.max_retries if self.is_idempotent(msg) else 0
+            deadline = time.monotonic() + timeout
+            for attempt in range(retries + 1):
+                remaining = deadline - time.monotonic()
+                if attempt < retries:
+                    attempt_timeout = min(remaining, self.rtt.timeout(msg) * (2 ** attempt))
+                else:
+                    attempt_timeout = remaining
+                future = self.submit(msg, args)
+                try:
+                    rv = future.result(max(0.0, attempt_timeout))
+                except LiveTimeoutError:
+                    if attempt == retries or deadline - time.monotonic() <= 0:
+                        self.breaker.record_failure()
+                        self.query_metrics.record_timeout(msg)
+                        raise
+                    self.logger.debug("Retrying query: %s %s" % (msg, args))
+                    self.query_metrics.record_retry(msg)
+                    continue
+
+                #------------------------------------------------------------------------
+                # Only sample the RTT of queries answered on their first attempt, as a
+                # reply to a resent query may be a late reply to an earlier attempt
+                # (Karn's algorithm).
+                #------------------------------------------------------------------------
+                latency = future.resolved_at - future.sent_at
+                if attempt == 0:
+                    self.rtt.sample(msg, latency)
+                self.breaker.record_success()
+                self.query_metrics.record_query(msg, latency)
+                return rv
+
+    def is_idempotent(self, msg: str) -> bool:
+        """
+        Returns: True if a query can safely be resent if its reply is lost.
+        Queries that return bulk data are never resent, as they are slow and
+        costly for Live to process.
+        """
+        return "/get/" in msg and msg not in SLOW_ADDRESSES
+
+    def query_many(self, queries: list, timeout: float = None) -> list[list]:
+        """
+        Send a batch of queries back-to-back, then collect all of their replies,
+        so that the batch costs roughly one round trip rather than one per query:
+
+        volumes = live.query_many([("/live/track/get/volume", (n,)) for n in range(64)])
+
+        Args:
+            queries: A list of (address, args) tuples. Bare address strings are also accepted.
+            timeout: Deadline for the entire batch, in seconds.
+
+        Returns:
+            A list of replies, in the same order as the queries.
+        """
+        if timeout is None:
+            timeout = self.osc_timeout
+
+        with self.breaker.guard(), span("query_many"):
+            futures = []
+            try:
+                for query in queries:
+                    if isinstance(query, str):
+                        query = (query,)
+                    futures.append(self.submit(*query))
+
+                #------------------------------------------------------------------------
+                # All replies share a single deadline, so a batch that is missing
+                # replies fails after one timeout, not one per query.
+                #------------------------------------------------------------------------
+                deadline = time.monotonic() + timeout
+                try:
+                    rv = [future.result(max(0.0, deadline - time.monotonic())) for future in futures]
+                except LiveTimeoutError:
+                    self.breaker.record_failure()
+                    for future in futures:
+                        if not future.done():
+                            self.query_metrics.record_timeout(future.address)
+                    raise
+                self.breaker.record_success()
+                for future in futures:
+                    self.query_metrics.record_query(future.address, future.resolved_at - future.sent_at)
+                return rv
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def submit(self, msg: str, args: tuple = ()) -> QueryFuture:
+        """
+        Send a Live query without waiting for its response.
+
+        future = live.Query.default().submit("/live/track/get/volume", (0,))
+        volume = future.result(timeout=1.0)[1]
+
+        Returns a QueryFuture, whose result() blocks until the reply is received.
+        """
+        if not isinstance(args, (list, tuple)):
+            args = (args,)
+
+        if self.coalescer is not None:
+            self.coalescer.flush()
+        self.listen()
 
         #------------------------------------------------------------------------
-        # query_rv will be populated by the callback, storing the return value
-        # of the OSC query.
+        # Register the query before sending, so that a fast reply cannot arrive
+        # before we are ready to route it.
         #------------------------------------------------------------------------
-        self.query_address = msg
-        self.query_rv = []
-        self.cmd(msg, args)
+        future = self.router.register(msg, args)
+        try:
+            self.logger.debug("OSC output: %s %s", msg, args)
+            dgram = encode_message(msg, args)
+            self.send(dgram)
+        except Exception:
+            future.cancel()
+            raise
+        self.query_metrics.record_send(msg, len(dgram))
+        return future
+
+    def packet_handler(self, data: bytes):
+        if self.tracer is not None:
+            self.tracer.record(TRACE_IN, data)
 
         #------------------------------------------------------------------------
-        # Wait for a response. 
+        # Any message from Live shows that it is reachable again.
         #------------------------------------------------------------------------
-        if timeout is None:
-            timeout = self.osc_timeout
-        rv = self.osc_server_events[msg].wait(timeout)
+        self.breaker.record_success()
 
-        if not rv:
-            self.logger.debug("Timeout during query ({msg}, {args}, {kwargs})")
-            raise LiveConnectionError("Timed out waiting for response to query: %s %s. Is Live running and LiveOSC installed?" % (self.query_address, args))
+        decoded = self.decoder.decode(data)
+        if decoded is not None:
+            self.query_metrics.record_receive(decoded[0], len(data))
+            self.handler(*decoded)
+            return
 
-        return self.query_rv
+        from pythonosc.osc_packet import OscPacket, ParseError
 
-    def osc_handler(self, address, *args):
-        self.handler(address, args)
+        try:
+            packet = OscPacket(data)
+        except ParseError as e:
+            self.logger.warning("Couldn't parse OSC packet: %s" % e)
+            return
+        for timed_message in packet.messages:
+            message = timed_message.message
+            self.query_metrics.record_receive(message.address, message.size)
+            self.handler(message.address, tuple(message.params))
 
     def handler(self, address, data):
-        self.logger.debug("OSC input: %s %s" % (address, data))
+        self.logger.debug("OSC input: %s %s", address, data)
 
         #------------------------------------------------------------------------
-        # Execute any callbacks that have been registered for this message
+        # Queue any callbacks that have been registered for this message
         #------------------------------------------------------------------------
-        if address in self.handlers:
-            for handler in self.handlers[address]:
-                handler(*data)
+        for route in self.dispatch_table.routes_for(address):
+            self.callback_executor.submit(route, data)
 
         #------------------------------------------------------------------------
-        # If this message is awaiting a synchronous return, trigger the
-        # thread event and update our return value. 
+        # If this message is a reply to a pending query, resolve its future.
         #------------------------------------------------------------------------
-        if address == self.query_address:
-            self.query_rv += data
-            self.osc_server_events[address].set()
-            return
+        self.router.dispatch(address, data)
 
-        if address == "/live/song/get/beat":
-            if self.beat_callback is not None:
-                #------------------------------------------------------------------------
-                # Beat callbacks are used if we want to trigger an event on each beat,
-                # to synchronise with the timing of the Live set.
-                #
-                # Callbacks may take one argument: the current beat count.
-                # If not specified, call with 0 arguments.
-                #------------------------------------------------------------------------
-                signature = inspect.signature(self.beat_callback)
-                has_arg = len(signature.parameters) > 0
+    def add_handler(self, address: str, handler, match: str = None) -> Route:
+        """
+        Register a callback for messages received from Live.
+
+        Args:
+            address: The address, or an address pattern, e.g. "/live/song/get/beat",
+                     "/live/track/get/*" or "/live/clip/get/{name,length}"
+            handler: Called with the message's arguments. If it accepts fewer
+                     arguments than the message carries, they are truncated.
+            match: One of "exact", "prefix" or "wildcard". Defaults to "wildcard" for
+                   addresses that contain OSC wildcard characters, or "exact" otherwise.
+        """
+        self.listen()
+        return self.dispatch_table.add(address, handler, match)
 
-                if has_arg:
-                    self.beat_callback(data[0])
-                else:
-                    self.beat_callback()
+    def remove_handler(self, address: str, handler) -> bool:
+        """
+        Remove a callback previously registered with add_handler().
+
+        Returns:
+            True if the handler was registered, False otherwise.
+        """
+        routes = self.dispatch_table.remove(address, handler)
+        for route in routes:
+            self.callback_executor.discard(route)
+        return len(routes) > 0
+
+    def set_callback_executor(self, mode: str = "thread", **kwargs) -> CallbackExecutor:
+        """
+        Configure how callbacks registered via add_handler(), beat_callback and
+        startup_callback are run. Callbacks never run on the OSC receive thread
+        unless mode is "inline".
 
-        elif address == "/live/startup":
-            if self.startup_callback is not None:
-                self.startup_callback()
+            query.set_callback_executor("asyncio", loop=asyncio.get_running_loop())
 
-    def add_handler(self, address, handler):
-        if not address in self.handlers:
-            self.handlers[address] = []
-        self.handlers[address].append(handler)
+        Args:
+            mode: One of "thread", "process", "asyncio" or "inline".
+            kwargs: Further arguments to CallbackExecutor (max_workers, queue_size, policy, loop)
+
+        Returns:
+            The new CallbackExecutor, whose stats() reports queue depths and drops.
+        """
+        previous = self.callback_executor
+        self.callback_executor = CallbackExecutor(mode, **kwargs)
+        previous.shutdown(wait=False)
+        return self.callback_executor
+
+    @property
+    def beat_callback(self):
+        """ Callback triggered on each beat. May take one argument: the current beat count. """
+        return self._beat_route.handler if self._beat_route else None
+
+    @beat_callback.setter
+    def beat_callback(self, callback):
+        if self._beat_route is not None:
+            self.dispatch_table.remove_route(self._beat_route)
+            self.callback_executor.discard(self._beat_route)
+            self._beat_route = None
+        if callback is not None:
+            self.listen()
+            self._beat_route = self.dispatch_table.add("/live/song/get/beat", callback)
+
+    @property
+    def startup_callback(self):
+        """ Callback triggered when Live opens a set. """
+        return self._startup_route.handler if self._startup_route else None
+
+    @startup_callback.setter
+    def startup_callback(self, callback):
+        if self._startup_route is not None:
+            self.dispatch_table.remove_route(self._startup_route)
+            self.callback_executor.discard(self._startup_route)
+            self._startup_route = None
+        if callback is not None:
+            self.listen()
+            self._startup_route = self.dispatch_table.add("/live/startup", callback)
+
+class Bundle:
+    """
+    Context manager that collects commands sent via Query.cmd() on the current
+    thread into a single OSC bundle. Bundles may be nested.
+    """
+
+    def __init__(self, query: Query, timetag: float = None):
+        self.query = query
+        self.timetag = timetag
+        self.elements = []
+        self.parent = None
+
+    def __enter__(self):
+        state = self.query.bundle_state
+        self.parent = getattr(state, "bundle", None)
+        state.bundle = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.query.bundle_state.bundle = self.parent
+        if exc_type is not None or not self.elements:
+            return
+        dgram = encode_bundle(self.elements, self.timetag)
+        if self.parent is not None:
+            self.parent.add(dgram)
+        else:
+            self.query.send(dgram)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def add(self, dgram: bytes) -> None:
+        """ Add an encoded message (or bundle) to this bundle. """
+        self.elements.append(dgram)
 
 if __name__ == "__main__":
+    import argparse
+
     parser = argparse.ArgumentParser()
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
     parser.add_argument("--reload", action="store_true", help="Prompt AbletonOSC to reload code")
@@ -0,0 +1,206 @@
+import time
+import threading
+
+from live.exceptions import LiveTimeoutError
+
+#------------------------------------------------------------------------
+# AbletonOSC replies to most queries by echoing the leading index
+# arguments (track, clip, device...) ahead of the return values, e.g.:
+#
+#   /live/track/get/volume 1  ->  /live/track/get/volume 1 0.85
+#
+# These addresses take leading integer arguments that are *not* echoed
+# in the reply, so can only be matched in order of submission.
+#------------------------------------------------------------------------
+UNECHOED_ADDRESSES = {
+    "/live/song/get/track_data",
+    "/live/song/export/structure",
+}
+
+#------------------------------------------------------------------------
+# These addresses take further integer arguments after their index
+# arguments, of which only the index arguments are echoed, e.g.:
+#
+#   /live/clip/get/notes 1 0 0 128 0.0 16.0  ->  /live/clip/get/notes 1 0 <notes...>
+#------------------------------------------------------------------------
+ECHOED_ARG_COUNTS = {
+    "/live/clip/get/notes": 2,
+}
+
+def echo_args(address: str, args: tuple) -> tuple:
+    """
+    Returns the leading arguments of a query that Live is expected to echo
+    back in its reply, used to correlate replies with requests.
+    """
+    if address in UNECHOED_ADDRESSES:
+        return ()
+    if address in ECHOED_ARG_COUNTS:
+        return tuple(args[:ECHOED_ARG_COUNTS[address]])
+    echo = []
+    for arg in args:
+        if type(arg) is not int:
+            break
+        echo.append(arg)
+    return tuple(echo)
+
+class QueryFuture:
+    """
+    The pending result of a query that has been sent to Live.
+    Returned by Query.submit(); call result() to block until the reply arrives.
+    """
+
+    __slots__ = ("address", "args", "echo", "sent_at", "resolved_at",
+                 "_router", "_event", "_done", "_result", "_exception")
+
+    def __init__(self, router, address: str, args: tuple, event: threading.Event):
+        self.address = address
+        self.args = args
+        self.echo = echo_args(address, args)
+        self.sent_at = time.monotonic()
+        self.resolved_at = None
+        self._router = router
+        self._event = event
+        self._done = False
+        self._result = None
+        self._exception = None
+
+    def __str__(self):
+        return "QueryFuture (%s %s)" % (self.address, self.args)
+
+    def done(self) -> bool:
+        """
+        Returns: True if a reply (or error) has been received, False otherwise.
+        """
+        return self._done
+
+    def result(self, timeout: float = None) -> list:
+        """
+        Block until the reply to this query is received.
+
+        Args:
+            timeout: Maximum time to wait, in seconds. If None, waits indefinitely.
+
+        Returns:
+            A list of values.
+
+        Raises:
+            LiveTimeoutError: If no reply is received within the timeout.
+        """
+        event = self._event
+        if event is not None and not self._done:
+            event.wait(timeout)
+        self._router.release(self)
+
+        if not self._done:
+            raise LiveTimeoutError("Timed out waiting for response to query: %s %s. "
+                                   "Is Live running and AbletonOSC installed?" % (self.address, self.args))
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def cancel(self) -> None:
+        """
+        Stop waiting for a reply to this query.
+        """
+        self._router.release(self)
+
+    def _resolve(self, result=None, exception=None) -> None:
+        # Must be called with the router's lock held.
+        self.resolved_at = time.monotonic()
+        self._result = result
+        self._exception = exception
+        self._done = True
+        self._event.set()
+
+class RequestRouter:
+    """
+    Tracks queries that are in flight to Live, and routes each incoming reply
+    to the query that it corresponds to.
+
+    Replies are matched by address plus the echoed index arguments, so that
+    (say) queries for the volume of tracks 0 and 1 can be outstanding
+    simultaneously, from any number of threads. Queries with identical
+    address and arguments are resolved in the order they were submitted.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending: dict[str, list[QueryFuture]] = {}
+        self.event_pool: list[threading.Event] = []
+
+    def __len__(self):
+        return sum(len(futures) for futures in self.pending.values())
+
+    def register(self, address: str, args: tuple = ()) -> QueryFuture:
+        """
+        Register a new query that is about to be sent.
+
+        Returns:
+            A QueryFuture that will be resolved when the reply is dispatched.
+        """
+        with self.lock:
+            event = self.event_pool.pop() if self.event_pool else threading.Event()
+            future = QueryFuture(self, address, tuple(args), event)
+            self.pending.setdefault(address, []).append(future)
+        return future
+
+    def dispatch(self, address: str, data: tuple) -> bool:
+        """
+        Resolve the pending query that corresponds to an incoming message.
+
+        Returns:
+            True if the message was a reply to a pending query, False otherwise.
+        """
+        with self.lock:
+            futures = self.pending.get(address)
+            if not futures:
+                return False
+            for index, future in enumerate(futures):
+                echo = future.echo
+                if tuple(data[:len(echo)]) == echo:
+                    del futures[index]
+                    if not futures:
+                        del self.pending[address]
+                    future._resolve(list(data))
+                    return True
+        return False
+
+    def release(self, future: QueryFuture) -> None:
+        """
+        Stop tracking a query, returning its Event to the pool for reuse.
+        """
+        with self.lock:
+            futures = self.pending.get(future.address)
+            if futures and future in futures:
+                futures.remove(future)
+                if not futures:
+                    del self.pending[future.address]
+            event = future._event
+            if event is not None:
+                future._event = None
+                event.clear()
+                self.event_pool.append(event)
+
+    def drain(self, timeout: float) -> bool:
+        """
+        Wait for all pending queries to be resolved or released.
+
+        Returns:
+            True if no queries remain pending, False if the timeout expired.
+        """
+        deadline = time.monotonic() + timeout
+        while self.pending:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def cancel_all(self, exception: Exception) -> None:
+        """
+        Fail all pending queries with the given exception.
+        """
+        with self.lock:
+            for futures in self.pending.values():
+                for future in futures:
+                    future._resolve(exception=exception)
+            self.pending = {}
@@ -0,0 +1,185 @@
+import time
+import threading
+import contextlib
+
+from live.exceptions import LiveConnectionError
+
+#------------------------------------------------------------------------
+# Queries whose round-trip times differ greatly from others of their
+# object and verb (e.g. /live/song/get), so are estimated separately.
+#------------------------------------------------------------------------
+SLOW_ADDRESSES = {
+    "/live/song/get/track_data",
+    "/live/song/export/structure",
+}
+
+def address_class(address: str) -> str:
+    """
+    Returns the class used to group an address's round-trip times, which is its
+    object and verb (e.g. /live/track/get/volume -> /live/track/get), or the full
+    address for queries that are known to be slow or return bulk data.
+    """
+    if address in SLOW_ADDRESSES or "/parameters/" in address:
+        return address
+    return "/".join(address.split("/", 4)[:4])
+
+class RTTEstimator:
+    """
+    Estimates the round-trip time of queries per address class, using the
+    smoothed RTT and RTT variance estimators of TCP (RFC 6298), and derives a
+    retransmission timeout from them.
+    """
+
+    def __init__(self,
+                 initial_timeout: float = 0.5,
+                 min_timeout: float = 0.02,
+                 max_timeout: float = 3.0,
+                 alpha: float = 1 / 8,
+                 beta: float = 1 / 4,
+                 k: float = 4.0):
+        """
+        Args:
+            initial_timeout: Timeout used for a class before any RTT has been sampled.
+            min_timeout: Lower bound on timeouts, in seconds.
+            max_timeout: Upper bound on timeouts, in seconds.
+            alpha: Gain of the smoothed RTT.
+            beta: Gain of the RTT variance.
+            k: Number of deviations above the smoothed RTT at which to time out.
+        """
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.alpha = alpha
+        self.beta = beta
+        self.k = k
+        self.lock = threading.Lock()
+
+        #------------------------------------------------------------------------
+        # Per address class: [srtt, rttvar, samples]
+        #------------------------------------------------------------------------
+        self.estimates: dict[str, list] = {}
+
+    def sample(self, address: str, rtt: float) -> None:
+        """
+        Record the round-trip time of a query that was answered on its first attempt.
+        """
+        key = address_class(address)
+        with self.lock:
+            estimate = self.estimates.get(key)
+            if estimate is None:
+                self.estimates[key] = [rtt, rtt / 2, 1]
+            else:
+                srtt, rttvar, samples = estimate
+                rttvar = (1 - self.beta) * rttvar + self.beta * abs(srtt - rtt)
+                srtt = (1 - self.alpha) * srtt + self.alpha * rtt
+                self.estimates[key] = [srtt, rttvar, samples + 1]
+
+    def timeout(self, address: str) -> float:
+        """
+        Returns the time after which a query to this address should be considered lost.
+        """
+        estimate = self.estimates.get(address_class(address))
+        if estimate is None:
+            return self.initial_timeout
+        srtt, rttvar, _ = estimate
+        return min(self.max_timeout, max(self.min_timeout, srtt + self.k * rttvar))
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: For each address class, the smoothed RTT, RTT variance, current
+                  timeout and number of samples.
+        """
+        with self.lock:
+            return {
+                key: {
+                    "srtt": srtt,
+                    "rttvar": rttvar,
+                    "timeout": min(self.max_timeout, max(self.min_timeout, srtt + self.k * rttvar)),
+                    "samples": samples,
+                }
+                for key, (srtt, rttvar, samples) in self.estimates.items()
+            }
+
+class CircuitBreaker:
+    """
+    Fails queries fast while Live appears to be unreachable.
+
+    After a number of consecutive queries time out, the breaker opens, and
+    queries fail immediately for a cooldown period. After the cooldown, one
+    query is let through as a trial: if it succeeds, the breaker closes.
+    Any message received from Live also closes the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 1.0):
+        """
+        Args:
+            failure_threshold: Number of consecutive failed queries that opens the breaker.
+            reset_timeout: Time after opening before a trial query is permitted, in seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_progress = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def check(self) -> bool:
+        """
+        Returns:
+            True if the query is permitted as a trial, which must end with a call to
+            record_success(), record_failure() or release_trial(); False otherwise.
+
+        Raises:
+            LiveConnectionError: If the breaker is open, and no trial query is permitted.
+        """
+        if self.opened_at is None:
+            return False
+        with self.lock:
+            if self.opened_at is None:
+                return False
+            if not self.trial_in_progress and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.trial_in_progress = True
+                return True
+        raise LiveConnectionError("Live appears to be unreachable (%d consecutive queries timed out). "
+                                  "Is Live running and AbletonOSC installed?" % self.failures)
+
+    @contextlib.contextmanager
+    def guard(self):
+        """
+        Check the breaker before a query, as check(). If the query is a trial and
+        ends without recording its success or failure (e.g. because it could not
+        be sent), the trial is released, so that a later query can be tried.
+        """
+        trial = self.check()
+        try:
+            yield
+        except BaseException:
+            if trial:
+                self.release_trial()
+            raise
+
+    def release_trial(self) -> None:
+        """
+        End a trial query without recording its outcome.
+        """
+        with self.lock:
+            self.trial_in_progress = False
+
+    def record_success(self) -> None:
+        if self.failures or self.opened_at is not None:
+            with self.lock:
+                self.failures = 0
+                self.opened_at = None
+                self.trial_in_progress = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self.trial_in_progress = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
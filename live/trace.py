@@ -0,0 +1,188 @@
+"""
+Opt-in wire tracer, which records every OSC datagram sent to and received
+from Live.
+
+Datagrams are appended to an in-memory ring buffer and written to disk by a
+background thread, so that tracing adds no file I/O to the send path.
+Enable it with Query.start_trace(), or by setting the PYLIVE_TRACE environment
+variable to the path of the trace file.
+
+Each trace file begins with TRACE_MAGIC, followed by a sequence of records:
+
+    <float64 timestamp> <uint8 direction> <uint32 length> <OSC datagram>
+
+all little-endian. To print a trace file:
+
+    python3 -m live.trace /tmp/liveosc.trace
+"""
+
+import os
+import sys
+import time
+import struct
+import logging
+import threading
+import collections
+
+TRACE_MAGIC = b"PYLIVETRACE\x01"
+TRACE_OUT = 0
+TRACE_IN = 1
+
+RECORD_HEADER = struct.Struct("<dBI")
+
+logger = logging.getLogger(__name__)
+
+class WireTracer:
+    """
+    Records OSC datagrams to a size-rotated binary trace file.
+    """
+
+    def __init__(self,
+                 path: str,
+                 max_bytes: int = 16 * 1024 * 1024,
+                 backup_count: int = 3,
+                 buffer_size: int = 65536,
+                 flush_interval: float = 0.25):
+        """
+        Args:
+            path: Path of the trace file
+            max_bytes: Size at which the trace file is rotated
+            backup_count: Number of rotated files to keep (path.1, path.2, ...)
+            buffer_size: Maximum number of records held in memory. If the flusher
+                         falls behind, the oldest records are discarded.
+            flush_interval: Interval between writes to disk, in seconds
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+
+        self.buffer = collections.deque(maxlen=buffer_size)
+        self.records_written = 0
+        self.records_dropped = 0
+
+        self.fd = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self) -> None:
+        self.fd = self._open()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="pylive-tracer", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Write any buffered records to disk, and close the trace file.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+        with self.lock:
+            if self.fd is not None:
+                self.fd.close()
+                self.fd = None
+
+    def record(self, direction: int, dgram: bytes) -> None:
+        """
+        Add a datagram to the ring buffer. Called on the send/receive path,
+        so does no I/O.
+        """
+        if len(self.buffer) == self.buffer.maxlen:
+            self.records_dropped += 1
+        self.buffer.append((time.time(), direction, dgram))
+
+    def flush(self) -> None:
+        """
+        Write all buffered records to disk.
+        """
+        with self.lock:
+            if self.fd is None:
+                return
+            chunks = []
+            buffer = self.buffer
+            while buffer:
+                timestamp, direction, dgram = buffer.popleft()
+                chunks.append(RECORD_HEADER.pack(timestamp, direction, len(dgram)))
+                chunks.append(dgram)
+            if not chunks:
+                return
+            self.fd.write(b"".join(chunks))
+            self.fd.flush()
+            self.records_written += len(chunks) // 2
+
+            if self.fd.tell() >= self.max_bytes:
+                self._rotate()
+
+    def _run(self):
+        while not self.stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                logger.warning("Couldn't write trace file %s: %s" % (self.path, e))
+
+    def _open(self):
+        fd = open(self.path, "ab")
+        if fd.tell() == 0:
+            fd.write(TRACE_MAGIC)
+        return fd
+
+    def _rotate(self):
+        # Must be called with the lock held.
+        self.fd.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = "%s.%d" % (self.path, index)
+                if os.path.exists(source):
+                    os.replace(source, "%s.%d" % (self.path, index + 1))
+            os.replace(self.path, "%s.1" % self.path)
+        else:
+            os.unlink(self.path)
+        self.fd = self._open()
+
+def read_trace(path: str):
+    """
+    Iterate over the records in a trace file.
+
+    Yields:
+        Tuples of (timestamp, direction, address, args)
+    """
+    from pythonosc.osc_packet import OscPacket, ParseError
+
+    with open(path, "rb") as fd:
+        if fd.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError("Not a pylive trace file: %s" % path)
+        while True:
+            header = fd.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            timestamp, direction, length = RECORD_HEADER.unpack(header)
+            dgram = fd.read(length)
+            try:
+                for timed_message in OscPacket(dgram).messages:
+                    message = timed_message.message
+                    yield timestamp, direction, message.address, tuple(message.params)
+            except ParseError:
+                yield timestamp, direction, None, (dgram,)
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print the contents of a pylive trace file")
+    parser.add_argument("path", nargs="+", help="Trace file(s), e.g. /tmp/liveosc.trace.1 /tmp/liveosc.trace")
+    parser.add_argument("-a", "--address", help="Only print messages whose address starts with this prefix")
+    args = parser.parse_args()
+
+    for path in args.path:
+        for timestamp, direction, address, data in read_trace(path):
+            if args.address and not (address or "").startswith(args.address):
+                continue
+            timestamp_str = time.strftime("%H:%M:%S", time.localtime(timestamp)) + ("%.6f" % (timestamp % 1))[1:]
+            arrow = "->" if direction == TRACE_OUT else "<-"
+            print("%s %s %s %s" % (timestamp_str, arrow, address, " ".join(repr(arg) for arg in data)))
+
+if __name__ == "__main__":
+    sys.exit(main())
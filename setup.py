@@ -13,6 +13,7 @@ setup(
     url = 'https://github.com/ideoforms/pylive',
     packages = find_packages(),
     install_requires = ['python-osc'],
+    extras_require = {'numpy': ['numpy']},
     keywords = ('sound', 'music', 'ableton', 'osc'),
     classifiers = [
         'Topic :: Multimedia :: Sound/Audio',
@@ -22,5 +23,5 @@ setup(
         'Intended Audience :: Developers'
     ],
     setup_requires = ['pytest-runner'],
-    tests_require = ['pytest', 'pytest-timeout']
+    tests_require = ['pytest', 'pytest-timeout', 'numpy']
 )
@@ -1,5 +1,10 @@
 import live
+import time
 import pytest
+import threading
+
+from live.emulator import LiveEmulator
+from pythonosc.osc_packet import OscPacket
 
 def open_test_set():
     set = live.Set(scan=False)
@@ -11,4 +16,51 @@ def open_test_set():
 @pytest.fixture(scope="module")
 def live_set():
     set = live.Set(scan=True)
-    return set
\ No newline at end of file
+    return set
+
+#--------------------------------------------------------------------------------
+# Fixtures for tests against the emulator (no Live connection required).
+# Modules that need a different emulated set define their own emulator_options
+# fixture, returning keyword arguments for LiveEmulator.
+#--------------------------------------------------------------------------------
+
+@pytest.fixture
+def emulator_options() -> dict:
+    return {}
+
+@pytest.fixture
+def emulator(emulator_options):
+    with LiveEmulator(port=0, **emulator_options) as emulator:
+        yield emulator
+
+@pytest.fixture
+def query(emulator):
+    with live.connect(emulator.address, listen_port=0) as query:
+        yield query
+
+@pytest.fixture
+def set(query):
+    return live.Set(client=query)
+
+def wait_for(condition, timeout: float = 1.0) -> bool:
+    """ Poll until condition() is true. Returns False if the timeout expires first. """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+class RecordingQuery:
+    """ Stands in for Query, recording the datagrams that it is asked to send. """
+    def __init__(self):
+        self.bundle_state = threading.local()
+        self.sent = []
+
+    def send(self, dgram):
+        self.sent.append(dgram)
+
+    @property
+    def messages(self):
+        return [(timed.message.address, timed.message.params)
+                for dgram in self.sent for timed in OscPacket(dgram).messages]
@@ -0,0 +1,81 @@
+""" Unit tests for pylive's asyncio client, against a minimal local responder """
+
+import pytest
+import asyncio
+
+import live
+from live import AsyncQuery
+from pythonosc.osc_message import OscMessage
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+class Responder(asyncio.DatagramProtocol):
+    """
+    Replies to /live/track/get/volume queries in reverse order of arrival,
+    echoing the track index as AbletonOSC does.
+    """
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.received = []
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        message = OscMessage(data)
+        self.received.append((message.address, message.params))
+        if message.address == "/live/track/get/volume":
+            self.batch = getattr(self, "batch", []) + [(message.params[0], addr)]
+            if len(self.batch) == self.batch_size:
+                for track_index, reply_addr in reversed(self.batch):
+                    builder = OscMessageBuilder(address=message.address)
+                    builder.add_arg(track_index)
+                    builder.add_arg(track_index / 8)
+                    self.transport.sendto(builder.build().dgram, reply_addr)
+
+async def start_responder(batch_size=1):
+    loop = asyncio.get_running_loop()
+    transport, responder = await loop.create_datagram_endpoint(lambda: Responder(batch_size),
+                                                               local_addr=("127.0.0.1", 0))
+    return transport, responder
+
+def test_async_query_gather():
+    async def run():
+        transport, responder = await start_responder(batch_size=8)
+        port = transport.get_extra_info("sockname")[1]
+        async with AsyncQuery(("127.0.0.1", port), listen_port=0) as q:
+            replies = await asyncio.gather(*(q.query("/live/track/get/volume", (n,)) for n in range(8)))
+        transport.close()
+        return replies
+
+    replies = asyncio.run(run())
+    assert replies == [[n, n / 8] for n in range(8)]
+
+def test_async_query_cmd_and_timeout():
+    async def run():
+        transport, responder = await start_responder()
+        port = transport.get_extra_info("sockname")[1]
+        async with AsyncQuery(("127.0.0.1", port), listen_port=0) as q:
+            q.cmd("/live/song/set/tempo", (110.0,))
+            with pytest.raises(live.LiveConnectionError):
+                await q.query("/live/song/get/tempo", timeout=0.05)
+            assert q.pending == {}
+        transport.close()
+        return responder.received
+
+    received = asyncio.run(run())
+    assert ("/live/song/set/tempo", [110.0]) in received
+
+def test_async_query_remote_host():
+    async def run():
+        async with AsyncQuery(("192.0.2.1", 11000)) as q:
+            return q.transport.get_extra_info("sockname")
+
+    host, port = asyncio.run(run())
+    assert host == "0.0.0.0"
+    assert port != 11001
+
+def test_async_getter_address():
+    assert live.Track.volume.fget.address == "/live/track/get/volume"
+    assert live.object.getter_address(live.Clip, "is_playing") == "/live/clip/get/is_playing"
+    with pytest.raises(AttributeError):
+        live.object.getter_address(live.Set, "nonexistent")
@@ -0,0 +1,151 @@
+""" Tests of the automation engine against the emulator (no Live connection required) """
+
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from live import Set
+from live.automation import Automation, resolve_target
+from live.emulator import LiveEmulator
+
+from .shared import emulator, query
+
+class ManualClock:
+    """ A clock whose time is set by the test. """
+
+    def __init__(self):
+        self.t = 0.0
+
+    def now_beats(self) -> float:
+        return self.t
+
+@pytest.fixture
+def emulator_options():
+    return dict(num_tracks=4, num_scenes=2, seed=1)
+
+@pytest.fixture
+def set(query):
+    set = Set(client=query)
+    set.scan(mode="file")
+    return set
+
+@pytest.fixture
+def clock():
+    return ManualClock()
+
+def sync(set: Set):
+    # A round trip ensures that the emulator has applied all preceding commands.
+    set.live.query("/live/song/get/tempo")
+
+def test_resolve_target(set: Set):
+    parameter = set.tracks[1].devices[0].parameters[2]
+    assert resolve_target((set, "tempo")) == ("/live/song/set/tempo", ())
+    assert resolve_target((set.tracks[2], "volume")) == ("/live/track/set/volume", (2,))
+    assert resolve_target(parameter) == ("/live/device/set/parameter/value", (1, 0, 2))
+    assert resolve_target(("/live/track/set/panning", (3,))) == ("/live/track/set/panning", (3,))
+    with pytest.raises(TypeError):
+        resolve_target((object(), "tempo"))
+
+def test_automation_lfo(emulator: LiveEmulator, set: Set, clock: ManualClock):
+    automation = Automation(set.live, clock=clock)
+    automation.lfo((set, "tempo"), "triangle", frequency=0.25, min=100.0, max=140.0)
+    automation.lfo((set.tracks[1], "volume"), "saw", frequency=0.5)
+    assert automation.tick() == 2
+    sync(set)
+    assert emulator.set.song["tempo"] == pytest.approx(100.0)
+
+    clock.t = 2.0
+    automation.tick()
+    sync(set)
+    assert emulator.set.song["tempo"] == pytest.approx(140.0)
+    assert emulator.set.tracks[1]["volume"] == pytest.approx(0.0)
+
+    clock.t = 2.5
+    automation.tick()
+    sync(set)
+    assert emulator.set.song["tempo"] == pytest.approx(130.0)
+    assert emulator.set.tracks[1]["volume"] == pytest.approx(0.25)
+
+def test_automation_sends_only_changes(set: Set, clock: ManualClock):
+    automation = Automation(set.live, clock=clock)
+    automation.lfo((set, "tempo"), "square", frequency=1.0, min=100.0, max=140.0)
+    automation.lfo((set.tracks[0], "volume"), "sine", frequency=1.0)
+    assert automation.tick() == 2
+    assert automation.tick() == 0
+    clock.t = 0.25
+    assert automation.tick() == 1
+    assert automation.stats()["unchanged"] == 3
+    assert automation.stats()["datagrams"] == 2
+    addresses = set.live.metrics()["addresses"]
+    assert addresses["/live/song/set/tempo"]["sent"] == 1
+    assert addresses["/live/track/set/volume"]["sent"] == 2
+
+def test_automation_sends_after_coalesced_writes(emulator: LiveEmulator, set: Set, clock: ManualClock):
+    set.live.enable_coalescing(rate=1.0)
+    set.tempo = 100.0
+    automation = Automation(set.live, clock=clock)
+    automation.ramp((set, "tempo"), start=130.0, end=140.0, duration=4.0)
+    automation.tick()
+    sync(set)
+    assert emulator.set.song["tempo"] == pytest.approx(130.0)
+
+def test_automation_ramp(emulator: LiveEmulator, set: Set, clock: ManualClock):
+    automation = Automation(set.live, clock=clock)
+    linear = automation.ramp((set.tracks[0], "volume"), start=0.0, end=1.0, duration=4.0)
+    exponential = automation.ramp((set, "tempo"), start=60.0, end=240.0, duration=4.0, curve="exponential")
+    clock.t = 2.0
+    automation.tick()
+    sync(set)
+    assert emulator.set.tracks[0]["volume"] == pytest.approx(0.5)
+    assert emulator.set.song["tempo"] == pytest.approx(120.0)
+    assert not linear.done.is_set()
+
+    clock.t = 5.0
+    automation.tick()
+    sync(set)
+    assert emulator.set.tracks[0]["volume"] == pytest.approx(1.0)
+    assert linear.wait(0) and exponential.wait(0)
+    assert automation.stats()["sources"] == 0
+
+    with pytest.raises(ValueError):
+        automation.ramp((set, "tempo"), start=0.0, end=1.0, duration=1.0, curve="exponential")
+
+def test_automation_envelope(emulator: LiveEmulator, set: Set, clock: ManualClock):
+    automation = Automation(set.live, clock=clock)
+    envelope = automation.envelope((set.tracks[2], "volume"), attack=1.0, decay=1.0, sustain=0.5, release=2.0)
+
+    for t, expected in [(0.5, 0.5), (1.0, 1.0), (1.5, 0.75), (4.0, 0.5)]:
+        clock.t = t
+        automation.tick()
+        sync(set)
+        assert emulator.set.tracks[2]["volume"] == pytest.approx(expected)
+
+    envelope.release()
+    clock.t = 5.0
+    automation.tick()
+    sync(set)
+    assert emulator.set.tracks[2]["volume"] == pytest.approx(0.25)
+    clock.t = 6.0
+    automation.tick()
+    assert envelope.wait(0)
+
+def test_automation_replaces_source(set: Set, clock: ManualClock):
+    automation = Automation(set.live, clock=clock)
+    first = automation.lfo((set, "tempo"), min=100.0, max=140.0)
+    second = automation.ramp((set, "tempo"), start=120.0, end=130.0, duration=1.0)
+    assert first.wait(0)
+    assert automation.stats()["sources"] == 1
+    second.stop()
+    assert automation.stats()["sources"] == 0
+
+def test_automation_scheduler(emulator: LiveEmulator, set: Set):
+    with Automation(set.live, rate=200.0) as automation:
+        automation.lfo((set.tracks[0], "panning"), "sine", frequency=5.0, min=-1.0, max=1.0)
+        time.sleep(0.25)
+    stats = automation.stats()
+    assert 30 <= stats["ticks"] <= 60
+    assert stats["sent"] > 0
+    assert stats["jitter_mean"] < 0.005
+    assert automation.thread is None
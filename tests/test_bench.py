@@ -0,0 +1,31 @@
+""" Smoke tests for the benchmark suite, with minimal sizes (no Live connection required) """
+
+import json
+
+from live.bench import scan, query, beat, save, imports
+from live.bench.common import percentile, summarise
+
+def test_bench_percentile():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile(samples, 100) == 100
+    summary = summarise([0.001, 0.002, 0.003], 1000)
+    assert summary["p50"] == 2.0
+    assert summary["max"] == 3.0
+
+def test_bench_runs():
+    results = {
+        "scan": scan.run([10], repeats=1),
+        "query": query.run(count=20, duration=0.05),
+        "beat": beat.run(count=10, interval=0.001, modes=("inline",)),
+        "save": save.run([10], repeats=1),
+        "imports": imports.run(repeats=1),
+    }
+    assert results["scan"]["10"]["network_s"] > 0
+    assert results["query"]["rtt_song_tempo_ms"]["count"] == 20
+    assert results["beat"]["inline"]["missed"] == 0
+    assert results["save"]["10"]["bytes"] > 0
+    assert results["imports"]["heavy_modules"] == []
+    assert not results["imports"]["listening"]
+    json.dumps(results)
@@ -0,0 +1,51 @@
+""" Tests of the local song clock against the emulator (no Live connection required) """
+
+import math
+import time
+
+import pytest
+
+from live import Set
+from live.emulator import LiveEmulator
+
+from .shared import emulator, query, set
+
+@pytest.fixture
+def emulator_options():
+    return dict(latency=0.002)
+
+def test_clock_stopped(emulator: LiveEmulator, set: Set):
+    emulator.song_time = 8.0
+    clock = set.clock
+    assert not clock.is_playing
+    assert clock.tempo == 120.0
+    assert clock.now_beats() == 8.0
+    assert clock.time_until(9.0) == math.inf
+    assert clock.latency == pytest.approx(0.002, abs=0.002)
+
+def test_clock_follows_song_time(emulator: LiveEmulator, set: Set):
+    set.tempo = 600.0
+    set.start_playing()
+    clock = set.clock
+    for _ in range(10):
+        time.sleep(0.05)
+        assert clock.now_beats() == pytest.approx(emulator.song_time, abs=0.05)
+    assert clock.is_playing
+    assert clock.stats()["beats_received"] > 0
+
+    next_beat = math.ceil(clock.now_beats()) + 1
+    time.sleep(clock.time_until(next_beat))
+    assert emulator.song_time == pytest.approx(next_beat, abs=0.05)
+
+def test_clock_follows_tempo_and_transport(emulator: LiveEmulator, set: Set):
+    set.start_playing()
+    clock = set.clock
+    set.tempo = 300.0
+    time.sleep(0.1)
+    assert clock.tempo == 300.0
+    assert clock.now_beats() == pytest.approx(emulator.song_time, abs=0.05)
+
+    set.stop_playing()
+    time.sleep(0.05)
+    assert not clock.is_playing
+    assert clock.now_beats() == pytest.approx(emulator.song_time, abs=0.05)
@@ -0,0 +1,83 @@
+""" Unit tests for pylive's write coalescer """
+
+import time
+import socket
+import pytest
+
+from live import Query
+from live.coalesce import WriteCoalescer
+from pythonosc.osc_packet import OscPacket
+
+from .shared import RecordingQuery
+
+def test_coalesce_latest_value_wins():
+    query = RecordingQuery()
+    coalescer = WriteCoalescer(query)
+    for n in range(10):
+        coalescer.submit("/live/song/set/tempo", (100.0 + n,))
+        coalescer.submit("/live/track/set/volume", (0, n / 10))
+        coalescer.submit("/live/track/set/volume", (1, n / 20))
+    coalescer.flush()
+
+    assert len(query.sent) == 1
+    assert sorted(query.messages) == sorted([
+        ("/live/song/set/tempo", [109.0]),
+        ("/live/track/set/volume", [0, pytest.approx(0.9)]),
+        ("/live/track/set/volume", [1, pytest.approx(0.45)]),
+    ])
+    stats = coalescer.stats()
+    assert stats["submitted"] == 30
+    assert stats["superseded"] == 27
+    assert stats["sent"] == 3
+    assert stats["datagrams"] == 1
+
+def test_coalesce_epsilon():
+    query = RecordingQuery()
+    coalescer = WriteCoalescer(query, epsilon=0.01)
+    coalescer.submit("/live/song/set/tempo", (120.0,))
+    coalescer.flush()
+    coalescer.submit("/live/song/set/tempo", (120.005,))
+    coalescer.flush()
+    coalescer.submit("/live/song/set/tempo", (121.0,))
+    coalescer.flush()
+    assert [params for _, params in query.messages] == [[120.0], [121.0]]
+    assert coalescer.stats()["unchanged"] == 1
+
+    coalescer.reset()
+    coalescer.submit("/live/song/set/tempo", (121.0,))
+    coalescer.flush()
+    assert len(query.sent) == 3
+
+def test_coalesce_no_epsilon():
+    #------------------------------------------------------------------------
+    # By default, unchanged values are re-sent, as Live's value may have been
+    # changed elsewhere since.
+    #------------------------------------------------------------------------
+    for coalescer in (WriteCoalescer(RecordingQuery()), WriteCoalescer(RecordingQuery(), epsilon=None)):
+        for n in range(3):
+            coalescer.submit("/live/song/set/tempo", (120.0,))
+            coalescer.flush()
+        assert len(coalescer.query.sent) == 3
+
+def test_coalesce_cmd_order():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(1.0)
+    with Query(receiver.getsockname(), listen_port=0) as query:
+        query.enable_coalescing(rate=1.0)
+        query.cmd("/live/song/set/tempo", (130.0,))
+        query.cmd("/live/song/start_playing")
+        addresses = [OscPacket(receiver.recv(65536)).messages[0].message.address for _ in range(2)]
+    receiver.close()
+    assert addresses == ["/live/song/set/tempo", "/live/song/start_playing"]
+
+def test_coalesce_flush_thread():
+    query = RecordingQuery()
+    coalescer = WriteCoalescer(query, rate=200.0)
+    coalescer.start()
+    coalescer.submit("/live/song/set/tempo", (120.0,))
+    time.sleep(0.05)
+    assert query.messages == [("/live/song/set/tempo", [120.0])]
+    coalescer.submit("/live/song/set/tempo", (121.0,))
+    coalescer.stop()
+    assert query.messages[-1] == ("/live/song/set/tempo", [121.0])
@@ -0,0 +1,65 @@
+""" Unit tests for pylive's handler dispatch table """
+
+import pytest
+
+from live.dispatch import DispatchTable, callback_arity, osc_pattern_to_regex
+
+def test_callback_arity():
+    assert callback_arity(lambda: None) == 0
+    assert callback_arity(lambda beat: None) == 1
+    assert callback_arity(lambda *args: None) is None
+
+    class Listener:
+        def on_beat(self, beat):
+            pass
+    assert callback_arity(Listener().on_beat) == 1
+
+@pytest.mark.parametrize("pattern,address,matches", [
+    ("/live/track/get/*", "/live/track/get/volume", True),
+    ("/live/track/get/*", "/live/track/get/volume/extra", False),
+    ("/live/track/get/?ute", "/live/track/get/mute", True),
+    ("/live/track/get/{volume,panning}", "/live/track/get/panning", True),
+    ("/live/track/get/{volume,panning}", "/live/track/get/mute", False),
+    ("/live/clip[_]slot/fire", "/live/clip_slot/fire", True),
+    ("/live/track/get/[!m]ute", "/live/track/get/mute", False),
+])
+def test_osc_pattern(pattern, address, matches):
+    assert bool(osc_pattern_to_regex(pattern).fullmatch(address)) == matches
+
+def test_dispatch_exact_prefix_wildcard():
+    table = DispatchTable()
+    received = []
+    table.add("/live/track/get/volume", lambda *args: received.append(("exact", args)))
+    table.add("/live/track/", lambda *args: received.append(("prefix", args)), match="prefix")
+    table.add("/live/track/get/{volume,panning}", lambda *args: received.append(("wildcard", args)))
+
+    assert table.dispatch("/live/track/get/volume", (0, 0.5)) == 3
+    assert received == [("exact", (0, 0.5)), ("prefix", (0, 0.5)), ("wildcard", (0, 0.5))]
+    assert table.dispatch("/live/track/get/mute", (0, 1)) == 1
+    assert table.dispatch("/live/song/get/tempo", (120.0,)) == 0
+
+def test_dispatch_truncates_arguments():
+    table = DispatchTable()
+    received = []
+    table.add("/live/song/get/beat", lambda: received.append("no args"))
+    table.add("/live/song/get/beat", lambda beat: received.append(beat))
+    table.dispatch("/live/song/get/beat", (4,))
+    assert received == ["no args", 4]
+
+def test_dispatch_remove():
+    table = DispatchTable()
+    received = []
+    handler = received.append
+    table.add("/live/song/get/beat", handler)
+    table.dispatch("/live/song/get/beat", (1,))
+    assert table.remove("/live/song/get/beat", handler)
+    assert not table.remove("/live/song/get/beat", handler)
+    table.dispatch("/live/song/get/beat", (2,))
+    assert received == [1]
+    assert len(table) == 0
+
+    route = table.add("/live/song/*/beat", handler)
+    table.dispatch("/live/song/get/beat", (3,))
+    table.remove_route(route)
+    table.dispatch("/live/song/get/beat", (4,))
+    assert received == [1, 3]
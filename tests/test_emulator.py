@@ -0,0 +1,277 @@
+""" Tests of pylive against the in-process AbletonOSC emulator (no Live connection required) """
+
+import time
+import threading
+
+import pytest
+
+import live
+from live import Query, Set
+from live.emulator import LiveEmulator
+
+from .shared import emulator, query, set
+
+@pytest.fixture
+def emulator_options():
+    return dict(num_tracks=12, num_scenes=4, group_size=4, seed=1)
+
+def test_emulator_song_properties(set: Set):
+    assert set.tempo == 120.0
+    set.tempo = 140.0
+    assert set.tempo == 140.0
+    assert set.num_tracks == 12
+    assert set.num_scenes == 4
+
+@pytest.mark.parametrize("mode", ["file", "network"])
+def test_emulator_scan(emulator: LiveEmulator, set: Set, mode: str):
+    set.scan(mode=mode)
+    assert len(set.tracks) == 12
+    assert len(set.groups) == 3
+    assert set.tracks[1].group is set.groups[0]
+    assert set.groups[0].tracks == set.tracks[1:4]
+
+    for track_index, track_data in enumerate(emulator.set.tracks):
+        assert set.tracks[track_index].name == track_data["name"]
+        for clip_index, clip_data in enumerate(track_data["clips"]):
+            if clip_data is not None:
+                assert set.tracks[track_index].clips[clip_index].name == clip_data["name"]
+
+def test_emulator_track_and_clip(emulator: LiveEmulator, set: Set):
+    set.scan(mode="file")
+    track = set.tracks[1]
+    track.volume = 0.5
+    assert track.volume == 0.5
+    assert emulator.set.tracks[1]["volume"] == 0.5
+
+    clip = track.active_clips[0]
+    assert clip.name == emulator.set.tracks[1]["clips"][clip.index]["name"]
+    clip.play()
+    assert track.playing_slot_index == clip.index
+    clip.stop()
+    assert track.playing_slot_index == -1
+
+def test_emulator_device_parameters(emulator: LiveEmulator, set: Set):
+    set.scan(mode="file")
+    parameter = set.tracks[1].devices[0].parameters[1]
+    parameter.value = 0.25
+    rv = set.live.query("/live/device/get/parameters/value", (1, 0))
+    assert rv[3] == 0.25
+    assert emulator.set.tracks[1]["devices"][0]["parameters"][1]["value"] == 0.25
+
+def test_emulator_read_parameters(emulator: LiveEmulator, set: Set):
+    pytest.importorskip("numpy")
+    set.scan(mode="file")
+    device = set.tracks[1].devices[1]
+    expected = [parameter["value"] for parameter in emulator.set.tracks[1]["devices"][1]["parameters"]]
+    values = device.read_parameters()
+    assert values.dtype.kind == "f"
+    assert values.tolist() == pytest.approx(expected, abs=1e-6)
+    assert device.parameters[2].value == pytest.approx(expected[2], abs=1e-6)
+
+    arrays = set.tracks[1].read_all_parameters()
+    assert len(arrays) == len(set.tracks[1].devices)
+
+    snapshot = set.read_all_parameters()
+    devices = [device for track in set.tracks for device in track.devices]
+    assert list(snapshot) == devices
+    for device in devices:
+        track_data = emulator.set.tracks[device.track.index]["devices"][device.index]
+        assert snapshot[device].tolist() == pytest.approx([p["value"] for p in track_data["parameters"]], abs=1e-6)
+        assert len(snapshot[device]) == len(device.parameters)
+
+def test_emulator_write_parameters(emulator: LiveEmulator, set: Set):
+    pytest.importorskip("numpy")
+    set.scan(mode="file")
+    device = set.tracks[1].devices[0]
+    emulated = emulator.set.tracks[1]["devices"][0]["parameters"]
+    values = [0.3] + [0.5] * (len(device.parameters) - 2) + [1.5]
+    device.write_parameters(values)
+    assert device.read_parameters().tolist() == pytest.approx([0.0] + [0.5] * (len(values) - 2) + [1.0])
+    assert device.parameters[0]._value == 0.0
+    assert device.parameters[-1]._value == 1.0
+
+    device.write_parameters({0: 0.7, 2: 0.25})
+    set.live.query("/live/song/get/tempo")
+    assert emulated[0]["value"] == 1.0
+    assert emulated[1]["value"] == pytest.approx(0.5)
+    assert emulated[2]["value"] == 0.25
+    assert device.parameters[2]._value == 0.25
+
+    with pytest.raises(ValueError):
+        device.write_parameters([0.5])
+
+def test_emulator_query_many_and_fetch(emulator: LiveEmulator, set: Set):
+    set.scan(mode="file")
+    volumes = set.live.query_many([("/live/track/get/volume", (n,)) for n in range(12)])
+    assert [rv[0] for rv in volumes] == list(range(12))
+    rv = set.fetch("tempo", "track.volume", "track.mute")
+    assert rv["tempo"] == 120.0
+    assert len(rv["track.volume"]) == 12
+
+def test_emulator_clip_notes(emulator: LiveEmulator, query: Query):
+    emulator.set.tracks[1]["clips"][0] = None
+    query.cmd("/live/clip_slot/create_clip", (1, 0, 4.0))
+    query.cmd("/live/clip/add/notes", (1, 0, 60, 0.0, 1.0, 100, False, 64, 1.0, 1.0, 90, False))
+    assert query.query("/live/clip/get/notes", (1, 0)) == [1, 0, 60, 0.0, 1.0, 100, 0, 64, 1.0, 1.0, 90, 0]
+    query.cmd("/live/clip/remove/notes", (1, 0, 60, 1, 0.0, 4.0))
+    assert query.query("/live/clip/get/notes", (1, 0)) == [1, 0, 64, 1.0, 1.0, 90, 0]
+
+def test_emulator_clip_add_notes(emulator: LiveEmulator, set: Set):
+    np = pytest.importorskip("numpy")
+    set.scan(mode="file")
+    clip = next(clip for clip in set.tracks[1].clips if clip is not None)
+    emulated = emulator.set.tracks[1]["clips"][clip.index]
+    emulated["notes"] = []
+
+    clip.add_notes([(60, 0.0, 1.0, 100, False), (64, 1.0, 1.0, 90, True)])
+    set.live.query("/live/song/get/tempo")
+    assert emulated["notes"] == [(60, 0.0, 1.0, 100, 0), (64, 1.0, 1.0, 90, 1)]
+
+    emulated["notes"] = []
+    notes = np.zeros(5000, dtype=[("pitch", "i4"), ("start", "f8"), ("duration", "f8"), ("velocity", "i4")])
+    notes["pitch"] = np.arange(5000) % 128
+    notes["start"] = np.arange(5000) * 0.25
+    notes["duration"] = 0.25
+    notes["velocity"] = 100
+    received = emulator.stats()["received"]
+    clip.add_notes(notes)
+    set.live.query("/live/song/get/tempo")
+    assert len(emulated["notes"]) == 5000
+    assert emulated["notes"][4999] == (4999 % 128, 4999 * 0.25, 0.25, 100, 0)
+    assert emulator.stats()["received"] - received < 5000 / 60 + 5
+
+def test_emulator_clip_sync_notes(emulator: LiveEmulator, set: Set):
+    np = pytest.importorskip("numpy")
+    set.scan(mode="file")
+    clip = next(clip for clip in set.tracks[1].clips if clip is not None)
+    emulated = emulator.set.tracks[1]["clips"][clip.index]
+    emulated["notes"] = [(60 + n % 12, n * 0.1, 0.1, 100, 0) for n in range(1000)]
+    emulated["length"] = 64.0
+
+    notes = clip.get_notes()
+    assert len(notes) == 1000
+    assert notes.dtype.names == ("pitch", "start", "duration", "velocity", "mute")
+    assert notes[10]["pitch"] == 70 and notes[10]["start"] == pytest.approx(1.0)
+
+    #------------------------------------------------------------------------
+    # Move one note, delete one and add one: only those notes are sent, in a
+    # single datagram.
+    #------------------------------------------------------------------------
+    edited = notes.copy()
+    edited[5]["pitch"] = 50
+    edited = np.delete(edited, 20)
+    edited = np.append(edited, np.array([(72, 200.0, 1.0, 80, True)], dtype=edited.dtype))
+    received = emulator.stats()["received"]
+    assert clip.sync_notes(edited) == 4
+    set.live.query("/live/song/get/tempo")
+    assert emulator.stats()["received"] - received == 2
+    assert sorted(clip.get_notes().tolist()) == sorted(edited.tolist())
+
+    assert clip.sync_notes(edited) == 0
+
+    #------------------------------------------------------------------------
+    # Notes sharing a pitch and start time are replaced together.
+    #------------------------------------------------------------------------
+    doubled = np.append(edited, np.array([(60, 0.0, 2.0, 90, False)], dtype=edited.dtype))
+    assert clip.sync_notes(doubled) == 3
+    assert sorted(clip.get_notes().tolist()) == sorted(doubled.tolist())
+
+def test_emulator_clip_sync_notes_late_in_clip(emulator: LiveEmulator, set: Set):
+    pytest.importorskip("numpy")
+    set.scan(mode="file")
+    clip = next(clip for clip in set.tracks[1].clips if clip is not None)
+    emulated = emulator.set.tracks[1]["clips"][clip.index]
+    emulated["length"] = 16.0
+
+    #------------------------------------------------------------------------
+    # Beyond 2048 beats, start times (here, triplets created in Live) are
+    # rounded by more than the minimum removal width when sent as float32.
+    #------------------------------------------------------------------------
+    starts = [100 + 1 / 3] + [2048 * 2 ** octave + n / 3 for octave in range(4) for n in range(1, 3)]
+    emulated["notes"] = [(60, start, 0.25, 100, 0) for start in starts]
+    notes = clip.get_notes()
+    notes["velocity"] = 50
+    assert clip.sync_notes(notes) == 2 * len(starts)
+    readback = clip.get_notes()
+    assert len(readback) == len(starts)
+    assert readback["velocity"].tolist() == [50] * len(starts)
+
+    metrics = set.live.metrics()["addresses"]
+    assert metrics["/live/clip/remove/notes"]["sent"] == len(starts)
+    assert metrics["/live/clip/add/notes"]["sent"] == 1
+
+@pytest.mark.parametrize("emulator_options", [dict(loss=0.1, seed=2)])
+def test_emulator_retries_lost_packets(emulator: LiveEmulator, query: Query):
+    query.max_retries = 8
+    for n in range(50):
+        assert query.query("/live/track/get/volume", (n % 8,))[0] == n % 8
+    assert emulator.stats()["dropped"] > 0
+
+@pytest.mark.parametrize("emulator_options", [dict(latency=0.02)])
+def test_emulator_latency(query: Query):
+    t0 = time.monotonic()
+    query.query("/live/song/get/tempo")
+    assert time.monotonic() - t0 >= 0.02
+
+def test_emulator_beat_events(emulator: LiveEmulator, query: Query):
+    beats = []
+    event = threading.Event()
+
+    def beat_callback(beat):
+        beats.append(beat)
+        if len(beats) >= 3:
+            event.set()
+
+    query.beat_callback = beat_callback
+    query.cmd("/live/song/set/tempo", (1200.0,))
+    query.cmd("/live/song/start_listen/beat")
+    query.cmd("/live/song/start_playing")
+    assert event.wait(2.0)
+    query.cmd("/live/song/stop_playing")
+    assert beats[:3] == [0, 1, 2]
+
+def test_emulator_lazy_listen(emulator: LiveEmulator, query: Query, set: Set):
+    set.tempo = 130.0
+    assert not query.is_listening
+    assert not set.beat_listener_started
+    assert set.tempo == 130.0
+    assert query.is_listening
+
+def test_emulator_wait_for_next_beat(emulator: LiveEmulator, set: Set):
+    set.tempo = 600.0
+    set.start_playing()
+    set.wait_for_next_beat()
+    assert set.beat_listener_started
+    assert emulator.beat_listeners
+
+def test_emulator_startup_event(emulator: LiveEmulator, query: Query):
+    event = threading.Event()
+    query.startup_callback = event.set
+    query.query("/live/song/get/tempo")
+    emulator.send_startup()
+    assert event.wait(1.0)
+
+def test_emulator_property_listener(emulator: LiveEmulator, query: Query):
+    values = []
+    query.add_handler("/live/track/get/volume", lambda track_index, value: values.append((track_index, value)))
+    query.cmd("/live/track/start_listen/volume", (2,))
+    query.cmd("/live/track/set/volume", (2, 0.5))
+    query.cmd("/live/track/set/volume", (3, 0.5))
+    query.query("/live/song/get/tempo")
+    time.sleep(0.05)
+    assert values == [(2, pytest.approx(0.85)), (2, 0.5)]
+
+def test_emulator_bundle_timetag(emulator: LiveEmulator, query: Query):
+    with query.bundle(time.time() + 0.1):
+        query.cmd("/live/song/set/tempo", (100.0,))
+    assert query.query("/live/song/get/tempo") == [120.0]
+    time.sleep(0.15)
+    assert query.query("/live/song/get/tempo") == [100.0]
+
+def test_emulator_error_reply(emulator: LiveEmulator, query: Query):
+    errors = []
+    query.add_handler("/live/error", errors.append)
+    query.cmd("/live/track/get/volume", (99,))
+    query.query("/live/song/get/tempo")
+    time.sleep(0.05)
+    assert len(errors) == 1
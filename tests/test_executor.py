@@ -0,0 +1,85 @@
+""" Unit tests for pylive's callback executor """
+
+import time
+import asyncio
+import threading
+import pytest
+
+from live.dispatch import Route
+from live.executor import CallbackExecutor
+
+from .shared import wait_for
+
+def test_executor_thread_preserves_order():
+    received = []
+    route = Route("/live/song/get/beat", received.append, "exact")
+    executor = CallbackExecutor("thread")
+    for n in range(200):
+        executor.submit(route, (n,))
+    assert wait_for(lambda: len(received) == 200)
+    assert received == list(range(200))
+    assert executor.stats()["handlers"]["/live/song/get/beat list.append"]["processed"] == 200
+    executor.shutdown()
+
+def test_executor_slow_callback_does_not_block():
+    release = threading.Event()
+    route = Route("/live/song/get/beat", lambda beat: release.wait(), "exact")
+    executor = CallbackExecutor("thread", queue_size=4)
+    t0 = time.monotonic()
+    for n in range(100):
+        executor.submit(route, (n,))
+    assert time.monotonic() - t0 < 0.5
+
+    stats = executor.stats()
+    assert stats["depth"] <= 4
+    assert stats["dropped"] >= 95
+    release.set()
+    executor.shutdown()
+
+@pytest.mark.parametrize("policy,expected", [("drop_oldest", [0, 8, 9]), ("drop_newest", [0, 1, 2])])
+def test_executor_overflow_policy(policy, expected):
+    received = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def handler(value):
+        if value == 0:
+            started.set()
+            release.wait()
+        received.append(value)
+
+    executor = CallbackExecutor("thread", queue_size=2, policy=policy)
+    route = Route("/test", handler, "exact")
+    executor.submit(route, (0,))
+    started.wait()
+    for n in range(1, 10):
+        executor.submit(route, (n,))
+    release.set()
+    assert wait_for(lambda: len(received) == 3)
+    assert received == expected
+    executor.shutdown()
+
+def test_executor_inline():
+    received = []
+    executor = CallbackExecutor("inline")
+    executor.submit(Route("/test", lambda: received.append(threading.current_thread()), "exact"), (1,))
+    assert received == [threading.current_thread()]
+
+def test_executor_asyncio():
+    async def run():
+        received = []
+
+        async def handler(value):
+            await asyncio.sleep(0)
+            received.append(value)
+
+        executor = CallbackExecutor("asyncio", loop=asyncio.get_running_loop())
+        route = Route("/test", handler, "exact")
+        thread = threading.Thread(target=lambda: [executor.submit(route, (n,)) for n in range(10)])
+        thread.start()
+        thread.join()
+        while len(received) < 10:
+            await asyncio.sleep(0.001)
+        return received
+
+    assert asyncio.run(run()) == list(range(10))
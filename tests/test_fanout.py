@@ -0,0 +1,121 @@
+""" Unit tests for independent Query objects and QueryGroup, against minimal local responders """
+
+import socket
+import threading
+
+import pytest
+
+import live
+from live import Query, QueryGroup, Set
+from live.emulator import LiveEmulator
+from pythonosc.osc_message import OscMessage
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+class Responder:
+    """
+    Replies to any query with its arguments followed by a fixed value,
+    sent back to the address that the query came from.
+    """
+    def __init__(self, value):
+        self.value = value
+        self.received = []
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("127.0.0.1", 0))
+        self.address = self.socket.getsockname()
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        while True:
+            try:
+                data, addr = self.socket.recvfrom(65536)
+            except OSError:
+                return
+            message = OscMessage(data)
+            self.received.append((message.address, tuple(message.params)))
+            if "/get/" in message.address:
+                builder = OscMessageBuilder(address=message.address)
+                for arg in message.params:
+                    builder.add_arg(arg)
+                builder.add_arg(self.value)
+                try:
+                    self.socket.sendto(builder.build().dgram, addr)
+                except OSError:
+                    return
+
+    def close(self):
+        self.socket.close()
+
+@pytest.fixture
+def responders():
+    responders = [Responder(float(n)) for n in range(3)]
+    yield responders
+    for responder in responders:
+        responder.close()
+
+@pytest.fixture
+def group(responders):
+    group = QueryGroup.connect([responder.address for responder in responders], [0, 0, 0])
+    yield group
+    group.stop()
+
+def test_query_instances_are_independent(responders):
+    with Query(responders[0].address, listen_port=0) as a, Query(responders[1].address, listen_port=0) as b:
+        assert a is not b
+        assert a.listen_port != b.listen_port
+        assert a.query("/live/song/get/tempo") == [0.0]
+        assert b.query("/live/song/get/tempo") == [1.0]
+
+def test_query_default_is_shared():
+    assert Query.default() is Query.default()
+
+def test_set_client(responders):
+    with Query(responders[2].address, listen_port=0) as query:
+        set = Set(client=query)
+        assert set.live is query
+        assert set.tempo == 2.0
+
+def test_fanout_cmd(responders, group):
+    group.cmd("/live/song/set/tempo", (120.0,))
+    group.query("/live/song/get/tempo")
+    for responder in responders:
+        assert ("/live/song/set/tempo", (120.0,)) in responder.received
+
+def test_fanout_query(group):
+    assert len(group) == 3
+    assert group.query("/live/track/get/volume", (4,)) == [[4, 0.0], [4, 1.0], [4, 2.0]]
+    assert group.query_many([("/live/track/get/volume", (n,)) for n in range(2)]) == [
+        [[0, float(index)], [1, float(index)]] for index in range(3)
+    ]
+
+def test_fanout_return_exceptions(responders, group):
+    responders[1].close()
+    with pytest.raises(live.LiveTimeoutError):
+        group.query("/live/song/get/tempo", timeout=0.2)
+    rv = group.query("/live/song/get/tempo", timeout=0.2, return_exceptions=True)
+    assert rv[0] == [0.0] and rv[2] == [2.0]
+    assert isinstance(rv[1], live.LiveTimeoutError)
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def test_fanout_fixed_reply_ports():
+    #------------------------------------------------------------------------
+    # Instances that reply to a fixed port, rather than to the sender's port,
+    # each need a listen port of their own.
+    #------------------------------------------------------------------------
+    reply_ports = [free_port(), free_port()]
+    with LiveEmulator(port=0, reply_port=reply_ports[0]) as a, LiveEmulator(port=0, reply_port=reply_ports[1]) as b:
+        a.set.song["tempo"] = 100.0
+        group = QueryGroup.connect([a.address, b.address], reply_ports)
+        try:
+            assert group.query("/live/song/get/tempo", timeout=1.0) == [[100.0], [120.0]]
+        finally:
+            group.stop()
+
+def test_fanout_listen_ports():
+    with pytest.raises(ValueError):
+        QueryGroup.connect([("127.0.0.1", 11000), ("127.0.0.1", 11010)], [0])
+    with pytest.raises(ValueError):
+        QueryGroup.connect([("127.0.0.1", 11000), ("127.0.0.1", 11010)], [11001, 11001])
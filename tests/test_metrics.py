@@ -0,0 +1,92 @@
+""" Unit tests for pylive's client-side metrics (no Live connection required) """
+
+import random
+
+import pytest
+
+import live
+from live import Query
+from live.emulator import LiveEmulator
+from live.metrics import LatencyHistogram, QueryMetrics, PrometheusExporter, to_prometheus
+
+from .shared import emulator, emulator_options, query
+
+def test_histogram_percentiles():
+    rng = random.Random(0)
+    samples = [rng.lognormvariate(-7, 1) for _ in range(10000)]
+    histogram = LatencyHistogram()
+    for sample in samples:
+        histogram.record(sample)
+    samples.sort()
+    assert histogram.count == 10000
+    assert histogram.total == pytest.approx(sum(samples))
+    for q in (50, 90, 99):
+        exact = samples[int(q / 100 * len(samples)) - 1]
+        assert histogram.percentile(q) == pytest.approx(exact, rel=0.07, abs=2e-6)
+    assert histogram.percentile(100) == histogram.max == samples[-1]
+
+def test_histogram_range():
+    histogram = LatencyHistogram()
+    histogram.record(0.0)
+    histogram.record(3600.0)
+    histogram.record(1e9)
+    assert histogram.count == 3
+    assert histogram.cumulative_counts((0.001, 10.0)) == [1, 1]
+
+def test_query_metrics_snapshot():
+    metrics = QueryMetrics()
+    metrics.record_send("/live/song/get/tempo", 24)
+    metrics.record_receive("/live/song/get/tempo", 28)
+    metrics.record_query("/live/song/get/tempo", 0.001)
+    metrics.record_send("/live/song/set/tempo", 28)
+    metrics.record_timeout("/live/song/get/tempo")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["totals"]["sent"] == 2
+    assert snapshot["totals"]["bytes_sent"] == 52
+    tempo = snapshot["addresses"]["/live/song/get/tempo"]
+    assert tempo["received"] == 1
+    assert tempo["timeouts"] == 1
+    assert tempo["latency_ms"]["p50"] == pytest.approx(1.0, rel=0.07)
+    assert "latency_ms" not in snapshot["addresses"]["/live/song/set/tempo"]
+
+def test_prometheus_format(tmp_path):
+    metrics = QueryMetrics()
+    metrics.record_send("/live/track/get/volume", 32)
+    metrics.record_query("/live/track/get/volume", 0.0003)
+    text = to_prometheus(metrics, {"instance": "127.0.0.1:11000"})
+    assert 'pylive_messages_sent_total{instance="127.0.0.1:11000",address="/live/track/get/volume"} 1' in text
+    assert 'pylive_query_duration_seconds_bucket{instance="127.0.0.1:11000",address="/live/track/get/volume",le="0.0005"} 1' in text
+    assert 'pylive_query_duration_seconds_bucket{instance="127.0.0.1:11000",address="/live/track/get/volume",le="0.0001"} 0' in text
+    assert 'pylive_query_duration_seconds_count{instance="127.0.0.1:11000",address="/live/track/get/volume"} 1' in text
+
+    path = tmp_path / "pylive.prom"
+    exporter = PrometheusExporter(metrics, str(path), interval=60)
+    exporter.start()
+    exporter.stop()
+    assert path.read_text() == to_prometheus(metrics)
+
+def test_query_instrumentation(emulator: LiveEmulator, query: Query):
+    for n in range(4):
+        query.query("/live/track/get/volume", (n,))
+    query.query_many([("/live/track/get/mute", (n,)) for n in range(4)])
+    query.cmd("/live/song/set/tempo", (120.0,))
+    with query.bundle():
+        query.cmd("/live/song/set/tempo", (121.0,))
+    query.query("/live/song/get/tempo")
+    emulator.loss = 1.0
+    with pytest.raises(live.LiveTimeoutError):
+        query.query("/live/song/get/tempo", timeout=0.3)
+
+    snapshot = query.metrics(reset=True)
+    volume = snapshot["addresses"]["/live/track/get/volume"]
+    assert volume["sent"] == 4 and volume["received"] == 4 and volume["queries"] == 4
+    assert volume["latency_ms"]["count"] == 4
+    assert snapshot["addresses"]["/live/track/get/mute"]["queries"] == 4
+    assert snapshot["addresses"]["/live/song/set/tempo"]["sent"] == 2
+    tempo = snapshot["addresses"]["/live/song/get/tempo"]
+    assert tempo["timeouts"] == 1
+    assert tempo["queries"] == 1
+    assert tempo["retries"] == query.max_retries
+    assert tempo["sent"] == tempo["retries"] + 2
+    assert query.metrics()["totals"]["sent"] == 0
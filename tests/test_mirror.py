@@ -0,0 +1,102 @@
+""" Tests of the property mirror against the emulator (no Live connection required) """
+
+import pytest
+
+import live
+from live import Set
+from live.emulator import LiveEmulator
+
+from .shared import emulator, query, wait_for
+
+@pytest.fixture
+def emulator_options():
+    return dict(num_tracks=4, num_scenes=2, seed=1)
+
+@pytest.fixture
+def set(query):
+    set = Set(client=query)
+    set.scan()
+    set.caching = True
+    return set
+
+def test_mirror_serves_reads_from_memory(set: Set):
+    mirror = set.live.mirror
+    assert set.tempo == 120.0
+    assert set.tracks[1].mute == 0
+    assert mirror.stats()["misses"] == 2
+
+    for _ in range(100):
+        assert set.tempo == 120.0
+        assert set.tracks[1].mute == 0
+    assert mirror.stats()["hits"] == 200
+    assert not mirror.is_stale("/live/song/get/tempo")
+
+def test_mirror_follows_changes_in_live(emulator: LiveEmulator, set: Set):
+    other = live.Query(emulator.address, listen_port=0)
+    try:
+        assert set.tracks[2].arm == 0
+        other.cmd("/live/track/set/arm", (2, 1))
+        assert wait_for(lambda: set.tracks[2].arm == 1)
+    finally:
+        other.stop()
+
+def test_mirror_write_through(set: Set):
+    assert set.tempo == 120.0
+    set.tempo = 140.0
+    assert set.tempo == 140.0
+    assert set.live.query("/live/song/get/tempo") == [140.0]
+
+def test_mirror_unmirrored_properties(emulator: LiveEmulator, set: Set):
+    emulator.song_time = 4.0
+    assert set.current_song_time == 4.0
+    emulator.song_time = 8.0
+    assert set.current_song_time == 8.0
+    assert len(set.live.mirror) == 0
+
+def test_mirror_refcounts(emulator: LiveEmulator, set: Set):
+    mirror = set.live.mirror
+    address = "/live/track/get/solo"
+    mirror.subscribe(address, (0,))
+    mirror.subscribe(address, (0,))
+    assert wait_for(lambda: not mirror.is_stale(address, (0,)))
+    assert ("/live/track/get/solo", (0,)) in emulator.listeners
+
+    assert mirror.unsubscribe(address, (0,))
+    assert ("/live/track/get/solo", (0,)) in emulator.listeners
+    assert mirror.unsubscribe(address, (0,))
+    assert mirror.is_stale(address, (0,))
+    assert not mirror.unsubscribe(address, (0,))
+    set.live.query("/live/song/get/tempo")
+    assert ("/live/track/get/solo", (0,)) not in emulator.listeners
+
+def test_mirror_stale_after_startup(set: Set):
+    mirror = set.live.mirror
+    assert set.tempo == 120.0
+    mirror._on_startup()
+    assert mirror.is_stale("/live/song/get/tempo")
+    assert set.tempo == 120.0
+    assert not mirror.is_stale("/live/song/get/tempo")
+
+def test_mirror_disable_caching(emulator: LiveEmulator, set: Set):
+    assert set.tracks[0].volume == pytest.approx(0.85)
+    set.caching = False
+    assert len(set.live.mirror) == 0
+    set.live.query("/live/song/get/tempo")
+    assert not emulator.listeners
+
+def test_mirror_cleared_by_structure_changes(emulator: LiveEmulator, set: Set):
+    for index, track in enumerate(emulator.set.tracks):
+        track["volume"] = index / 10
+    assert set.tracks[1].volume == pytest.approx(0.1)
+    assert set.tracks[2].volume == pytest.approx(0.2)
+
+    #------------------------------------------------------------------------
+    # Track 2 is now at index 1, so its volume must be re-read.
+    #------------------------------------------------------------------------
+    set.delete_track(1)
+    assert set.tracks[1].volume == pytest.approx(0.2)
+    assert not set.live.mirror.is_stale("/live/track/get/volume", (1,))
+
+    set.create_midi_track(0)
+    assert set.tracks[1].volume == pytest.approx(0.0)
+    assert set.tracks[2].volume == pytest.approx(0.2)
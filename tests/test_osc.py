@@ -0,0 +1,117 @@
+""" Unit tests for pylive's OSC encoding helpers """
+
+import time
+import pytest
+
+from live.osc import encode_message, encode_bundle, encode_float_array, encode_notes, max_notes_per_message, FastDecoder
+from live.query import Bundle
+from pythonosc.osc_bundle import OscBundle
+from pythonosc.osc_message import OscMessage
+
+from .shared import RecordingQuery
+
+def test_encode_message():
+    message = OscMessage(encode_message("/live/clip/add/notes", (0, 1, 60, 0.5, 0.25, 100, False)))
+    assert message.address == "/live/clip/add/notes"
+    assert message.params == [0, 1, 60, 0.5, 0.25, 100, False]
+
+def test_encode_message_no_args():
+    from pythonosc.osc_message_builder import OscMessageBuilder
+    for address in ("/live/song/stop_playing", "/live/test", "/live/song/get/num_tracks"):
+        assert encode_message(address) == OscMessageBuilder(address).build().dgram
+        assert OscMessage(encode_message(address)).params == []
+
+def test_encode_bundle():
+    timetag = time.time() + 1.0
+    dgram = encode_bundle([encode_message("/live/clip_slot/fire", (n, 0)) for n in range(16)], timetag)
+    bundle = OscBundle(dgram)
+    assert bundle.num_contents == 16
+    assert bundle.timestamp == pytest.approx(timetag, abs=1e-6)
+    assert [message.params for message in bundle] == [[n, 0] for n in range(16)]
+
+def test_encode_bundle_immediately():
+    bundle = OscBundle(encode_bundle([encode_message("/live/song/start_playing")]))
+    assert bundle.num_contents == 1
+
+def test_bundle_nested():
+    query = RecordingQuery()
+    with Bundle(query) as outer:
+        outer.add(encode_message("/live/song/set/tempo", (120.0,)))
+        with Bundle(query, timetag=time.time()) as inner:
+            assert query.bundle_state.bundle is inner
+            inner.add(encode_message("/live/clip_slot/fire", (0, 0)))
+        assert query.bundle_state.bundle is outer
+        assert query.sent == []
+    assert query.bundle_state.bundle is None
+    assert len(query.sent) == 1
+
+    bundle = OscBundle(query.sent[0])
+    assert bundle.num_contents == 2
+    assert isinstance(bundle.content(1), OscBundle)
+
+def test_bundle_not_sent_on_exception():
+    query = RecordingQuery()
+    with pytest.raises(RuntimeError):
+        with Bundle(query) as bundle:
+            bundle.add(encode_message("/live/song/start_playing"))
+            raise RuntimeError
+    assert query.sent == []
+
+@pytest.mark.parametrize("address,args", [
+    ("/live/song/set/tempo", (120.0,)),
+    ("/live/track/set/volume", (3, 0.5)),
+    ("/live/device/set/parameter/value", (1, 0, 12, -0.25)),
+    ("/live/track/set/mute", (3, True)),
+    ("/live/track/set/name", (3, "Bass")),
+])
+def test_encode_message_template(address, args):
+    dgram = encode_message(address, args)
+    assert dgram == encode_message(address, args)
+    message = OscMessage(dgram)
+    assert message.address == address
+    assert message.params == list(args)
+
+def test_encode_float_array():
+    np = pytest.importorskip("numpy")
+    values = np.linspace(0, 1, 9)
+    dgram = encode_float_array("/live/device/set/parameters/value", (2, 1), values)
+    message = OscMessage(dgram)
+    assert message.address == "/live/device/set/parameters/value"
+    assert message.params[:2] == [2, 1]
+    assert message.params[2:] == pytest.approx(list(values))
+    assert dgram == encode_message("/live/device/set/parameters/value", (2, 1) + tuple(float(v) for v in values))
+
+def test_encode_notes():
+    np = pytest.importorskip("numpy")
+    from live.classes.clip import NOTE_DTYPE
+    notes = np.array([(60, 0.0, 1.0, 100, False), (64, 1.5, 0.5, 90, True)], dtype=NOTE_DTYPE)
+    dgram = encode_notes("/live/clip/add/notes", (1, 0), notes)
+    assert dgram == encode_message("/live/clip/add/notes", (1, 0, 60, 0.0, 1.0, 100, False, 64, 1.5, 0.5, 90, True))
+
+    count = max_notes_per_message("/live/clip/add/notes", 2)
+    assert len(encode_notes("/live/clip/add/notes", (1, 0), np.zeros(count, dtype=NOTE_DTYPE))) <= 1472
+    assert len(encode_notes("/live/clip/add/notes", (1, 0), np.zeros(count + 1, dtype=NOTE_DTYPE))) > 1472
+
+def test_fast_decoder():
+    decoder = FastDecoder()
+    decoder.register("/live/song/get/beat", "i")
+    decoder.register("/live/device/get/parameter/value", ",iiif")
+
+    assert decoder.decode(encode_message("/live/song/get/beat", (42,))) == ("/live/song/get/beat", (42,))
+    address, args = decoder.decode(encode_message("/live/device/get/parameter/value", (1, 0, 12, 0.5)))
+    assert address == "/live/device/get/parameter/value"
+    assert args == (1, 0, 12, 0.5)
+
+    #------------------------------------------------------------------------
+    # Unregistered addresses and mismatched type tags fall back (None)
+    #------------------------------------------------------------------------
+    assert decoder.decode(encode_message("/live/song/get/tempo", (120.0,))) is None
+    assert decoder.decode(encode_message("/live/song/get/beat", (42.0,))) is None
+    assert decoder.decode(encode_message("/live/song/get/beat", (42, 1))) is None
+    assert decoder.decode(encode_bundle([encode_message("/live/song/get/beat", (42,))])) is None
+
+    decoder.unregister("/live/song/get/beat")
+    assert decoder.decode(encode_message("/live/song/get/beat", (42,))) is None
+
+    with pytest.raises(ValueError):
+        decoder.register("/live/track/get/name", "is")
@@ -0,0 +1,112 @@
+""" Tests of pylive's tracing and profiling (no Live connection required) """
+
+import threading
+
+import pytest
+
+import live
+from live import Query, Set
+from live.profiling import span, add_hook, remove_hook, SpanHook, Profiler, NULL_SPAN
+
+from .shared import emulator, query
+
+def test_span_disabled_without_hooks():
+    assert span("query", "/live/song/get/tempo") is NULL_SPAN
+
+def test_span_nesting():
+    with live.profile() as profiler:
+        with span("scan", "network"):
+            for _ in range(3):
+                with span("query", "/live/song/get/track_data"):
+                    pass
+        with pytest.raises(ValueError):
+            with span("cmd", "/live/song/set/tempo"):
+                raise ValueError()
+    with span("query", "/live/song/get/tempo"):
+        pass
+
+    assert profiler.paths[("scan network", "query /live/song/get/track_data")][0] == 3
+    assert profiler.paths[("scan network",)][0] == 1
+    assert len(profiler.spans) == 5
+    assert profiler.top(1)[0].frame == "scan network"
+    cmd_span = [span for span in profiler.spans if span.name == "cmd"][0]
+    assert cmd_span.attributes["error"] == "ValueError"
+    assert cmd_span.parent is None
+
+    summary = profiler.summary()
+    assert summary["query /live/song/get/track_data"]["count"] == 3
+
+    folded = profiler.folded()
+    assert len(folded) == 3
+    assert folded[2].startswith("scan network;query /live/song/get/track_data ")
+
+    report = profiler.report(min_fraction=0)
+    assert "  query /live/song/get/track_data" in report
+    assert "Slowest operations:" in report
+
+def test_profiler_max_spans():
+    with live.profile(max_spans=2) as profiler:
+        for _ in range(5):
+            with span("query", "/live/song/get/tempo"):
+                pass
+    assert len(profiler.spans) == 2
+    assert len(profiler.top()) == 2
+    summary = profiler.summary()["query /live/song/get/tempo"]
+    assert summary["count"] == 5
+    assert summary["total"] == pytest.approx(profiler.paths[("query /live/song/get/tempo",)][1])
+    assert summary["max"] >= summary["mean"] > 0
+
+def test_span_threads():
+    profiler = Profiler()
+    with profiler:
+        with span("outer"):
+            thread = threading.Thread(target=lambda: span("inner").__enter__().__exit__(None, None, None))
+            thread.start()
+            thread.join()
+    assert ("inner",) in profiler.paths
+    assert ("outer", "inner") not in profiler.paths
+
+def test_hooks():
+    events = []
+
+    class Hook(SpanHook):
+        def on_start(self, span):
+            events.append(("start", span.frame))
+
+        def on_end(self, span):
+            events.append(("end", span.frame, span.duration >= 0))
+
+    hook = Hook()
+    add_hook(hook)
+    try:
+        with span("query", "/live/song/get/tempo"):
+            pass
+    finally:
+        remove_hook(hook)
+    with span("query", "/live/song/get/tempo"):
+        pass
+    assert events == [("start", "query /live/song/get/tempo"), ("end", "query /live/song/get/tempo", True)]
+
+@pytest.mark.parametrize("emulator_options", [dict(num_tracks=4, num_scenes=4, seed=1)])
+def test_profile_emulator(query: Query):
+    set = Set(client=query)
+    received = threading.Event()
+    query.add_handler("/live/song/get/tempo", lambda tempo: received.set())
+
+    with live.profile() as profiler:
+        set.scan(mode="network")
+        set.scan(mode="file")
+        set.tempo = 125.0
+        query.query_many([("/live/track/get/volume", (n,)) for n in range(4)])
+        query.query("/live/song/get/tempo")
+        assert received.wait(1.0)
+
+    paths = profiler.paths
+    assert paths[("scan network", "scan.tracks")][0] == 4
+    assert paths[("scan network", "scan.clips", "query /live/song/get/track_data")][0] == 4
+    assert ("scan network", "scan.devices") in paths
+    assert ("scan file", "scan.export", "query /live/song/export/structure") in paths
+    assert ("scan file", "scan.build") in paths
+    assert ("cmd /live/song/set/tempo",) in paths
+    assert ("query_many",) in paths
+    assert ("callback /live/song/get/tempo",) in paths
@@ -0,0 +1,72 @@
+""" Tests of the Query lifecycle against the emulator (no Live connection required) """
+
+import time
+import threading
+
+import pytest
+
+import live
+from live import Query
+from live.emulator import LiveEmulator
+
+from .shared import emulator, emulator_options
+
+def test_connect_joins_threads(emulator: LiveEmulator):
+    threads_before = threading.active_count()
+    with live.connect(emulator.address, listen_port=0) as query:
+        received = threading.Event()
+        query.add_handler("/live/song/get/tempo", lambda tempo: received.set())
+        assert query.query("/live/song/get/tempo") == [120.0]
+        assert received.wait(1.0)
+        listen_socket = query.listen_socket
+        assert threading.active_count() > threads_before
+    assert query.stopped
+    assert listen_socket.fileno() == -1
+    assert threading.active_count() == threads_before
+
+def test_connect_cycle_same_port(emulator: LiveEmulator):
+    with live.connect(emulator.address, listen_port=0) as query:
+        port = query.listen_port
+
+    t0 = time.perf_counter()
+    for n in range(20):
+        with live.connect(emulator.address, listen_port=port) as query:
+            assert query.query("/live/track/get/volume", (n % 8,))[0] == n % 8
+    assert time.perf_counter() - t0 < 1.0
+
+def test_stop_drains_pending_queries(emulator: LiveEmulator):
+    emulator.latency = 0.05
+    query = Query(emulator.address, listen_port=0)
+    future = query.submit("/live/song/get/tempo")
+    query.stop(timeout=1.0)
+    assert future.result(0) == [120.0]
+
+def test_stop_fails_unanswered_queries(emulator: LiveEmulator):
+    emulator.loss = 1.0
+    query = Query(emulator.address, listen_port=0)
+    future = query.submit("/live/song/get/tempo")
+    t0 = time.perf_counter()
+    query.stop(timeout=0.05)
+    assert time.perf_counter() - t0 < 0.5
+    with pytest.raises(live.LiveConnectionError):
+        future.result(0)
+
+def test_stopped_query_cannot_be_used(emulator: LiveEmulator):
+    query = Query(emulator.address, listen_port=0)
+    query.cmd("/live/song/start_playing")
+    query.stop()
+    query.stop()
+    with pytest.raises(live.LiveConnectionError):
+        query.query("/live/song/get/tempo")
+    with pytest.raises(live.LiveConnectionError):
+        query.cmd("/live/song/stop_playing")
+
+def test_stop_default_query(emulator: LiveEmulator):
+    query = Query(emulator.address, listen_port=0)
+    Query.set_default(query)
+    try:
+        query.stop()
+        assert Query.default() is not query
+    finally:
+        Query.default().stop()
+        Query.set_default(None)
@@ -0,0 +1,84 @@
+""" Unit tests for pylive's query router (no Live connection required) """
+
+import pytest
+import threading
+
+import live
+from live.router import RequestRouter, echo_args
+
+def test_router_echo_args():
+    assert echo_args("/live/song/get/tempo", ()) == ()
+    assert echo_args("/live/track/get/volume", (1,)) == (1,)
+    assert echo_args("/live/track/get/send", (1, 2)) == (1, 2)
+    assert echo_args("/live/track/set/mute", (1, True)) == (1,)
+    assert echo_args("/live/song/get/track_data", (0, 4, "track.name")) == ()
+    assert echo_args("/live/clip/get/notes", (1, 2, 0, 128, 0.0, 16.0)) == (1, 2)
+
+def test_router_correlates_by_index():
+    router = RequestRouter()
+    f0 = router.register("/live/track/get/volume", (0,))
+    f1 = router.register("/live/track/get/volume", (1,))
+    assert len(router) == 2
+
+    assert router.dispatch("/live/track/get/volume", (1, 0.5))
+    assert router.dispatch("/live/track/get/volume", (0, 0.85))
+    assert f0.result(0) == [0, 0.85]
+    assert f1.result(0) == [1, 0.5]
+    assert len(router) == 0
+
+def test_router_unmatched_reply():
+    router = RequestRouter()
+    router.register("/live/track/get/volume", (0,))
+    assert not router.dispatch("/live/track/get/volume", (3, 0.5))
+    assert not router.dispatch("/live/track/get/mute", (0, 1))
+
+def test_router_identical_queries_in_order():
+    router = RequestRouter()
+    f0 = router.register("/live/song/get/tempo")
+    f1 = router.register("/live/song/get/tempo")
+    router.dispatch("/live/song/get/tempo", (120.0,))
+    assert f0.done() and not f1.done()
+    router.dispatch("/live/song/get/tempo", (121.0,))
+    assert f1.result(0) == [121.0]
+
+def test_router_timeout_releases_event():
+    router = RequestRouter()
+    future = router.register("/live/song/get/tempo")
+    with pytest.raises(live.LiveConnectionError):
+        future.result(0.01)
+    assert len(router) == 0
+    assert len(router.event_pool) == 1
+
+    #------------------------------------------------------------------------
+    # A late reply must not resolve a query that has already timed out.
+    #------------------------------------------------------------------------
+    assert not router.dispatch("/live/song/get/tempo", (120.0,))
+    future = router.register("/live/song/get/tempo")
+    assert len(router.event_pool) == 0
+    assert not future.done()
+
+def test_router_concurrent_threads():
+    router = RequestRouter()
+    results = {}
+
+    def worker(index):
+        future = router.register("/live/track/get/volume", (index,))
+        results[index] = future.result(1.0)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(16)]
+    for thread in threads:
+        thread.start()
+    while len(router) < 16:
+        pass
+    for index in reversed(range(16)):
+        router.dispatch("/live/track/get/volume", (index, index / 16))
+    for thread in threads:
+        thread.join()
+    assert all(results[index] == [index, index / 16] for index in range(16))
+
+def test_router_cancel_all():
+    router = RequestRouter()
+    future = router.register("/live/song/get/tempo")
+    router.cancel_all(live.LiveConnectionError("stopped"))
+    with pytest.raises(live.LiveConnectionError):
+        future.result(0)
@@ -0,0 +1,117 @@
+""" Unit tests for pylive's RTT estimation and circuit breaker (no Live connection required) """
+
+import time
+import pytest
+
+import live
+from live.rtt import RTTEstimator, CircuitBreaker, address_class
+
+def test_rtt_address_class():
+    assert address_class("/live/track/get/volume") == "/live/track/get"
+    assert address_class("/live/track/get/mute") == "/live/track/get"
+    assert address_class("/live/song/get/tempo") == "/live/song/get"
+    assert address_class("/live/song/get/track_data") == "/live/song/get/track_data"
+    assert address_class("/live/device/get/parameters/value") == "/live/device/get/parameters/value"
+
+def test_rtt_initial_timeout():
+    rtt = RTTEstimator(initial_timeout=0.5)
+    assert rtt.timeout("/live/track/get/volume") == 0.5
+
+def test_rtt_adapts_to_samples():
+    rtt = RTTEstimator(min_timeout=0.0)
+    for _ in range(50):
+        rtt.sample("/live/track/get/volume", 0.002)
+    assert rtt.timeout("/live/track/get/volume") == pytest.approx(0.002, abs=0.001)
+    assert rtt.timeout("/live/track/get/mute") == pytest.approx(0.002, abs=0.001)
+
+    #------------------------------------------------------------------------
+    # Other address classes are estimated separately.
+    #------------------------------------------------------------------------
+    assert rtt.timeout("/live/song/get/tempo") == rtt.initial_timeout
+
+    stats = rtt.stats()
+    assert stats["/live/track/get"]["samples"] == 50
+
+def test_rtt_variance_widens_timeout():
+    steady = RTTEstimator(min_timeout=0.0)
+    jittery = RTTEstimator(min_timeout=0.0)
+    for n in range(50):
+        steady.sample("/live/song/get/tempo", 0.01)
+        jittery.sample("/live/song/get/tempo", 0.002 if n % 2 else 0.018)
+    assert jittery.timeout("/live/song/get/tempo") > steady.timeout("/live/song/get/tempo")
+
+def test_rtt_timeout_bounds():
+    rtt = RTTEstimator(min_timeout=0.02, max_timeout=3.0)
+    rtt.sample("/live/song/get/tempo", 0.0001)
+    assert rtt.timeout("/live/song/get/tempo") == 0.02
+    rtt.sample("/live/song/get/track_data", 10.0)
+    assert rtt.timeout("/live/song/get/track_data") == 3.0
+
+def test_breaker_opens_after_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60.0)
+    for _ in range(2):
+        breaker.record_failure()
+        breaker.check()
+    breaker.record_failure()
+    assert breaker.is_open
+    with pytest.raises(live.LiveConnectionError):
+        breaker.check()
+
+def test_breaker_half_open_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    with pytest.raises(live.LiveConnectionError):
+        breaker.check()
+    time.sleep(0.02)
+
+    #------------------------------------------------------------------------
+    # After the cooldown, exactly one trial query is let through.
+    #------------------------------------------------------------------------
+    breaker.check()
+    with pytest.raises(live.LiveConnectionError):
+        breaker.check()
+
+    breaker.record_success()
+    assert not breaker.is_open
+    breaker.check()
+
+def test_breaker_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    breaker.check()
+    breaker.record_failure()
+    with pytest.raises(live.LiveConnectionError):
+        breaker.check()
+
+def test_breaker_trial_released_on_error():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    with pytest.raises(live.LiveConnectionError, match="Couldn't send"):
+        with breaker.guard():
+            raise live.LiveConnectionError("Couldn't send message to Live")
+    assert not breaker.trial_in_progress
+    with breaker.guard():
+        pass
+    breaker.record_success()
+    assert not breaker.is_open
+
+def test_query_trial_send_error(monkeypatch):
+    query = live.Query(("127.0.0.1", 9), listen_port=0)
+    try:
+        query.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+        query.breaker.record_failure()
+
+        def send(dgram):
+            raise live.LiveConnectionError("Couldn't send message to Live")
+
+        monkeypatch.setattr(query, "send", send)
+        for _ in range(2):
+            with pytest.raises(live.LiveConnectionError, match="Couldn't send"):
+                query.query("/live/song/get/tempo")
+            with pytest.raises(live.LiveConnectionError, match="Couldn't send"):
+                query.query_many(["/live/song/get/tempo"])
+        assert not query.breaker.trial_in_progress
+    finally:
+        query.stop(timeout=0)
@@ -0,0 +1,58 @@
+""" Unit tests for pylive's wire tracer """
+
+import os
+import pytest
+
+from live.trace import WireTracer, read_trace, TRACE_IN, TRACE_OUT
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+def build(address, *args):
+    builder = OscMessageBuilder(address=address)
+    for arg in args:
+        builder.add_arg(arg)
+    return builder.build().dgram
+
+def test_trace_round_trip(tmp_path):
+    path = str(tmp_path / "liveosc.trace")
+    tracer = WireTracer(path)
+    tracer.start()
+    tracer.record(TRACE_OUT, build("/live/song/set/tempo", 110.0))
+    tracer.record(TRACE_IN, build("/live/track/get/name", 1, "Bass"))
+    tracer.stop()
+
+    records = list(read_trace(path))
+    assert [record[1:] for record in records] == [
+        (TRACE_OUT, "/live/song/set/tempo", (110.0,)),
+        (TRACE_IN, "/live/track/get/name", (1, "Bass")),
+    ]
+    assert tracer.records_written == 2
+
+def test_trace_rotation(tmp_path):
+    path = str(tmp_path / "liveosc.trace")
+    tracer = WireTracer(path, max_bytes=256, backup_count=2)
+    tracer.start()
+    for n in range(32):
+        tracer.record(TRACE_OUT, build("/live/track/set/volume", n, 0.5))
+        tracer.flush()
+    tracer.stop()
+
+    assert os.path.exists(path + ".1")
+    assert os.path.exists(path + ".2")
+    assert not os.path.exists(path + ".3")
+    assert all(os.path.getsize(p) < 512 for p in (path, path + ".1", path + ".2"))
+    indices = [record[3][0] for p in (path + ".2", path + ".1", path) for record in read_trace(p)]
+    assert indices == sorted(indices)
+    assert indices[-1] == 31
+
+def test_trace_ring_buffer_overflow(tmp_path):
+    tracer = WireTracer(str(tmp_path / "liveosc.trace"), buffer_size=4)
+    for n in range(10):
+        tracer.record(TRACE_OUT, build("/live/song/set/tempo", float(n)))
+    assert len(tracer.buffer) == 4
+    assert tracer.records_dropped == 6
+
+def test_trace_invalid_file(tmp_path):
+    path = tmp_path / "invalid.trace"
+    path.write_bytes(b"foo")
+    with pytest.raises(ValueError):
+        list(read_trace(str(path)))